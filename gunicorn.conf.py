@@ -0,0 +1,14 @@
+# Gunicorn configuration, loaded automatically from the working directory.
+# SERVER_MODE selects how the app is served:
+# - "wsgi": sync workers running skillified.wsgi, one request per worker.
+# - "asgi": uvicorn workers running skillified.asgi, where the async views
+#   (home, dashboard, mentor skills, skill detail, events) do not hold a
+#   worker while they wait for the database or cache.
+# Compare the two with the bench_server_modes command.
+import os
+
+if os.getenv('SERVER_MODE', 'wsgi') == 'asgi':
+    wsgi_app = 'skillified.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'skillified.wsgi:application'
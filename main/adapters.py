@@ -0,0 +1,14 @@
+from allauth.account.adapter import DefaultAccountAdapter
+
+
+class AccountAdapter(DefaultAccountAdapter):
+    """
+    Account adapter passing the mentor choice of the signup form to the
+    profile created with the user.
+    """
+
+    def save_user(self, request, user, form, commit=True):
+        # Read by the create_profile signal, so that the profile is inserted
+        # with the flag instead of being updated afterwards
+        user.signup_is_mentor = form.cleaned_data.get('mentor') == 'yes'
+        return super().save_user(request, user, form, commit)
@@ -1,7 +1,28 @@
 from django.contrib import admin
-from .models import Profile, Skill, Event, NotificationSetting
+from . import exports
+from .models import Profile, Skill, Event, NotificationSetting, OutboundEmail
+
+
+@admin.action(description='Export selected skills as CSV')
+def export_skills_csv(modeladmin, request, queryset):
+    return exports.export_skills(queryset)
+
+
+@admin.action(description='Export selected events as CSV')
+def export_events_csv(modeladmin, request, queryset):
+    return exports.export_events(queryset)
+
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    actions = [export_skills_csv]
+
+
+@admin.register(Event)
+class EventAdmin(admin.ModelAdmin):
+    actions = [export_events_csv]
+
 
 admin.site.register(Profile)
-admin.site.register(Skill)
-admin.site.register(Event)
 admin.site.register(NotificationSetting)
+admin.site.register(OutboundEmail)
@@ -0,0 +1,310 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+
+from cloudinary import CloudinaryResource
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.core.signals import setting_changed
+from django.db import connection, transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .mail import retry_delay
+from .models import AvatarUpload, Profile
+
+logger = logging.getLogger(__name__)
+
+# Profile picture uploads.
+# The profile view only validates an uploaded picture and queues it as an
+# AvatarUpload, so the request never waits for the image to be resized or
+# sent to Cloudinary. The process_avatar_uploads worker renders square WebP
+# variants of each queued picture with Pillow, in a pool of threads (Pillow
+# releases the GIL while decoding, resizing and encoding), and saves them to
+# the 'avatars' storage: Cloudinary in production and the local filesystem
+# otherwise. Variant file names are derived from the upload, so a retried or
+# reclaimed upload skips the variants that were already stored.
+#
+# Pages show a picture with a srcset of its variants, so browsers download
+# the smallest one that fills the slot at the screen's pixel density.
+# Pictures uploaded before the pipeline are still Cloudinary originals; they
+# get the same sizes as Cloudinary transformations with automatic format
+# (AVIF or WebP, as the browser accepts) and quality. The URLs of a picture
+# are built once per process and memoized by its file names, or by its
+# public_id and version, which change whenever the picture does.
+
+AVATAR_SIZES = (64, 150, 300)
+# The size shown on the profile page, and the fallback for other places
+AVATAR_DEFAULT_SIZE = 150
+AVATAR_FORMAT = 'WEBP'
+AVATAR_QUALITY = 80
+
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40_000_000
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF'}
+
+BATCH_SIZE = 20
+PROCESS_WORKERS = 4
+MAX_ATTEMPTS = 3
+# How long a worker may hold an upload before another one takes it over
+LEASE_TIMEOUT = timedelta(minutes=5)
+# Number of pictures whose URLs are memoized
+URL_CACHE_SIZE = 4096
+
+
+class InvalidImage(ValueError):
+    """
+    Raised for an upload that is not an image the pipeline accepts.
+    """
+
+
+def _storage():
+    return storages['avatars']
+
+
+def validate(upload):
+    """
+    Checks that an uploaded file is a supported image of a reasonable size,
+    without decoding it, and returns its content. Raises InvalidImage.
+    """
+    if upload.size > MAX_UPLOAD_SIZE:
+        raise InvalidImage(
+            f'The picture must be smaller than '
+            f'{MAX_UPLOAD_SIZE // (1024 * 1024)} MB.')
+    data = upload.read()
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.format not in ALLOWED_FORMATS:
+                raise InvalidImage(
+                    'The picture must be a JPEG, PNG, WebP or GIF image.')
+            width, height = image.size
+            if width * height > MAX_IMAGE_PIXELS:
+                raise InvalidImage('The picture has too many pixels.')
+            image.verify()
+    except InvalidImage:
+        raise
+    except (Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        raise InvalidImage('The file is not a valid image.')
+    return data
+
+
+def enqueue(profile, data):
+    """
+    Queues the content of a validated picture for processing.
+    """
+    return AvatarUpload.objects.create(profile=profile, original=data)
+
+
+def variant_name(upload, size):
+    return (
+        f'avatars/{upload.profile_id}/{upload.pk}-{size}.'
+        f'{AVATAR_FORMAT.lower()}'
+    )
+
+
+@dataclass(frozen=True)
+class AvatarImage:
+    """
+    URLs of a profile picture: src at the default size, and srcset listing
+    every size for the browser to choose from.
+    """
+    src: str
+    srcset: str
+
+
+def _avatar_image(urls):
+    return AvatarImage(
+        src=urls[AVATAR_DEFAULT_SIZE],
+        srcset=', '.join(f'{url} {size}w' for size, url in urls.items()),
+    )
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _variant_image(names):
+    storage = _storage()
+    return _avatar_image({
+        int(size): storage.url(name)
+        for size, name in sorted(names, key=lambda item: int(item[0]))
+    })
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _cloudinary_image(public_id, version):
+    resource = CloudinaryResource(public_id, version=version)
+    return _avatar_image({
+        size: resource.build_url(
+            width=size, height=size, crop='fill', fetch_format='auto',
+            quality='auto', secure=True)
+        for size in AVATAR_SIZES
+    })
+
+
+def avatar_image(profile):
+    """
+    Returns the AvatarImage of a profile's picture, or None if it has none.
+    """
+    if profile.avatar_variants:
+        return _variant_image(tuple(profile.avatar_variants.items()))
+    if profile.profile_picture:
+        return _cloudinary_image(
+            profile.profile_picture.public_id,
+            profile.profile_picture.version)
+    return None
+
+
+@receiver(setting_changed)
+def clear_url_cache(setting, **kwargs):
+    if setting in ('STORAGES', 'MEDIA_URL'):
+        _variant_image.cache_clear()
+
+
+def render_variants(data):
+    """
+    Returns the encoded square variants of an image, keyed by size.
+    """
+    largest = max(AVATAR_SIZES)
+    with Image.open(io.BytesIO(data)) as image:
+        # Lets the JPEG decoder skip detail the largest variant does not
+        # need, which makes decoding large photos several times faster
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert(
+            'RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    variants = {}
+    for size in AVATAR_SIZES:
+        variant = ImageOps.fit(
+            image, (size, size), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        variant.save(output, AVATAR_FORMAT, quality=AVATAR_QUALITY, method=4)
+        variants[size] = output.getvalue()
+    return variants
+
+
+def store_variants(upload):
+    """
+    Renders the variants of an upload and saves the missing ones to storage.
+    Returns their file names keyed by size. Does not use the database, so
+    it can run in a worker thread.
+    """
+    storage = _storage()
+    names = {size: variant_name(upload, size) for size in AVATAR_SIZES}
+    missing = [size for size, name in names.items()
+               if not storage.exists(name)]
+    if missing:
+        rendered = render_variants(bytes(upload.original))
+        for size in missing:
+            storage.save(names[size], ContentFile(rendered[size]))
+    return {str(size): name for size, name in names.items()}
+
+
+def _claim(now, batch_size):
+    """
+    Leases up to batch_size due uploads to this worker.
+    """
+    with transaction.atomic():
+        uploads = AvatarUpload.objects.filter(
+            status__in=[AvatarUpload.PENDING, AvatarUpload.PROCESSING],
+            next_attempt_at__lte=now,
+        ).order_by('next_attempt_at', 'id')
+        # Lets several workers share the queue on PostgreSQL
+        if connection.features.has_select_for_update_skip_locked:
+            uploads = uploads.select_for_update(skip_locked=True)
+        uploads = list(uploads[:batch_size])
+        AvatarUpload.objects.filter(
+            pk__in=[upload.pk for upload in uploads]
+        ).update(
+            status=AvatarUpload.PROCESSING,
+            next_attempt_at=now + LEASE_TIMEOUT,
+        )
+    return uploads
+
+
+def _apply(upload, names):
+    """
+    Points the profile at the variants of an upload, unless a newer upload
+    was applied already, and deletes the files this replaces.
+    """
+    storage = _storage()
+    with transaction.atomic():
+        profile = Profile.objects.select_for_update().only(
+            'user_id', 'avatar_variants', 'avatar_version'
+        ).filter(pk=upload.profile_id).first()
+        if profile is None or profile.avatar_version > upload.pk:
+            # A newer picture was applied meanwhile
+            obsolete = set(names.values())
+        else:
+            obsolete = (
+                set(profile.avatar_variants.values()) - set(names.values()))
+            profile.avatar_variants = names
+            profile.avatar_version = upload.pk
+            profile.profile_picture = None
+            profile.save(update_fields=[
+                'avatar_variants', 'avatar_version', 'profile_picture'])
+    for name in obsolete:
+        storage.delete(name)
+
+
+def process_pending(batch_size=BATCH_SIZE, workers=PROCESS_WORKERS, now=None):
+    """
+    Processes up to batch_size due uploads in a pool of worker threads.
+    Returns the numbers of processed and failed uploads.
+    """
+    now = now or timezone.now()
+    uploads = _claim(now, batch_size)
+    if not uploads:
+        return 0, 0
+
+    done = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(store_variants, upload)
+                   for upload in uploads]
+        for upload, future in zip(uploads, futures):
+            upload.attempts += 1
+            try:
+                _apply(upload, future.result())
+            except Exception as e:
+                failed += 1
+                upload.last_error = f'{type(e).__name__}: {e}'
+                if upload.attempts >= MAX_ATTEMPTS:
+                    upload.status = AvatarUpload.FAILED
+                    logger.error(
+                        'Giving up on profile picture upload %s after %d '
+                        'attempts: %s',
+                        upload.pk, upload.attempts, upload.last_error)
+                else:
+                    upload.status = AvatarUpload.PENDING
+                    upload.next_attempt_at = now + retry_delay(upload.attempts)
+                    logger.warning(
+                        'Profile picture upload %s failed, retrying at %s: '
+                        '%s',
+                        upload.pk, upload.next_attempt_at, upload.last_error)
+            else:
+                done += 1
+                upload.status = AvatarUpload.DONE
+                upload.processed_at = now
+                upload.last_error = ''
+                # The variants are stored, the original is not needed again
+                upload.original = b''
+
+    AvatarUpload.objects.bulk_update(uploads, [
+        'status', 'attempts', 'next_attempt_at', 'last_error',
+        'processed_at', 'original',
+    ])
+    return done, failed
+
+
+def clear(profile):
+    """
+    Removes the profile picture of a profile: its variants, their files and
+    the uploads still queued. Does not save the profile.
+    """
+    storage = _storage()
+    for name in profile.avatar_variants.values():
+        storage.delete(name)
+    profile.avatar_variants = {}
+    profile.avatar_uploads.filter(
+        status__in=[AvatarUpload.PENDING, AvatarUpload.PROCESSING]).delete()
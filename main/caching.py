@@ -0,0 +1,155 @@
+import threading
+from collections import Counter
+
+from django.core.cache import caches
+
+# Shared cache access.
+# CACHES (see settings.py) points at a backend shared by every process: Redis
+# or Memcached in production, a file-based cache for development and tests.
+# Each subsystem reads and writes through its own CacheNamespace, which
+# prefixes its keys with the namespace name, passes its own key version and
+# counts hits and misses. Bump a namespace's version when the shape of its
+# cached values changes, so entries written by older code are ignored rather
+# than unpickled into the wrong shape. The counts are added to shared
+# counters in the cache every METRICS_FLUSH_INTERVAL lookups, so the
+# cache_stats command reports them across all dynos.
+
+METRICS_KEY_PREFIX = 'cache_metrics'
+METRICS_FLUSH_INTERVAL = 100
+OUTCOMES = ('hits', 'misses')
+
+_MISSING = object()
+_namespaces = {}
+_lock = threading.Lock()
+_pending = Counter()
+
+
+class CacheNamespace:
+    """
+    The keys of one subsystem in a configured cache.
+    """
+
+    def __init__(self, name, version=1, alias='default'):
+        self.name = name
+        self.version = version
+        self.alias = alias
+        _namespaces[name] = self
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, key):
+        return f'{self.name}:{key}'
+
+    def get(self, key, default=None):
+        value = self.cache.get(
+            self.make_key(key), _MISSING, version=self.version)
+        _record(self.name, value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def get_or_set(self, key, default, timeout):
+        """
+        Returns the cached value of key, or caches and returns default (or
+        its result, if callable). A value cached concurrently by another
+        process wins, as with the cache's own get_or_set().
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = default() if callable(default) else default
+            self.cache.add(
+                self.make_key(key), value, timeout, version=self.version)
+            value = self.cache.get(
+                self.make_key(key), value, version=self.version)
+        return value
+
+    async def aget(self, key, default=None):
+        value = await self.cache.aget(
+            self.make_key(key), _MISSING, version=self.version)
+        _record(self.name, value is not _MISSING)
+        return default if value is _MISSING else value
+
+    async def aget_or_set(self, key, default, timeout):
+        value = await self.aget(key, _MISSING)
+        if value is _MISSING:
+            value = default() if callable(default) else default
+            await self.cache.aadd(
+                self.make_key(key), value, timeout, version=self.version)
+            value = await self.cache.aget(
+                self.make_key(key), value, version=self.version)
+        return value
+
+    def set(self, key, value, timeout):
+        self.cache.set(
+            self.make_key(key), value, timeout, version=self.version)
+
+    async def aset(self, key, value, timeout):
+        await self.cache.aset(
+            self.make_key(key), value, timeout, version=self.version)
+
+    def delete(self, key):
+        self.cache.delete(self.make_key(key), version=self.version)
+
+
+def _record(namespace, hit):
+    with _lock:
+        _pending[namespace, OUTCOMES[0] if hit else OUTCOMES[1]] += 1
+        if _pending.total() < METRICS_FLUSH_INTERVAL:
+            return
+    flush_metrics()
+
+
+def _metrics_key(namespace, outcome):
+    return f'{METRICS_KEY_PREFIX}:{namespace}:{outcome}'
+
+
+def flush_metrics():
+    """
+    Adds the hits and misses counted by this process to the shared counters.
+    """
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+    cache = caches['default']
+    for (namespace, outcome), count in pending.items():
+        key = _metrics_key(namespace, outcome)
+        # add() creates the counter, incr() updates it atomically
+        if not cache.add(key, count, None):
+            try:
+                cache.incr(key, count)
+            except ValueError:
+                # Evicted in between
+                cache.set(key, count, None)
+
+
+def metrics():
+    """
+    Returns the shared hit and miss counts of every namespace, as a dict of
+    namespace names to dicts of outcome to count.
+    """
+    keys = {
+        _metrics_key(namespace, outcome): (namespace, outcome)
+        for namespace in sorted(_namespaces)
+        for outcome in OUTCOMES
+    }
+    counts = caches['default'].get_many(keys)
+    result = {
+        namespace: dict.fromkeys(OUTCOMES, 0) for namespace in _namespaces
+    }
+    for key, count in counts.items():
+        namespace, outcome = keys[key]
+        result[namespace][outcome] = count
+    return result
+
+
+def reset_metrics():
+    """
+    Resets the shared hit and miss counts.
+    """
+    with _lock:
+        _pending.clear()
+    caches['default'].delete_many([
+        _metrics_key(namespace, outcome)
+        for namespace in _namespaces
+        for outcome in OUTCOMES
+    ])
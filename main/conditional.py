@@ -0,0 +1,98 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib import messages
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .profile_summary import aget_profile_summary, get_profile_summary
+
+# Conditional GET.
+# The skill and event pages send an ETag and a Last-Modified date, and
+# answer a browser revalidating its copy with a 304 Not Modified before the
+# view runs its remaining queries or renders a template. Each page declares
+# a state function, run before the view, which returns the change markers
+# of the data the page shows: Skill.updated_at, Event.updated_at (which
+# participant changes move too, see registration.py), and counts that
+# change when rows are added or removed. The ETag also covers what every
+# page shows of the viewer (user, profile summary and CSRF cookie, which
+# the page's forms embed) and the deployed release. Pages with pending
+# flash messages are always rendered, so the messages are shown.
+#
+# The pages are private and must be revalidated on every load, as browsers
+# would otherwise reuse them for a while on the strength of Last-Modified.
+
+
+def _etag(request, summary, key):
+    # Sets the CSRF secret for the response if the request had none
+    get_token(request)
+    viewer = (request.user.pk, summary, request.META['CSRF_COOKIE'])
+    digest = hashlib.md5(
+        repr((settings.RELEASE_VERSION, viewer, key)).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    # Weak, as the CSRF tokens in the page differ between renders
+    return f'W/"{digest}"'
+
+
+def _conditional_response(request, state, summary):
+    """
+    Returns the 304 response for a request whose copy of the page is up to
+    date, or None, along with the page's validators.
+    """
+    if state is None or request.method not in ('GET', 'HEAD'):
+        return None, None, None
+    # len() reads the messages without marking them as shown
+    if len(messages.get_messages(request)):
+        return None, None, None
+    key, last_modified = state
+    etag = _etag(request, summary, key)
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    return response, etag, last_modified
+
+
+def _add_validators(response, etag, last_modified):
+    if etag is None or response.status_code not in (200, 304):
+        return response
+    response.headers.setdefault('ETag', etag)
+    if last_modified:
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_page(state_func):
+    """
+    Decorator answering conditional GET requests for a page. state_func is
+    called with the view's arguments before the view, for every request
+    method, and returns a (key, last_modified) pair: key changes whenever
+    the page would, and last_modified is the latest of the change markers.
+    It returns None when the page does not exist. For async views it must
+    be a coroutine function.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def inner(request, *args, **kwargs):
+                state = await state_func(request, *args, **kwargs)
+                response, etag, last_modified = _conditional_response(
+                    request, state, await aget_profile_summary(request))
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return _add_validators(response, etag, last_modified)
+        else:
+            @wraps(view_func)
+            def inner(request, *args, **kwargs):
+                state = state_func(request, *args, **kwargs)
+                response, etag, last_modified = _conditional_response(
+                    request, state, get_profile_summary(request))
+                if response is None:
+                    response = view_func(request, *args, **kwargs)
+                return _add_validators(response, etag, last_modified)
+        return inner
+    return decorator
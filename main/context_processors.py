@@ -0,0 +1,8 @@
+from .profile_summary import get_profile_summary
+
+
+def profile_summary(request):
+    """
+    Adds the viewer's cached profile summary to every template context.
+    """
+    return {'viewer_profile': get_profile_summary(request)}
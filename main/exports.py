@@ -0,0 +1,74 @@
+import csv
+
+from django.http import StreamingHttpResponse
+
+# CSV exports.
+# An export can cover every row of a table, so rows are streamed rather than
+# loaded: the query runs through iterator(chunk_size=...), which reads from
+# a server-side cursor on PostgreSQL (psycopg 3) and with fetchmany()
+# elsewhere, and each CSV line is written out as soon as its row arrives.
+# Memory use stays flat however many rows there are. Related names are read
+# with values_list() lookups, so an export is a single query.
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (lookup, header) pairs of the exported columns
+EVENT_EXPORT_FIELDS = (
+    ('id', 'ID'),
+    ('title', 'Title'),
+    ('skill__name', 'Skill'),
+    ('owner__username', 'Owner'),
+    ('date_time', 'Date and time'),
+    ('participant_count', 'Participants'),
+    ('capacity', 'Capacity'),
+)
+SKILL_EXPORT_FIELDS = (
+    ('id', 'ID'),
+    ('name', 'Name'),
+    ('description', 'Description'),
+    ('popularity', 'Popularity'),
+    ('created_at', 'Created at'),
+    ('updated_at', 'Updated at'),
+)
+
+
+class _Echo:
+    """
+    File-like object returning what is written, for csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the CSV header line for fields, a sequence of (lookup, header)
+    pairs, then one line per row of queryset, fetched chunk_size at a time.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for _, header in fields])
+    rows = queryset.values_list(*[lookup for lookup, _ in fields])
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield writer.writerow(row)
+
+
+def csv_response(queryset, fields, filename):
+    """
+    Returns a streaming CSV download of queryset.
+    """
+    response = StreamingHttpResponse(
+        csv_lines(queryset, fields), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_events(queryset):
+    return csv_response(
+        queryset.order_by('date_time', 'id'), EVENT_EXPORT_FIELDS,
+        'events.csv')
+
+
+def export_skills(queryset):
+    return csv_response(
+        queryset.order_by('name', 'id'), SKILL_EXPORT_FIELDS, 'skills.csv')
@@ -2,7 +2,7 @@ from django import forms
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Submit
 from allauth.account.forms import SignupForm
-from .models import Profile, Skill, Event
+from .models import Skill, Event
 
 # ContactForm is used for the contact page to allow users to send messages to the site administrators.
 
@@ -27,6 +27,7 @@ class ContactForm(forms.Form):
 
 # CustomSignupForm extends the default SignupForm from Django-Allauth to include additional fields.
 # It allows users to provide their first name, last name, and mentor status during registration.
+# The mentor status is saved with the profile by the AccountAdapter (see main/adapters.py).
 
 
 class CustomSignupForm(SignupForm):
@@ -54,18 +55,6 @@ class CustomSignupForm(SignupForm):
         self.helper.field_class = 'form-control'
         self.helper.add_input(Submit('submit', 'Sign Up'))
 
-    def save(self, request):
-        user = super(CustomSignupForm, self).save(request)
-        user.first_name = self.cleaned_data['first_name']
-        user.last_name = self.cleaned_data['last_name']
-        user.save()
-
-        # Update the profile with the mentor status
-        profile = Profile.objects.get(user=user)
-        profile.is_mentor = self.cleaned_data['mentor'] == 'yes'
-        profile.save()
-
-        return user
 
 # SkillForm is used for creating and editing skills. It is used in the mentor skills section.
 
@@ -87,7 +76,7 @@ class SkillForm(forms.ModelForm):
 class EventForm(forms.ModelForm):
     class Meta:
         model = Event
-        fields = ['title', 'overview', 'date_time']
+        fields = ['title', 'overview', 'date_time', 'capacity']
         widgets = {
             'date_time': forms.DateTimeInput(
                 attrs={'class': 'datetimepicker'}
@@ -106,7 +95,7 @@ class EventForm(forms.ModelForm):
 class EditEventForm(forms.ModelForm):
     class Meta:
         model = Event
-        fields = ['title', 'overview', 'date_time']
+        fields = ['title', 'overview', 'date_time', 'capacity']
         widgets = {
             'date_time': forms.DateTimeInput(
                 attrs={'class': 'datetimepicker'}
@@ -0,0 +1,41 @@
+from uuid import uuid4
+
+from .caching import CacheNamespace
+
+# Template fragment caching.
+# The parts of the skill and event detail pages that are the same for every
+# viewer (descriptions, upcoming events, participant lists) are cached with
+# the {% cache %} tag, keyed by the object id and a version stored in the
+# cache. The signals in signals.py and the registration functions replace
+# the version whenever the object, its events or its participants change,
+# so the next request renders the fragment again under a new key. Per-viewer
+# parts (registration and owner buttons, CSRF tokens) are never cached.
+
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Keyed by kind and object id
+_versions = CacheNamespace('fragment_version')
+
+
+def fragment_version(kind, pk):
+    """
+    Returns the current fragment version of object pk of kind ("skill" or
+    "event").
+    """
+    return _versions.get_or_set(f'{kind}:{pk}', lambda: uuid4().hex, None)
+
+
+async def afragment_version(kind, pk):
+    """
+    Async version of fragment_version() for async views.
+    """
+    return await _versions.aget_or_set(
+        f'{kind}:{pk}', lambda: uuid4().hex, None)
+
+
+def invalidate_fragments(kind, pk):
+    """
+    Gives object pk of kind a new fragment version, so that its cached
+    fragments are rendered again.
+    """
+    _versions.set(f'{kind}:{pk}', uuid4().hex, None)
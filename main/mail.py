@@ -0,0 +1,190 @@
+import base64
+import logging
+from datetime import timedelta
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Queued email delivery.
+# EMAIL_BACKEND is the QueuedEmailBackend, so send_mail() in views and the
+# account emails of allauth only insert OutboundEmail rows and return at
+# once. The send_queued_mail worker delivers the queue in batches through
+# MAIL_QUEUE_BACKEND (SMTP in production, console or file locally), reusing
+# one connection per batch and retrying failures with exponential backoff.
+# A worker leases its batch by moving next_attempt_at forward and commits
+# before sending, so no rows stay locked during the SMTP round-trips and the
+# emails of a crashed worker are picked up again once the lease expires.
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 6
+RETRY_DELAY = timedelta(minutes=1)
+MAX_RETRY_DELAY = timedelta(hours=6)
+LEASE_TIMEOUT = timedelta(minutes=5)
+
+
+def retry_delay(attempts):
+    """
+    Returns the delay before retrying an email that failed attempts times.
+    """
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def _dump_attachment(attachment):
+    if isinstance(attachment, MIMEBase):
+        raise ValueError(
+            'MIME attachments cannot be queued, attach the file content '
+            'instead.')
+    filename, content, mimetype = attachment
+    if isinstance(content, bytes):
+        return [filename, base64.b64encode(content).decode(), mimetype, True]
+    return [filename, content, mimetype, False]
+
+
+def _load_attachment(attachment):
+    filename, content, mimetype, encoded = attachment
+    if encoded:
+        content = base64.b64decode(content)
+    return filename, content, mimetype
+
+
+def enqueue(messages):
+    """
+    Stores email messages in the queue with one INSERT. Returns the number
+    of queued messages. Raises ValueError for messages with MIME attachments,
+    which the queue cannot store.
+    """
+    emails = [
+        OutboundEmail(
+            subject=str(message.subject),
+            body=str(message.body),
+            from_email=message.from_email or '',
+            to=list(message.to),
+            cc=list(message.cc),
+            bcc=list(message.bcc),
+            reply_to=list(message.reply_to),
+            headers=dict(message.extra_headers),
+            alternatives=[
+                [content, mimetype]
+                for content, mimetype in getattr(message, 'alternatives', [])
+            ],
+            content_subtype=message.content_subtype,
+            attachments=[
+                _dump_attachment(attachment)
+                for attachment in message.attachments
+            ],
+        )
+        for message in messages
+    ]
+    OutboundEmail.objects.bulk_create(emails)
+    return len(emails)
+
+
+def to_message(email):
+    """
+    Rebuilds the email message of a queued email.
+    """
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+    )
+    message.content_subtype = email.content_subtype
+    for content, mimetype in email.alternatives:
+        message.attach_alternative(content, mimetype)
+    for attachment in email.attachments:
+        message.attach(*_load_attachment(attachment))
+    return message
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Email backend adding messages to the OutboundEmail queue instead of
+    sending them.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        return enqueue(email_messages)
+
+
+def _claim(now, batch_size):
+    """
+    Leases up to batch_size due emails to this worker.
+    """
+    with transaction.atomic():
+        emails = OutboundEmail.objects.filter(
+            status=OutboundEmail.PENDING,
+            next_attempt_at__lte=now,
+        ).order_by('next_attempt_at', 'id')
+        # Lets several workers share the queue on PostgreSQL
+        if connection.features.has_select_for_update_skip_locked:
+            emails = emails.select_for_update(skip_locked=True)
+        emails = list(emails[:batch_size])
+        OutboundEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(next_attempt_at=now + LEASE_TIMEOUT)
+    return emails
+
+
+def send_queued(batch_size=BATCH_SIZE, now=None):
+    """
+    Delivers up to batch_size due emails over one connection of
+    MAIL_QUEUE_BACKEND. Returns the numbers of sent and failed emails.
+    """
+    now = now or timezone.now()
+    sent = failed = 0
+    emails = _claim(now, batch_size)
+    if not emails:
+        return sent, failed
+
+    backend = get_connection(settings.MAIL_QUEUE_BACKEND)
+    try:
+        for email in emails:
+            email.attempts += 1
+            try:
+                # No-op while the connection is open
+                backend.open()
+                backend.send_messages([to_message(email)])
+            except Exception as e:
+                # Reconnect for the next email in case the connection is
+                # what failed
+                backend.close()
+                failed += 1
+                email.last_error = f'{type(e).__name__}: {e}'
+                if email.attempts >= MAX_ATTEMPTS:
+                    email.status = OutboundEmail.FAILED
+                    logger.error(
+                        'Giving up on email %s after %d attempts: %s',
+                        email.pk, email.attempts, email.last_error)
+                else:
+                    email.next_attempt_at = now + retry_delay(email.attempts)
+                    logger.warning(
+                        'Email %s failed, retrying at %s: %s',
+                        email.pk, email.next_attempt_at, email.last_error)
+            else:
+                sent += 1
+                email.status = OutboundEmail.SENT
+                email.sent_at = now
+                email.last_error = ''
+    finally:
+        backend.close()
+        # Also records the emails handled before an unexpected error, the
+        # others are retried when their lease expires
+        OutboundEmail.objects.bulk_update(emails, [
+            'status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at',
+        ])
+    return sent, failed
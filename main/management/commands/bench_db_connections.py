@@ -0,0 +1,138 @@
+import statistics
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+
+# Connection settings of each mode. Pooling needs PostgreSQL and psycopg 3.
+MODES = {
+    'fresh': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'pool': None},
+    'persistent': {
+        'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True, 'pool': None},
+    'pool': {
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False,
+        'pool': {'min_size': 1, 'max_size': 4},
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks request latency with a new database connection per '
+        'request, with persistent connections and with a connection pool. '
+        'Requests go through the full WSGI handler, which opens and closes '
+        'connections as in production. Run it against a local PostgreSQL '
+        'server through DATABASE_URL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Number of requests measured per mode.',
+        )
+        parser.add_argument(
+            '--path',
+            default='/events/',
+            help='Path of the page to request.',
+        )
+        parser.add_argument(
+            '--username',
+            help='User to request the page as. Defaults to the first user.',
+        )
+        parser.add_argument(
+            '--mode',
+            action='append',
+            choices=list(MODES),
+            help='Mode to measure; may be repeated. Defaults to all modes '
+                 'the database supports.',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections['default']
+        modes = options['mode'] or [
+            mode for mode in MODES
+            if mode != 'pool' or connection.vendor == 'postgresql'
+        ]
+        if 'pool' in modes and connection.vendor != 'postgresql':
+            raise CommandError('Connection pooling requires PostgreSQL.')
+
+        user = (
+            User.objects.get(username=options['username'])
+            if options['username']
+            else User.objects.order_by('id').first()
+        )
+        if user is None:
+            raise CommandError('There are no users to request the page as.')
+        client = Client()
+        client.force_login(user)
+        cookie = (
+            f'{settings.SESSION_COOKIE_NAME}='
+            f'{client.cookies[settings.SESSION_COOKIE_NAME].value}'
+        )
+
+        handler = WSGIHandler()
+        original = dict(connection.settings_dict)
+        original_options = dict(original.get('OPTIONS', {}))
+        try:
+            for mode in modes:
+                self.configure(connection, MODES[mode])
+                # Warm the caches and, for the pool, its connections
+                for _ in range(5):
+                    self.request(handler, options['path'], cookie)
+                latencies = [
+                    self.request(handler, options['path'], cookie)
+                    for _ in range(options['requests'])
+                ]
+                self.report(mode, latencies)
+        finally:
+            self.configure(connection, {
+                'CONN_MAX_AGE': original['CONN_MAX_AGE'],
+                'CONN_HEALTH_CHECKS': original['CONN_HEALTH_CHECKS'],
+                'pool': original_options.get('pool'),
+            })
+            client.logout()
+
+    def configure(self, connection, mode):
+        connection.close()
+        if connection.vendor == 'postgresql':
+            connection.close_pool()
+        connection.settings_dict['CONN_MAX_AGE'] = mode['CONN_MAX_AGE']
+        connection.settings_dict['CONN_HEALTH_CHECKS'] = (
+            mode['CONN_HEALTH_CHECKS'])
+        db_options = connection.settings_dict.setdefault('OPTIONS', {})
+        if mode['pool']:
+            db_options['pool'] = mode['pool']
+        else:
+            db_options.pop('pool', None)
+
+    def request(self, handler, path, cookie):
+        environ = {}
+        setup_testing_defaults(environ)
+        environ.update(PATH_INFO=path, HTTP_COOKIE=cookie)
+        statuses = []
+        start = time.perf_counter()
+        response = handler(
+            environ, lambda status, headers: statuses.append(status))
+        for _ in response:
+            pass
+        # Sends request_finished, which closes or returns the connection
+        response.close()
+        elapsed = time.perf_counter() - start
+        if not statuses[0].startswith('200'):
+            raise CommandError(f'{path} returned {statuses[0]}.')
+        return elapsed
+
+    def report(self, mode, latencies):
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{mode}: p50 {statistics.median(latencies) * 1000:.2f} ms, '
+            f'p99 {percentiles[98] * 1000:.2f} ms '
+            f'over {len(latencies)} requests')
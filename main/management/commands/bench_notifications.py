@@ -0,0 +1,98 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main import notifications
+from main.models import Event, Notification, NotificationSetting, Skill
+from main.query_budget import QueryStats
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the notification fan-out of a new event to many '
+        'subscribers. Everything it creates is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--subscribers',
+            type=int,
+            default=50000,
+            help='Number of subscribed users to create.',
+        )
+        parser.add_argument(
+            '--opted-out',
+            type=int,
+            default=1000,
+            help='Number of additional users who opted out of new events.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['subscribers'], options['opted_out'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def measure(self, label, func):
+        stats = QueryStats()
+        start = time.perf_counter()
+        with connection.execute_wrapper(stats):
+            result = func()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{label}: {elapsed * 1000:.0f} ms, {stats.count} queries '
+            f'({stats.duration * 1000:.0f} ms in the database)')
+        return result
+
+    def run(self, subscribers, opted_out):
+        total = subscribers + opted_out
+        self.stdout.write(f'Creating {total} users...')
+        # Users created in bulk skip the profile signal, which the fan-out
+        # does not need
+        User.objects.bulk_create([
+            User(username=f'bench_user_{i}', email=f'bench{i}@example.com')
+            for i in range(total)
+        ], batch_size=5000)
+        opted_out_ids = User.objects.filter(
+            username__startswith='bench_user_',
+        ).order_by('id').values_list('id', flat=True)[:opted_out]
+        NotificationSetting.objects.bulk_create([
+            NotificationSetting(user_id=user_id, new_event=False)
+            for user_id in opted_out_ids
+        ], batch_size=5000)
+
+        owner = User.objects.create(username='bench_owner')
+        skill = Skill.objects.create(name='Benchmark', description='')
+        event = Event.objects.create(
+            title='Benchmark event',
+            overview='',
+            date_time=timezone.now() + timedelta(days=1),
+            skill=skill,
+            owner=owner,
+        )
+
+        created = self.measure(
+            'Fan-out', lambda: notifications.notify_new_event(event))
+        self.stdout.write(f'Created {created} notification(s)')
+
+        def send_all():
+            sent = 0
+            while processed := notifications.send_pending():
+                sent += processed
+            return sent
+
+        sent = self.measure('Email queueing', send_all)
+        self.stdout.write(f'Queued {sent} email(s)')
+        pending = Notification.objects.filter(sent_at__isnull=True).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Done, {pending} notification(s) left pending. Rolling back.'))
@@ -0,0 +1,147 @@
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+SERVER_START_TIMEOUT = 30
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-tests a page served by gunicorn in WSGI mode (sync workers) '
+        'and in ASGI mode (uvicorn workers), with the same number of '
+        'workers, and reports throughput and latency. The servers use the '
+        'configured database, so run it against a local copy.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Number of requests measured per mode.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help='Number of requests in flight at a time.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Number of gunicorn workers.',
+        )
+        parser.add_argument(
+            '--path',
+            default='/events/',
+            help='Path of the page to request.',
+        )
+        parser.add_argument(
+            '--username',
+            help='User to request the page as. Defaults to the first user.',
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8765,
+            help='Local port to run the servers on.',
+        )
+        parser.add_argument(
+            '--mode',
+            action='append',
+            choices=['wsgi', 'asgi'],
+            help='Mode to measure; may be repeated. Defaults to both.',
+        )
+
+    def handle(self, *args, **options):
+        user = (
+            User.objects.get(username=options['username'])
+            if options['username']
+            else User.objects.order_by('id').first()
+        )
+        if user is None:
+            raise CommandError('There are no users to request the page as.')
+        client = Client()
+        client.force_login(user)
+        cookie = (
+            f'{settings.SESSION_COOKIE_NAME}='
+            f'{client.cookies[settings.SESSION_COOKIE_NAME].value}'
+        )
+        url = f'http://127.0.0.1:{options["port"]}{options["path"]}'
+
+        try:
+            for mode in options['mode'] or ['wsgi', 'asgi']:
+                server = self.start(mode, options['port'], options['workers'])
+                try:
+                    # Warm the workers and caches
+                    self.load(url, cookie, options['concurrency'],
+                              options['concurrency'])
+                    self.report(mode, *self.load(
+                        url, cookie, options['requests'],
+                        options['concurrency']))
+                finally:
+                    server.terminate()
+                    server.wait()
+        finally:
+            client.logout()
+
+    def start(self, mode, port, workers):
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn',
+             '--bind', f'127.0.0.1:{port}',
+             '--workers', str(workers)],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'SERVER_MODE': mode},
+        )
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'The {mode} server failed to start.')
+            try:
+                socket.create_connection(('127.0.0.1', port), 1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'The {mode} server did not start in time.')
+
+    def fetch(self, url, cookie):
+        request = urllib.request.Request(url, headers={'Cookie': cookie})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+                ok = response.status == 200
+        except OSError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    def load(self, url, cookie, requests, concurrency):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(
+                lambda _: self.fetch(url, cookie), range(requests)))
+        elapsed = time.perf_counter() - start
+        latencies = [latency for latency, ok in results if ok]
+        errors = len(results) - len(latencies)
+        return latencies, errors, elapsed
+
+    def report(self, mode, latencies, errors, elapsed):
+        if len(latencies) < 2:
+            raise CommandError(f'Too many failed requests in {mode} mode.')
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{mode}: {len(latencies) / elapsed:.0f} requests/s, '
+            f'p50 {statistics.median(latencies) * 1000:.1f} ms, '
+            f'p99 {percentiles[98] * 1000:.1f} ms, {errors} error(s)')
@@ -0,0 +1,215 @@
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import timezone
+
+from main import popularity
+from main.forms import ContactForm, EditEventForm, EventForm, SkillForm
+from main.fragments import FRAGMENT_CACHE_TIMEOUT
+from main.models import Event, NotificationSetting, Profile, Skill
+from main.template_warmup import TEMPLATES_DIR
+
+PAGE_TEMPLATES_DIR = TEMPLATES_DIR / 'main'
+
+
+class Rollback(Exception):
+    pass
+
+
+def page_templates():
+    """
+    Returns the names of the page templates under main/templates/main/.
+    """
+    return sorted(
+        f'main/{path.name}' for path in PAGE_TEMPLATES_DIR.glob('*.html'))
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks rendering each page template with a context like its '
+        'view\'s, through the configured template loaders, and reports the '
+        'first render (which compiles the template unless it was warmed up) '
+        'and the p50 and p99 of the following ones. Everything it creates '
+        'is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Number of renders measured per template.',
+        )
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=20,
+            help='Number of skills, events and participants listed.',
+        )
+        parser.add_argument(
+            '--template',
+            action='append',
+            help='Only benchmark this template, e.g. main/events.html. '
+                 'Can be repeated.',
+        )
+        parser.add_argument(
+            '--max-ms',
+            type=float,
+            help='Fail if the p99 render time of a template exceeds this.',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1.')
+        names = options['template'] or page_templates()
+        try:
+            with transaction.atomic():
+                results = self.run(
+                    names, options['iterations'], options['items'])
+                raise Rollback
+        except Rollback:
+            pass
+        if options['max_ms'] is not None:
+            slow = [
+                name for name, p99 in results
+                if p99 * 1000 > options['max_ms']
+            ]
+            if slow:
+                raise CommandError(
+                    f'p99 render time over {options["max_ms"]} ms: '
+                    + ', '.join(slow))
+
+    def run(self, names, iterations, items):
+        contexts = self.contexts(items)
+        missing = [name for name in names if name not in contexts]
+        if missing:
+            raise CommandError(
+                'No benchmark context for ' + ', '.join(missing))
+
+        results = []
+        for name in names:
+            request, context = contexts[name]
+            start = time.perf_counter()
+            render_to_string(name, context, request=request)
+            first = time.perf_counter() - start
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                render_to_string(name, context, request=request)
+                timings.append(time.perf_counter() - start)
+            if len(timings) > 1:
+                p99 = statistics.quantiles(timings, n=100)[98]
+            else:
+                p99 = max(timings)
+            self.stdout.write(
+                f'{name}: first {first * 1000:.2f} ms, '
+                f'p50 {statistics.median(timings) * 1000:.2f} ms, '
+                f'p99 {p99 * 1000:.2f} ms')
+            results.append((name, p99))
+        return results
+
+    def contexts(self, items):
+        """
+        Creates the data the pages list, and returns the request and context
+        each page template is rendered with, as its view would.
+        """
+        now = timezone.now()
+        mentor = User.objects.create_user(
+            username='bench_mentor', email='mentor@example.com')
+        Profile.objects.filter(user=mentor).update(
+            is_mentor=True,
+            about_me='Mentor of the template benchmark. ' * 10,
+            facebook_link='https://facebook.com/bench_mentor',
+            linkedin_link='https://linkedin.com/in/bench_mentor',
+        )
+        profile = Profile.objects.get(user=mentor)
+        skills = Skill.objects.bulk_create([
+            Skill(name=f'Bench skill {i}', description='Description. ' * 20)
+            for i in range(items)
+        ])
+        profile.skills.add(*skills)
+        skill = skills[0]
+        events = Event.objects.bulk_create([
+            Event(
+                title=f'Bench event {i}',
+                overview='Overview of the event. ' * 20,
+                date_time=now + timedelta(days=i + 1),
+                skill=skill,
+                owner=mentor,
+            )
+            for i in range(items)
+        ])
+        event = events[0]
+        participants = User.objects.bulk_create([
+            User(username=f'bench_participant_{i}') for i in range(items)
+        ])
+        event.participants.add(mentor, *participants)
+
+        request = RequestFactory().get('/')
+        request.user = mentor
+        fragment_version = uuid.uuid4().hex
+        plain = (request, {})
+        return {
+            'main/base.html': plain,
+            'main/home.html': plain,
+            'main/about.html': plain,
+            'main/terms_privacy.html': plain,
+            'main/contact.html': (request, {'form': ContactForm()}),
+            'main/dashboard.html': (request, {
+                'upcoming_events': events,
+                'recent_skills': skills,
+                'popular_skills': popularity.popular_skills(),
+            }),
+            'main/settings.html': (request, {
+                'digest_choices': NotificationSetting.DIGEST_CHOICES,
+            }),
+            'main/profile.html': (request, {
+                'user': mentor,
+                'profile': profile,
+                'all_skills': Skill.objects.all(),
+                'skills': skills,
+            }),
+            'main/mentor_skills.html': (request, {
+                'skills': skills, 'is_mentor': True, 'query': None,
+            }),
+            'main/mentor_add_skill.html': (request, {'form': SkillForm()}),
+            'main/skill_detail.html': (request, {
+                'skill': skill,
+                'upcoming_events': Event.objects.filter(
+                    skill=skill).order_by('date_time'),
+                'is_mentor': True,
+                'is_owner': True,
+                'fragment_version': fragment_version,
+                'fragment_timeout': FRAGMENT_CACHE_TIMEOUT,
+            }),
+            'main/events.html': (request, {
+                'events': events,
+                'query': None,
+                'event_date': None,
+                'next_page_query': 'cursor=bench',
+            }),
+            'main/event_detail.html': (request, {
+                'event': event,
+                'is_participant': True,
+                'is_owner': True,
+                'participants': {
+                    'names': sorted(user.username for user in participants),
+                    'more': False,
+                },
+                'fragment_version': fragment_version,
+                'fragment_timeout': FRAGMENT_CACHE_TIMEOUT,
+            }),
+            'main/add_event.html': (request, {
+                'form': EventForm(), 'skill': skill,
+            }),
+            'main/edit_event.html': (request, {
+                'form': EditEventForm(instance=event), 'event': event,
+            }),
+        }
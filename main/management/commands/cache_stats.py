@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from main import caching
+
+
+class Command(BaseCommand):
+    help = (
+        'Reports the cache hits and misses of every subsystem, counted '
+        'across all processes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counts after reporting them.',
+        )
+
+    def handle(self, *args, **options):
+        caching.flush_metrics()
+        for namespace, counts in caching.metrics().items():
+            lookups = counts['hits'] + counts['misses']
+            ratio = counts['hits'] / lookups if lookups else 0
+            self.stdout.write(
+                f'{namespace}: {counts["hits"]} hit(s), '
+                f'{counts["misses"]} miss(es), {ratio:.0%} hit ratio')
+        if options['reset']:
+            caching.reset_metrics()
+            self.stdout.write(self.style.SUCCESS('Reset the cache metrics.'))
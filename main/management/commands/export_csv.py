@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from main import exports
+from main.models import Event, Skill
+
+EXPORTS = {
+    'events': (Event.objects.order_by('date_time', 'id'),
+               exports.EVENT_EXPORT_FIELDS),
+    'skills': (Skill.objects.order_by('name', 'id'),
+               exports.SKILL_EXPORT_FIELDS),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes every event or skill as CSV, streaming the rows from the '
+        'database in chunks so that memory use does not grow with the table.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=list(EXPORTS))
+        parser.add_argument(
+            '--output',
+            help='File to write to. Defaults to standard output.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=exports.EXPORT_CHUNK_SIZE,
+            help='Number of rows fetched from the database at a time.',
+        )
+
+    def handle(self, *args, **options):
+        queryset, fields = EXPORTS[options['table']]
+        lines = exports.csv_lines(
+            queryset, fields, chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
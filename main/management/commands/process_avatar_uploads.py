@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import avatars
+
+
+class Command(BaseCommand):
+    help = (
+        'Resizes the queued profile picture uploads and stores their '
+        'variants. Run with --loop as the worker process, or without it to '
+        'process what is due once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=avatars.BATCH_SIZE,
+            help='Number of uploads claimed at a time.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=avatars.PROCESS_WORKERS,
+            help='Number of threads resizing and storing pictures.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the queue instead of exiting when it is empty.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2,
+            help='Seconds to wait between polls of an empty queue.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total_done = total_failed = 0
+            while True:
+                done, failed = avatars.process_pending(
+                    options['batch_size'], options['workers'])
+                total_done += done
+                total_failed += failed
+                if done + failed < options['batch_size']:
+                    break
+            if total_done or total_failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Processed {total_done} upload(s), '
+                    f'{total_failed} failed.'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from main import popularity
+
+
+class Command(BaseCommand):
+    help = (
+        'Removes events that have passed from skill popularity scores. '
+        'Intended to be run periodically, e.g. by the Heroku Scheduler.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recompute every popularity score from scratch.',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            popularity.rebuild()
+            self.stdout.write(self.style.SUCCESS(
+                'Rebuilt popularity scores.'))
+            return
+        expired = popularity.expire_past_events()
+        self.stdout.write(self.style.SUCCESS(
+            f'Expired {expired} past event(s) from popularity scores.'))
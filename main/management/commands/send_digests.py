@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from main import notifications
+from main.models import NotificationSetting
+
+
+class Command(BaseCommand):
+    help = (
+        'Queues the notification digest emails of the given frequency. '
+        'Intended to be run hourly and daily, e.g. by the Heroku Scheduler.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--frequency',
+            required=True,
+            choices=[
+                NotificationSetting.DIGEST_HOURLY,
+                NotificationSetting.DIGEST_DAILY,
+            ],
+            help='Digest frequency of the users to send digests to.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=notifications.DIGEST_CHUNK_SIZE,
+            help='Number of users loaded at a time.',
+        )
+
+    def handle(self, *args, **options):
+        queued = notifications.send_digests(
+            options['frequency'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Queued {queued} {options["frequency"]} digest(s).'))
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import notifications
+
+
+class Command(BaseCommand):
+    help = (
+        'Queues the emails of the pending notifications. Run with --loop as '
+        'the worker process, or without it to process what is pending once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=notifications.SEND_BATCH_SIZE,
+            help='Number of notifications processed per transaction.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling instead of exiting when nothing is pending.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls when nothing is pending.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total = 0
+            while True:
+                processed = notifications.send_pending(options['batch_size'])
+                total += processed
+                if processed < options['batch_size']:
+                    break
+            if total or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Processed {total} notification(s).'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import mail
+
+
+class Command(BaseCommand):
+    help = (
+        'Delivers the queued outbound emails. Run with --loop as the worker '
+        'process, or without it to deliver what is due once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=mail.BATCH_SIZE,
+            help='Number of emails sent over one connection.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the queue instead of exiting when it is empty.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls of an empty queue.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total_sent = total_failed = 0
+            while True:
+                sent, failed = mail.send_queued(options['batch_size'])
+                total_sent += sent
+                total_failed += failed
+                if sent + failed < options['batch_size']:
+                    break
+            if total_sent or total_failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Sent {total_sent} email(s), {total_failed} failed.'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
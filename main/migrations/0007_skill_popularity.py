@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:03
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def backfill_popularity(apps, schema_editor):
+    Skill = apps.get_model('main', 'Skill')
+    Event = apps.get_model('main', 'Event')
+
+    upcoming = Event.objects.filter(date_time__gte=timezone.now())
+    upcoming.update(popularity_counted=True)
+    totals = (
+        Event.participants.through.objects
+        .filter(event__popularity_counted=True)
+        .values('event__skill_id')
+        .annotate(total=Count('id'))
+    )
+    for row in totals:
+        Skill.objects.filter(id=row['event__skill_id']).update(
+            popularity=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_delete_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='popularity_counted',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='popularity',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_popularity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# Full-text search index over Skill.name and Skill.description, see
+# main/search.py. PostgreSQL gets an expression GIN index matching the
+# weighted tsvector used by the search queries; SQLite gets an FTS5 table.
+
+
+def skill_search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector('name', weight='A', config='english')
+        + SearchVector('description', weight='B', config='english')
+    )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+
+        Skill = apps.get_model('main', 'Skill')
+        schema_editor.add_index(Skill, GinIndex(
+            skill_search_vector(), name='skill_search_idx'))
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE main_skill_fts USING fts5('
+            "name, description, tokenize='unicode61 remove_diacritics 2', "
+            "prefix='2 3')"
+        )
+        schema_editor.execute(
+            'INSERT INTO main_skill_fts (rowid, name, description) '
+            'SELECT id, name, description FROM main_skill'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS skill_search_idx')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS main_skill_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_skill_popularity'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
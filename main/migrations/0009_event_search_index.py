@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# Full-text search index over Event.title and Event.overview, see
+# main/search.py. PostgreSQL gets an expression GIN index matching the
+# weighted tsvector used by the search queries; SQLite gets an FTS5 table.
+
+
+def event_search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector('title', weight='A', config='english')
+        + SearchVector('overview', weight='B', config='english')
+    )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+
+        Event = apps.get_model('main', 'Event')
+        schema_editor.add_index(Event, GinIndex(
+            event_search_vector(), name='event_search_idx'))
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE main_event_fts USING fts5('
+            "title, overview, tokenize='unicode61 remove_diacritics 2', "
+            "prefix='2 3')"
+        )
+        schema_editor.execute(
+            'INSERT INTO main_event_fts (rowid, title, overview) '
+            'SELECT id, title, overview FROM main_event'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS event_search_idx')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS main_event_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_skill_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
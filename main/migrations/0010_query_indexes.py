@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_event_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                fields=['date_time', 'id'], name='event_date_time_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                fields=['skill', 'date_time'], name='event_skill_date_time_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(
+                condition=models.Q(('popularity_counted', True)),
+                fields=['date_time'],
+                name='event_counted_date_time_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(
+                condition=models.Q(('is_mentor', True)),
+                fields=['id'],
+                name='profile_mentor_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_outboundemail'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'kind',
+                    models.CharField(
+                        choices=[
+                            ('new_event', 'New event'),
+                            ('new_skill', 'New skill'),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notificationsetting',
+            index=models.Index(
+                condition=models.Q(('new_event', False)),
+                fields=['user'],
+                name='notif_setting_no_event_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='notificationsetting',
+            index=models.Index(
+                condition=models.Q(('new_skill', False)),
+                fields=['user'],
+                name='notif_setting_no_skill_idx',
+            ),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='event',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='+',
+                to='main.event',
+            ),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='skill',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='+',
+                to='main.skill',
+            ),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='user',
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='notifications',
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(
+                condition=models.Q(('sent_at__isnull', True)),
+                fields=['id'],
+                name='notification_unsent_idx',
+            ),
+        ),
+    ]
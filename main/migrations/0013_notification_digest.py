@@ -0,0 +1,77 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_notification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestEntry',
+            fields=[
+                (
+                    'id',
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notificationsetting',
+            name='digest',
+            field=models.CharField(
+                choices=[('off', 'Off'), ('hourly', 'Hourly'), ('daily', 'Daily')],
+                default='off',
+                max_length=10,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='notificationsetting',
+            index=models.Index(
+                condition=models.Q(('digest', 'off'), _negated=True),
+                fields=['user'],
+                name='notif_setting_digest_idx',
+            ),
+        ),
+        migrations.AddField(
+            model_name='digestentry',
+            name='event',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='+',
+                to='main.event',
+            ),
+        ),
+        migrations.AddField(
+            model_name='digestentry',
+            name='skill',
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='+',
+                to='main.skill',
+            ),
+        ),
+        migrations.AddField(
+            model_name='digestentry',
+            name='user',
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='digest_entries',
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:56
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_participant_count(apps, schema_editor):
+    Event = apps.get_model('main', 'Event')
+
+    totals = (
+        Event.participants.through.objects
+        .values('event_id')
+        .annotate(total=Count('id'))
+    )
+    for row in totals:
+        Event.objects.filter(id=row['event_id']).update(
+            participant_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_notification_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='capacity',
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text='Maximum number of participants. Leave empty for no limit.',
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='participant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            backfill_participant_count, migrations.RunPython.noop),
+    ]
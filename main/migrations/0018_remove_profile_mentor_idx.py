@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:17
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_outbound_email_attachments'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='profile',
+            name='profile_mentor_idx',
+        ),
+    ]
@@ -1,10 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from cloudinary.models import CloudinaryField
 
 # Profile model represents the user's profile information.
 # It is linked to the User model via a one-to-one relationship.
 # This model includes fields for profile picture, about me section, social media links, skills, and mentor status.
+# avatar_variants maps each size of the resized profile picture to its file in the avatars storage (see main/avatars.py),
+# and avatar_version is the id of the AvatarUpload they were made from.
 
 
 class Profile(models.Model):
@@ -15,12 +18,25 @@ class Profile(models.Model):
     linkedin_link = models.URLField(blank=True, null=True)
     skills = models.ManyToManyField('Skill', related_name='profiles')
     is_mentor = models.BooleanField(default=False)
+    avatar_variants = models.JSONField(default=dict, blank=True)
+    avatar_version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.user.username
 
+    @property
+    def avatar(self):
+        """
+        URLs of the profile picture, see main/avatars.py.
+        """
+        from .avatars import avatar_image
+        return avatar_image(self)
+
+
 # Skill model represents the skills that users can add to their profiles.
 # It includes fields for the skill name, description, and timestamps for creation and updates.
+# The popularity field is a maintained count of participants registered for upcoming events
+# of the skill (see main/popularity.py), so the dashboard never has to aggregate it.
 # This model is related to the Profile model via a many-to-many relationship.
 
 
@@ -29,6 +45,7 @@ class Skill(models.Model):
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    popularity = models.PositiveIntegerField(default=0, db_index=True)
 
     def __str__(self):
         return self.name
@@ -36,6 +53,9 @@ class Skill(models.Model):
 # Event model represents the events that users can create and participate in.
 # It includes fields for the event title, overview, date and time, and relationships to the Skill and User models.
 # This model is related to the Skill model via a foreign key and to the User model via a many-to-many relationship for participants and a foreign key for the owner.
+# popularity_counted records whether the event's participants are currently included in Skill.popularity.
+# participant_count is a maintained count of the participants, and capacity an optional limit enforced on registration (see main/registration.py).
+# updated_at changes with the event and with its participants, and marks when the pages showing the event changed (see main/conditional.py).
 
 
 class Event(models.Model):
@@ -46,21 +66,244 @@ class Event(models.Model):
         Skill, on_delete=models.CASCADE, related_name='events')
     participants = models.ManyToManyField(User, related_name='events')
     owner = models.ForeignKey(User, on_delete=models.CASCADE, default=1)
+    popularity_counted = models.BooleanField(default=False, editable=False)
+    participant_count = models.PositiveIntegerField(default=0, editable=False)
+    capacity = models.PositiveIntegerField(
+        blank=True, null=True,
+        help_text='Maximum number of participants. Leave empty for no limit.')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Upcoming events listing: date_time range, ordered by
+            # (date_time, id) for keyset pagination
+            models.Index(
+                fields=['date_time', 'id'], name='event_date_time_idx'),
+            # Skill detail: events of a skill ordered by date_time
+            models.Index(
+                fields=['skill', 'date_time'],
+                name='event_skill_date_time_idx',
+            ),
+            # Popularity expiry: counted events that have passed
+            models.Index(
+                fields=['date_time'],
+                condition=models.Q(popularity_counted=True),
+                name='event_counted_date_time_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    # Only changed by targeted updates in main/popularity.py and
+    # main/registration.py, so a stale instance must never write them back
+    MAINTAINED_FIELDS = ('popularity_counted', 'participant_count')
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [
+                    f.name for f in self._meta.concrete_fields
+                    if not f.primary_key
+                ]
+            kwargs['update_fields'] = [
+                name for name in update_fields
+                if name not in self.MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 # NotificationSetting model represents the notification preferences for users.
 # It includes fields for new message notifications, new event notifications, and new skill notifications.
+# digest batches the user's notifications into one hourly or daily email instead of one email each.
 # This model is related to the User model via a foreign key.
 
 
 class NotificationSetting(models.Model):
+    DIGEST_OFF = 'off'
+    DIGEST_HOURLY = 'hourly'
+    DIGEST_DAILY = 'daily'
+    DIGEST_CHOICES = [
+        (DIGEST_OFF, 'Off'),
+        (DIGEST_HOURLY, 'Hourly'),
+        (DIGEST_DAILY, 'Daily'),
+    ]
+
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='notification_settings')
     new_message = models.BooleanField(default=True)
     new_event = models.BooleanField(default=True)
     new_skill = models.BooleanField(default=True)
+    digest = models.CharField(
+        max_length=10, choices=DIGEST_CHOICES, default=DIGEST_OFF)
+
+    class Meta:
+        indexes = [
+            # Notification fan-out splits off the users who get digests
+            models.Index(
+                fields=['user'],
+                condition=~models.Q(digest='off'),
+                name='notif_setting_digest_idx',
+            ),
+            # Notification fan-out excludes the (few) users who opted out
+            models.Index(
+                fields=['user'],
+                condition=models.Q(new_event=False),
+                name='notif_setting_no_event_idx',
+            ),
+            models.Index(
+                fields=['user'],
+                condition=models.Q(new_skill=False),
+                name='notif_setting_no_skill_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Notification settings for {self.user.username}"
+
+# Notification model represents a notification about new content sent to one user (see main/notifications.py).
+# Notifications are created in bulk when an event or skill is added and are delivered by email by the send_notifications worker.
+# sent_at is set once the notification has been handed to the email queue.
+
+
+class Notification(models.Model):
+    NEW_EVENT = 'new_event'
+    NEW_SKILL = 'new_skill'
+    KIND_CHOICES = [
+        (NEW_EVENT, 'New event'),
+        (NEW_SKILL, 'New skill'),
+    ]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    skill = models.ForeignKey(
+        Skill, on_delete=models.CASCADE, blank=True, null=True,
+        related_name='+')
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, blank=True, null=True,
+        related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # The worker polls the notifications not sent yet
+            models.Index(
+                fields=['id'],
+                condition=models.Q(sent_at__isnull=True),
+                name='notification_unsent_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.user.username}"
+
+# DigestEntry model is a pending item of a user's next digest email (see main/notifications.py).
+# Entries are new events of the user's skills, or new skills, and are deleted once the send_digests command has queued the digest.
+
+
+class DigestEntry(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='digest_entries')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='+')
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, blank=True, null=True,
+        related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Digest entry for {self.user.username}"
+
+# OutboundEmail model is the durable queue of outgoing emails (see main/mail.py).
+# Emails sent through the QueuedEmailBackend are stored here by the request and delivered by the send_queued_mail worker.
+# Failed deliveries are retried with an increasing delay until MAX_ATTEMPTS is reached.
+
+
+class OutboundEmail(models.Model):
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    subject = models.TextField()
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict)
+    # (content, mimetype) pairs, e.g. the HTML version of allauth's emails
+    alternatives = models.JSONField(default=list)
+    # Subtype of the body, 'html' for HTML-only messages
+    content_subtype = models.CharField(max_length=20, default='plain')
+    # (filename, content, mimetype, base64) lists, binary content is stored
+    # base64 encoded
+    attachments = models.JSONField(default=list)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # The worker polls the pending emails that are due
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(status='pending'),
+                name='outboundemail_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)}"
+
+# AvatarUpload model is the queue of uploaded profile pictures waiting to be resized (see main/avatars.py).
+# The profile view stores the validated original here and the process_avatar_uploads worker renders and stores its variants.
+# The original is kept in the database so every worker can read it, and is cleared once the upload is done.
+# A worker leases an upload by moving next_attempt_at forward, so the uploads of a crashed worker are picked up again.
+
+
+class AvatarUpload(models.Model):
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name='avatar_uploads')
+    original = models.BinaryField()
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # The worker polls the unfinished uploads that are due
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(status__in=['pending', 'processing']),
+                name='avatarupload_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Profile picture upload {self.pk} of {self.profile}"
@@ -0,0 +1,256 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core.mail import EmailMessage
+from django.db import connection, transaction
+from django.db.models import Exists, ForeignKey, OuterRef, Q, Value
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils import timezone
+
+from . import mail
+from .models import DigestEntry, Notification, NotificationSetting
+
+# Notification fan-out.
+# When an event or a skill is added, notify() selects the users who have not
+# opted out of that kind of notification (NotificationSetting) with a single
+# anti-join on partial indexes and creates their Notification rows in the
+# same statement (INSERT ... SELECT), so the recipients never reach Python
+# and the request runs the same queries whatever the number of subscribers.
+# The send_notifications worker then turns the pending
+# notifications into queued emails, a batch at a time.
+# Users in digest mode get a DigestEntry instead, only for new events of the
+# skills on their profile and for new skills, and the send_digests command
+# queues one email per user with all their entries.
+
+SEND_BATCH_SIZE = 500
+DIGEST_CHUNK_SIZE = 500
+
+
+def recipients(kind, exclude_user_id=None):
+    """
+    Returns the ids of the active users subscribed to immediate notifications
+    of kind. Users without a NotificationSetting get the model defaults, i.e.
+    are subscribed.
+    """
+    opted_out = NotificationSetting.objects.filter(
+        Q(**{kind: False}) | ~Q(digest=NotificationSetting.DIGEST_OFF),
+        user=OuterRef('pk'),
+    )
+    users = User.objects.filter(is_active=True).filter(~Exists(opted_out))
+    if exclude_user_id is not None:
+        users = users.exclude(pk=exclude_user_id)
+    return users.values_list('pk', flat=True)
+
+
+def digest_recipients(kind, skill, exclude_user_id=None):
+    """
+    Returns the ids of the active users in digest mode subscribed to
+    notifications of kind. New events only go to users with the event's
+    skill on their profile.
+    """
+    users = User.objects.filter(
+        is_active=True,
+        notification_settings__digest__in=[
+            NotificationSetting.DIGEST_HOURLY,
+            NotificationSetting.DIGEST_DAILY,
+        ],
+        **{f'notification_settings__{kind}': True},
+    )
+    if kind == Notification.NEW_EVENT:
+        users = users.filter(profile__skills=skill)
+    if exclude_user_id is not None:
+        users = users.exclude(pk=exclude_user_id)
+    return users.values_list('pk', flat=True).distinct()
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _insert_from(model, user_ids, **values):
+    """
+    Inserts a row of model for every user id selected by the user_ids
+    queryset, with the other columns set to values, in one INSERT ... SELECT.
+    Returns the number of rows inserted.
+    """
+    fields = [model._meta.get_field(name) for name in values]
+    rows = user_ids.values_list('pk', *(
+        Value(
+            value.pk if isinstance(field, ForeignKey) and value else value,
+            output_field=(
+                field.target_field if isinstance(field, ForeignKey)
+                else field),
+        )
+        for field, value in zip(fields, values.values())
+    ))
+    select, params = rows.query.sql_with_params()
+    columns = ', '.join(
+        connection.ops.quote_name(field.column)
+        for field in [model._meta.get_field('user'), *fields]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} '
+            f'({columns}) {select}',
+            params,
+        )
+        return cursor.rowcount
+
+
+def notify(kind, actor_id=None, skill=None, event=None):
+    """
+    Creates a notification or digest entry of kind about skill or event for
+    every subscribed user but the actor. Returns the number created.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        created = _insert_from(
+            Notification,
+            recipients(kind, exclude_user_id=actor_id),
+            kind=kind, skill=skill, event=event, created_at=now,
+        )
+        created += _insert_from(
+            DigestEntry,
+            digest_recipients(kind, skill, exclude_user_id=actor_id),
+            skill=skill, event=event, created_at=now,
+        )
+    return created
+
+
+def notify_new_event(event):
+    return notify(
+        Notification.NEW_EVENT,
+        actor_id=event.owner_id,
+        skill=event.skill,
+        event=event,
+    )
+
+
+def notify_new_skill(skill, actor_id):
+    return notify(Notification.NEW_SKILL, actor_id=actor_id, skill=skill)
+
+
+def _absolute_url(path):
+    return f'https://{Site.objects.get_current().domain}{path}'
+
+
+def build_email(notification):
+    """
+    Returns the email message of a notification.
+    """
+    if notification.kind == Notification.NEW_EVENT:
+        event = notification.event
+        subject = f'New event: {event.title}'
+        body = (
+            f'A new {notification.skill.name} event has been scheduled on '
+            f'Skillified.\n\n'
+            f'{event.title}\n'
+            f'{timezone.localtime(event.date_time):%d %B %Y, %H:%M}\n\n'
+            f'{_absolute_url(reverse("event_detail", args=[event.id]))}'
+        )
+    else:
+        skill = notification.skill
+        subject = f'New skill: {skill.name}'
+        body = (
+            f'A mentor has added a new skill on Skillified.\n\n'
+            f'{skill.name}\n{skill.description}\n\n'
+            f'{_absolute_url(reverse("skill_detail", args=[skill.id]))}'
+        )
+    return EmailMessage(subject, body, to=[notification.user.email])
+
+
+def send_pending(batch_size=SEND_BATCH_SIZE):
+    """
+    Queues the emails of up to batch_size pending notifications and marks
+    them as sent. Returns the number of notifications processed.
+    """
+    with transaction.atomic():
+        notifications = (
+            Notification.objects.filter(sent_at__isnull=True)
+            .select_related('user', 'skill', 'event')
+            .order_by('id')
+        )
+        # Lets several workers share the queue on PostgreSQL
+        if connection.features.has_select_for_update_skip_locked:
+            notifications = notifications.select_for_update(
+                skip_locked=True, of=('self',))
+        notifications = list(notifications[:batch_size])
+        if not notifications:
+            return 0
+
+        # Users without an email address are marked as sent all the same
+        mail.enqueue([
+            build_email(notification) for notification in notifications
+            if notification.user.email
+        ])
+        Notification.objects.filter(
+            id__in=[notification.id for notification in notifications]
+        ).update(sent_at=timezone.now())
+    return len(notifications)
+
+
+def send_digests(frequency, chunk_size=DIGEST_CHUNK_SIZE):
+    """
+    Queues one digest email for every user with pending digest entries and
+    the given digest frequency, and deletes the entries. Users are streamed
+    in chunks of chunk_size, with one query for the entries of each chunk,
+    so memory use does not grow with the number of users. Returns the
+    number of digests queued.
+    """
+    template = get_template('main/email/digest.txt')
+    site_url = _absolute_url('')
+    users = (
+        User.objects.filter(
+            is_active=True,
+            notification_settings__digest=frequency,
+        )
+        .filter(Exists(DigestEntry.objects.filter(user=OuterRef('pk'))))
+        .only('id', 'username', 'first_name', 'email')
+        .order_by('id')
+        .distinct()
+    )
+    queued = 0
+    for chunk in _batches(users.iterator(chunk_size=chunk_size), chunk_size):
+        with transaction.atomic():
+            entries = list(
+                DigestEntry.objects.filter(user__in=chunk)
+                .select_related('skill', 'event')
+                .order_by('user_id', 'id')
+            )
+            if not entries:
+                continue
+            entries_by_user = defaultdict(list)
+            for entry in entries:
+                entries_by_user[entry.user_id].append(entry)
+
+            messages = []
+            for user in chunk:
+                user_entries = entries_by_user.get(user.id)
+                if not user_entries or not user.email:
+                    continue
+                body = template.render({
+                    'user': user,
+                    'entries': user_entries,
+                    'frequency': frequency,
+                    'site_url': site_url,
+                })
+                messages.append(EmailMessage(
+                    f'Your {frequency} Skillified digest: '
+                    f'{len(user_entries)} update(s)',
+                    body,
+                    to=[user.email],
+                ))
+            mail.enqueue(messages)
+            queued += len(messages)
+
+            # Entries added since they were read are kept for the next digest
+            DigestEntry.objects.filter(
+                user__in=chunk,
+                id__lte=max(entry.id for entry in entries),
+            ).delete()
+    return queued
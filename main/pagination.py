@@ -0,0 +1,133 @@
+import base64
+import json
+from dataclasses import dataclass, field
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+# Keyset (cursor) pagination.
+# Instead of OFFSET, each page continues from the sort key of the last row of
+# the previous page, so fetching page 500 costs the same as fetching page 1.
+# The ordering must end with a unique field (usually "id") so that the sort
+# key identifies exactly one row.
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorEncoder(json.JSONEncoder):
+    # Unlike DjangoJSONEncoder, keeps full microsecond precision so that the
+    # cursor compares exactly equal to the stored value
+    def default(self, o):
+        if hasattr(o, 'isoformat'):
+            return o.isoformat()
+        return super().default(o)
+
+
+@dataclass
+class KeysetPage:
+    items: list = field(default_factory=list)
+    next_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def _parse_ordering(ordering):
+    return [
+        (name[1:], True) if name.startswith('-') else (name, False)
+        for name in ordering
+    ]
+
+
+def encode_cursor(obj, ordering):
+    """
+    Encodes the sort key of obj as an opaque, URL-safe cursor.
+    """
+    values = [getattr(obj, name) for name, _ in _parse_ordering(ordering)]
+    data = json.dumps(values, cls=CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, queryset, ordering):
+    """
+    Decodes a cursor produced by encode_cursor back into typed values.
+    Raises InvalidCursor if the cursor is malformed.
+    """
+    fields = _parse_ordering(ordering)
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Malformed cursor') from e
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor('Malformed cursor')
+
+    decoded = []
+    for (name, _), value in zip(fields, values):
+        try:
+            model_field = queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations (e.g. a relevance score) are plain JSON values
+            decoded.append(value)
+            continue
+        try:
+            decoded.append(model_field.to_python(value))
+        except ValidationError as e:
+            raise InvalidCursor('Malformed cursor') from e
+    return decoded
+
+
+def _after(ordering, values):
+    """
+    Builds the filter selecting rows that sort strictly after values, e.g.
+    (a > x) OR (a = x AND b > y) for ordering ("a", "b").
+    """
+    fields = _parse_ordering(ordering)
+    condition = Q()
+    for i, (name, descending) in enumerate(fields):
+        lookup = 'lt' if descending else 'gt'
+        clause = Q(**{f'{name}__{lookup}': values[i]})
+        for j, (prev_name, _) in enumerate(fields[:i]):
+            clause &= Q(**{prev_name: values[j]})
+        condition |= clause
+    return condition
+
+
+def keyset_queryset(queryset, ordering, cursor=None):
+    """
+    Returns queryset ordered by ordering and restricted to the rows after
+    cursor.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(
+            _after(ordering, decode_cursor(cursor, queryset, ordering)))
+    return queryset
+
+
+def paginate_keyset(queryset, ordering, cursor=None, page_size=20):
+    """
+    Returns a KeysetPage of at most page_size rows of queryset, ordered by
+    ordering and starting after cursor.
+    """
+    queryset = keyset_queryset(queryset, ordering, cursor)
+    return _page(list(queryset[:page_size + 1]), ordering, page_size)
+
+
+async def apaginate_keyset(queryset, ordering, cursor=None, page_size=20):
+    """
+    Async version of paginate_keyset() for async views.
+    """
+    queryset = keyset_queryset(queryset, ordering, cursor)
+    rows = [row async for row in queryset[:page_size + 1]]
+    return _page(rows, ordering, page_size)
+
+
+def _page(rows, ordering, page_size):
+    page = KeysetPage(items=rows[:page_size])
+    if len(rows) > page_size:
+        page.next_cursor = encode_cursor(rows[page_size - 1], ordering)
+    return page
@@ -0,0 +1,152 @@
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .caching import CacheNamespace
+from .models import Event, Skill
+
+# Skill popularity is the number of participants registered for the upcoming
+# events of a skill. Rather than aggregating over Event and the participants
+# table on every dashboard load, the score is stored on Skill.popularity and
+# adjusted incrementally:
+# - when participants are added to or removed from an event (see signals.py),
+# - when an event is edited, deleted or passes its date_time.
+# The dashboard reads the top skills from the cache, so a warm dashboard costs
+# no queries for this panel however many events and participants exist.
+
+POPULAR_SKILLS_LIMIT = 6
+POPULAR_SKILLS_CACHE_KEY = 'popular_skills'
+POPULAR_SKILLS_CACHE_TIMEOUT = 300
+
+_cache = CacheNamespace('popularity')
+
+Participant = Event.participants.through
+
+
+def _apply(totals, sign):
+    """
+    Applies per-skill participant totals (rows of skill_id/total) to
+    Skill.popularity with the given sign and invalidates the cached ranking.
+    """
+    changed = False
+    for row in totals:
+        if row['total']:
+            # Clamped so that drift can never push the score below zero
+            Skill.objects.filter(id=row['skill_id']).update(
+                popularity=Greatest(F('popularity') + sign * row['total'], 0)
+            )
+            changed = True
+    if changed:
+        _cache.delete(POPULAR_SKILLS_CACHE_KEY)
+
+
+def _totals(participants):
+    """
+    Groups participant rows of counted events by skill.
+    """
+    return (
+        participants.filter(event__popularity_counted=True)
+        .values(skill_id=F('event__skill_id'))
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+
+
+def participants_added(participants):
+    """
+    Adds freshly inserted participant rows to the popularity of their skills.
+    """
+    _apply(_totals(participants), 1)
+
+
+def participants_removed(participants):
+    """
+    Subtracts participant rows that are about to be deleted from the
+    popularity of their skills.
+    """
+    _apply(_totals(participants), -1)
+
+
+def sync_event(event, now=None):
+    """
+    Brings a single event in line with its date_time: upcoming events are
+    counted towards their skill's popularity, past events are not.
+    """
+    now = now or timezone.now()
+    counted = event.date_time >= now
+    # The transition is decided by the stored flag, not by the instance,
+    # which may be stale if the event expired after it was loaded
+    with transaction.atomic():
+        updated = Event.objects.filter(
+            id=event.id, popularity_counted=not counted
+        ).update(popularity_counted=counted)
+        if updated:
+            total = Participant.objects.filter(event_id=event.id).count()
+            _apply([{'skill_id': event.skill_id, 'total': total}],
+                   1 if counted else -1)
+    event.popularity_counted = counted
+
+
+def expire_past_events(now=None):
+    """
+    Removes the participants of events that have passed their date_time from
+    the popularity of their skills. Returns the number of expired events.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = list(
+            Event.objects.select_for_update()
+            .filter(popularity_counted=True, date_time__lt=now)
+            .values_list('id', flat=True)
+        )
+        if not expired:
+            return 0
+        participants_removed(Participant.objects.filter(event_id__in=expired))
+        Event.objects.filter(id__in=expired).update(popularity_counted=False)
+    return len(expired)
+
+
+def rebuild(now=None):
+    """
+    Recomputes every skill's popularity from scratch. Used to repair drift,
+    for example after participant rows were changed outside the ORM.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        Event.objects.update(popularity_counted=False)
+        Event.objects.filter(date_time__gte=now).update(
+            popularity_counted=True)
+        Skill.objects.update(popularity=0)
+        _apply(_totals(Participant.objects.all()), 1)
+    _cache.delete(POPULAR_SKILLS_CACHE_KEY)
+
+
+def popular_skills():
+    """
+    Returns the most popular skills, served from the cache. Past events are
+    expired by the refresh_popularity command, never on this read path.
+    """
+    skills = _cache.get(POPULAR_SKILLS_CACHE_KEY)
+    if skills is None:
+        skills = list(_popular_skills_queryset())
+        _cache.set(POPULAR_SKILLS_CACHE_KEY, skills,
+                   POPULAR_SKILLS_CACHE_TIMEOUT)
+    return skills
+
+
+async def apopular_skills():
+    """
+    Async version of popular_skills() for async views.
+    """
+    skills = await _cache.aget(POPULAR_SKILLS_CACHE_KEY)
+    if skills is None:
+        skills = [skill async for skill in _popular_skills_queryset()]
+        await _cache.aset(POPULAR_SKILLS_CACHE_KEY, skills,
+                          POPULAR_SKILLS_CACHE_TIMEOUT)
+    return skills
+
+
+def _popular_skills_queryset():
+    return Skill.objects.filter(popularity__gt=0).order_by(
+        '-popularity', 'name')[:POPULAR_SKILLS_LIMIT]
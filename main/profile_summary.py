@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+
+from .avatars import AvatarImage
+from .caching import CacheNamespace
+from .models import Profile
+
+# The viewer's profile summary (mentor flag, avatar URLs) is needed by the
+# navbar of every authenticated page and by several views. It is cached per
+# request and across requests, and invalidated by the Profile signals in
+# signals.py, so a warm page costs no Profile query and no avatar URL
+# building.
+
+PROFILE_SUMMARY_CACHE_TIMEOUT = 60 * 60
+
+# Keyed by user id
+_cache = CacheNamespace('profile_summary', version=2)
+
+
+@dataclass(frozen=True)
+class ProfileSummary:
+    profile_id: int
+    is_mentor: bool
+    avatar: AvatarImage = None
+
+
+def _summary_profiles(user_id):
+    return Profile.objects.only(
+        'id', 'is_mentor', 'profile_picture', 'avatar_variants'
+    ).filter(user_id=user_id)
+
+
+def _summary(profile):
+    return ProfileSummary(
+        profile_id=profile.id,
+        is_mentor=profile.is_mentor,
+        avatar=profile.avatar,
+    )
+
+
+def get_profile_summary(request):
+    """
+    Returns the ProfileSummary of the requesting user, or None for
+    anonymous users.
+    """
+    if not hasattr(request, '_profile_summary'):
+        summary = None
+        if request.user.is_authenticated:
+            summary = _cache.get(request.user.id)
+            if summary is None:
+                summary = _summary(_summary_profiles(request.user.id).get())
+                _cache.set(
+                    request.user.id, summary, PROFILE_SUMMARY_CACHE_TIMEOUT)
+        request._profile_summary = summary
+    return request._profile_summary
+
+
+async def aget_profile_summary(request):
+    """
+    Async version of get_profile_summary() for async views. It also resolves
+    request.user, so that rendering does not load the user again.
+    """
+    if not hasattr(request, '_profile_summary'):
+        request.user = user = await request.auser()
+        summary = None
+        if user.is_authenticated:
+            summary = await _cache.aget(user.id)
+            if summary is None:
+                summary = _summary(await _summary_profiles(user.id).aget())
+                await _cache.aset(
+                    user.id, summary, PROFILE_SUMMARY_CACHE_TIMEOUT)
+        request._profile_summary = summary
+    return request._profile_summary
+
+
+def invalidate_profile_summary(user_id):
+    """
+    Drops the cached summary of a user after their profile changed.
+    """
+    _cache.delete(user_id)
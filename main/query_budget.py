@@ -0,0 +1,133 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Per-request SQL accounting.
+# QueryBudgetMiddleware records the number of queries, the total database
+# time and the duplicated SQL statements of every request. Views declare the
+# number of queries they are allowed with the query_budget decorator; going
+# over budget is logged here and fails the test suite (test_query_budgets).
+
+
+def query_budget(max_queries, post=None):
+    """
+    Declares the maximum number of queries a view may run per request,
+    including the session and user lookups of the middleware. post is the
+    budget of POST requests, when they are allowed more.
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        view_func.post_query_budget = post
+        return view_func
+    return decorator
+
+
+class QueryStats:
+    """
+    Database execute wrapper collecting the statistics of one request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        """
+        Number of queries repeating SQL already run in the request.
+        """
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+
+def _wrap_connections(stack, stats):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(stats))
+
+
+class QueryBudgetMiddleware:
+    """
+    Records the query statistics of each request, logs them, and exposes
+    them in X-Query-* response headers when QUERY_STATS_HEADERS is set.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = QueryStats()
+        request.query_budget = None
+        with ExitStack() as stack:
+            _wrap_connections(stack, stats)
+            response = self.get_response(request)
+        return self.report(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        request.query_budget = None
+        # Async views run their queries through sync_to_async, in the thread
+        # of the request's thread-sensitive context, whose connections are
+        # the ones to wrap
+        stack = ExitStack()
+        await sync_to_async(_wrap_connections)(stack, stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.report(request, response, stats)
+
+    def report(self, request, response, stats):
+        budget = request.query_budget
+        over_budget = budget is not None and stats.count > budget
+        log = logger.warning if over_budget else logger.debug
+        log(
+            '%s %s: %d queries (budget %s), %.1f ms, %d duplicates',
+            request.method,
+            request.path,
+            stats.count,
+            budget,
+            stats.duration * 1000,
+            stats.duplicates,
+        )
+
+        if getattr(settings, 'QUERY_STATS_HEADERS', False):
+            response['X-Query-Count'] = str(stats.count)
+            response['X-Query-Time-Ms'] = f'{stats.duration * 1000:.1f}'
+            response['X-Query-Duplicates'] = str(stats.duplicates)
+            if budget is not None:
+                response['X-Query-Budget'] = str(budget)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
+        if request.method == 'POST':
+            request.query_budget = (
+                getattr(view_func, 'post_query_budget', None)
+                or request.query_budget
+            )
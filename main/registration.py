@@ -0,0 +1,128 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, Q
+from django.db.models.functions import Greatest, Now
+
+from . import popularity
+from .fragments import invalidate_fragments
+from .models import Event
+
+# Event registration.
+# Event.participant_count is kept in step with the participants table: by
+# register() and unregister() below, and by the m2m_changed signal (see
+# signals.py) for every other way of adding or removing participants.
+# register() and unregister() are idempotent and decide what to do with a
+# single conditional UPDATE of the event row, which checks the registration
+# and the capacity, adjusts the count and holds the row lock until the end
+# of the transaction. The participant row is then inserted or deleted
+# directly, without the extra SELECT and signals of participants.add() and
+# remove(). The unique (event, user) constraint catches the concurrent
+# duplicates that the UPDATE cannot see. Neither sends m2m_changed, so both
+# invalidate the cached event fragments themselves. Every count update also
+# moves Event.updated_at, the change marker of the event's pages.
+
+Participant = Event.participants.through
+
+
+class EventFull(Exception):
+    pass
+
+
+class _NotRegistered(Exception):
+    pass
+
+
+def _participant(event, user):
+    return Participant.objects.filter(event_id=event.pk, user_id=user.pk)
+
+
+def register(event, user):
+    """
+    Registers user for event. Returns False if the user was already
+    registered, and raises EventFull if the event is at capacity.
+    """
+    try:
+        with transaction.atomic():
+            claimed = Event.objects.filter(
+                Q(capacity__isnull=True)
+                | Q(participant_count__lt=F('capacity')),
+                ~Exists(_participant(event, user)),
+                pk=event.pk,
+            ).update(
+                participant_count=F('participant_count') + 1,
+                updated_at=Now(),
+            )
+            if not claimed:
+                if _participant(event, user).exists():
+                    return False
+                raise EventFull(event.pk)
+            Participant.objects.create(event_id=event.pk, user_id=user.pk)
+            popularity.participants_added(_participant(event, user))
+    except IntegrityError:
+        # Registered by a concurrent request
+        return False
+    invalidate_fragments('event', event.pk)
+    return True
+
+
+def unregister(event, user):
+    """
+    Unregisters user from event. Returns False if the user was not
+    registered.
+    """
+    try:
+        with transaction.atomic():
+            released = Event.objects.filter(
+                Exists(_participant(event, user)),
+                pk=event.pk,
+            ).update(
+                participant_count=Greatest(F('participant_count') - 1, 0),
+                updated_at=Now(),
+            )
+            if not released:
+                return False
+            popularity.participants_removed(_participant(event, user))
+            deleted, _ = _participant(event, user).delete()
+            if not deleted:
+                # Unregistered by a concurrent request
+                raise _NotRegistered
+    except _NotRegistered:
+        return False
+    invalidate_fragments('event', event.pk)
+    return True
+
+
+def participant_state(event_id):
+    """
+    Returns the participant count and capacity of an event.
+    """
+    return Event.objects.values('participant_count', 'capacity').get(
+        pk=event_id)
+
+
+def _apply(participants, sign):
+    totals = (
+        participants.values('event_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for row in totals:
+        Event.objects.filter(pk=row['event_id']).update(
+            participant_count=Greatest(
+                F('participant_count') + sign * row['total'], 0),
+            updated_at=Now(),
+        )
+
+
+def participants_added(participants):
+    """
+    Adds freshly inserted participant rows to the counts of their events.
+    """
+    _apply(participants, 1)
+
+
+def participants_removed(participants):
+    """
+    Subtracts participant rows that are about to be deleted from the counts
+    of their events.
+    """
+    _apply(participants, -1)
@@ -0,0 +1,274 @@
+import re
+from dataclasses import dataclass
+
+from django.db import connections
+from django.db.models import IntegerField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+# Full-text search.
+# On PostgreSQL, searches use an expression GIN index over a weighted
+# tsvector of the indexed fields (created in migration 0008), with ranked,
+# prefix-matching tsqueries. On SQLite (tests and local runs), each index is
+# an FTS5 virtual table kept in sync by the signals in signals.py, matched
+# and ranked with bm25 in subqueries of the searched queryset. Any other
+# database falls back to icontains scans.
+# Search results carry an integer "relevance" annotation, higher is better.
+# highlight() adds HTML snippets with the matched terms wrapped in <mark>.
+
+SEARCH_CONFIG = 'english'
+
+# Relative weights of the tsvector weight classes, used for bm25 on SQLite
+BM25_WEIGHTS = {'A': 10.0, 'B': 1.0}
+
+# Control characters delimiting matches in snippets, replaced by <mark>
+# tags once the snippet text has been escaped
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_STOP = '\x03'
+SNIPPET_WORDS = 24
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    model_table: str
+    fields: tuple
+    weights: tuple
+
+    @property
+    def fts_table(self):
+        return f'{self.model_table}_fts'
+
+    def vector(self):
+        """
+        Returns the weighted tsvector expression. It must stay identical to
+        the expression of the GIN index for PostgreSQL to use the index.
+        """
+        from django.contrib.postgres.search import SearchVector
+
+        vector = None
+        for name, weight in zip(self.fields, self.weights):
+            part = SearchVector(name, weight=weight, config=SEARCH_CONFIG)
+            vector = part if vector is None else vector + part
+        return vector
+
+
+SKILL_INDEX = SearchIndex(
+    model_table='main_skill',
+    fields=('name', 'description'),
+    weights=('A', 'B'),
+)
+
+EVENT_INDEX = SearchIndex(
+    model_table='main_event',
+    fields=('title', 'overview'),
+    weights=('A', 'B'),
+)
+
+
+def search_terms(query):
+    """
+    Splits a search query into lowercase word terms.
+    """
+    return re.findall(r'\w+', (query or '').lower())
+
+
+def _no_results(queryset):
+    return queryset.none().annotate(
+        relevance=Value(0, output_field=IntegerField()))
+
+
+def _vendor(queryset):
+    return connections[queryset.db].vendor
+
+
+def search(queryset, index, query):
+    """
+    Filters queryset to the rows matching every term of query, treating
+    each term as a prefix, and annotates them with their relevance.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return _no_results(queryset)
+    vendor = _vendor(queryset)
+    if vendor == 'postgresql':
+        return _search_postgresql(queryset, index, terms)
+    if vendor == 'sqlite':
+        return _search_sqlite(queryset, index, terms)
+    return _search_fallback(queryset, index, terms)
+
+
+def _search_postgresql(queryset, index, terms):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    tsquery = SearchQuery(
+        ' & '.join(f'{term}:*' for term in terms),
+        search_type='raw',
+        config=SEARCH_CONFIG,
+    )
+    return (
+        queryset.annotate(search=index.vector())
+        .filter(search=tsquery)
+        .annotate(relevance=Cast(
+            SearchRank(index.vector(), tsquery) * 1000000,
+            IntegerField(),
+        ))
+    )
+
+
+def fts_match(terms):
+    """
+    Builds an FTS5 MATCH expression requiring every term as a prefix.
+    """
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _search_sqlite(queryset, index, terms):
+    # The match is a subquery of the queryset's own SQL, so its filters and
+    # the FTS5 lookup are applied together, and every match is ranked
+    match = fts_match(terms)
+    weights = ', '.join(str(BM25_WEIGHTS[w]) for w in index.weights)
+    row = f'{connections[queryset.db].ops.quote_name(index.model_table)}.id'
+    # bm25 scores are negative, with the best match lowest
+    return queryset.filter(
+        id__in=RawSQL(
+            f'SELECT rowid FROM {index.fts_table} '
+            f'WHERE {index.fts_table} MATCH %s',
+            [match],
+        )
+    ).annotate(relevance=RawSQL(
+        f'SELECT CAST(round(-bm25({index.fts_table}, {weights}) * 1000000) '
+        f'AS INTEGER) FROM {index.fts_table} '
+        f'WHERE {index.fts_table} MATCH %s AND rowid = {row}',
+        [match],
+        output_field=IntegerField(),
+    ))
+
+
+def _search_fallback(queryset, index, terms):
+    for term in terms:
+        condition = Q()
+        for name in index.fields:
+            condition |= Q(**{f'{name}__icontains': term})
+        queryset = queryset.filter(condition)
+    return queryset.annotate(relevance=Value(0, output_field=IntegerField()))
+
+
+def index_object(index, obj, using='default'):
+    """
+    Writes obj to the FTS5 table of index. Only needed on SQLite; the
+    PostgreSQL expression index is maintained by the database.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    columns = ', '.join(index.fields)
+    placeholders = ', '.join(['%s'] * len(index.fields))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {index.fts_table} WHERE rowid = %s', [obj.pk])
+        cursor.execute(
+            f'INSERT INTO {index.fts_table} (rowid, {columns}) '
+            f'VALUES (%s, {placeholders})',
+            [obj.pk] + [getattr(obj, name) for name in index.fields],
+        )
+
+
+def unindex_object(index, pk, using='default'):
+    """
+    Removes the row with primary key pk from the FTS5 table of index.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {index.fts_table} WHERE rowid = %s', [pk])
+
+
+def _snippets_postgresql(model, ids, index, terms, field):
+    from django.contrib.postgres.search import SearchHeadline, SearchQuery
+
+    tsquery = SearchQuery(
+        ' | '.join(f'{term}:*' for term in terms),
+        search_type='raw',
+        config=SEARCH_CONFIG,
+    )
+    return dict(
+        model.objects.filter(id__in=ids)
+        .annotate(snippet=SearchHeadline(
+            field,
+            tsquery,
+            config=SEARCH_CONFIG,
+            start_sel=HIGHLIGHT_START,
+            stop_sel=HIGHLIGHT_STOP,
+            max_words=SNIPPET_WORDS,
+            min_words=SNIPPET_WORDS // 2,
+        ))
+        .values_list('id', 'snippet')
+    )
+
+
+def _snippets_sqlite(using, ids, index, terms, field):
+    column = index.fields.index(field)
+    placeholders = ', '.join(['%s'] * len(ids))
+    match = ' OR '.join(f'"{term}"*' for term in terms)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, snippet({index.fts_table}, {column}, %s, %s, '
+            f"'…', {SNIPPET_WORDS}) FROM {index.fts_table} "
+            f'WHERE {index.fts_table} MATCH %s '
+            f'AND rowid IN ({placeholders})',
+            [HIGHLIGHT_START, HIGHLIGHT_STOP, match] + ids,
+        )
+        return dict(cursor.fetchall())
+
+
+def highlight(objects, index, query, field):
+    """
+    Sets a "snippet" attribute on each of objects: an excerpt of field as
+    HTML with the terms of query wrapped in <mark> tags, or None if no
+    snippet is available. Runs one query for all objects.
+    """
+    terms = search_terms(query)
+    for obj in objects:
+        obj.snippet = None
+    if not objects or not terms:
+        return objects
+    model = type(objects[0])
+    using = objects[0]._state.db or 'default'
+    ids = [obj.pk for obj in objects]
+    vendor = connections[using].vendor
+    if vendor == 'postgresql':
+        snippets = _snippets_postgresql(model, ids, index, terms, field)
+    elif vendor == 'sqlite':
+        snippets = _snippets_sqlite(using, ids, index, terms, field)
+    else:
+        snippets = {}
+    for obj in objects:
+        text = snippets.get(obj.pk)
+        if text:
+            obj.snippet = mark_safe(
+                escape(text)
+                .replace(HIGHLIGHT_START, '<mark>')
+                .replace(HIGHLIGHT_STOP, '</mark>')
+            )
+    return objects
+
+
+def search_skills(queryset, query):
+    """
+    Returns the skills of queryset matching query, most relevant first.
+    """
+    return search(queryset, SKILL_INDEX, query).order_by(
+        '-relevance', 'name', 'id')
+
+
+def search_events(queryset, query):
+    """
+    Returns the events of queryset matching query, most relevant first and
+    then by date.
+    """
+    return search(queryset, EVENT_INDEX, query).order_by(
+        '-relevance', 'date_time', 'id')
@@ -1,15 +1,154 @@
-from django.db.models.signals import post_save
+from django.db.models.functions import Now
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_init, post_save, pre_delete)
 from django.contrib.auth.models import User
 from django.dispatch import receiver
-from .models import Profile
+from . import popularity, registration, search
+from .fragments import invalidate_fragments
+from .profile_summary import invalidate_profile_summary
+from .models import Event, Profile, Skill
 
 
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
     if created:
-        Profile.objects.create(user=instance)
+        # Set by the AccountAdapter for users signing up as mentors
+        Profile.objects.create(
+            user=instance,
+            is_mentor=getattr(instance, 'signup_is_mentor', False),
+        )
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_summary_cache(sender, instance, **kwargs):
+    invalidate_profile_summary(instance.user_id)
+
+
+# Keep Skill.popularity and Event.participant_count in step with event
+# participants
+
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def update_counts_on_participants_change(
+        sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'pre_remove', 'pre_clear'):
+        return
+    if reverse:
+        participants = sender.objects.filter(user_id=instance.pk)
+        if pk_set is not None:
+            participants = participants.filter(event_id__in=pk_set)
+    else:
+        participants = sender.objects.filter(event_id=instance.pk)
+        if pk_set is not None:
+            participants = participants.filter(user_id__in=pk_set)
+
+    if action == 'post_add':
+        popularity.participants_added(participants)
+        registration.participants_added(participants)
+    else:
+        popularity.participants_removed(participants)
+        registration.participants_removed(participants)
+
+
+@receiver(post_save, sender=Event)
+def update_popularity_on_event_save(sender, instance, **kwargs):
+    popularity.sync_event(instance)
+
+
+@receiver(pre_delete, sender=Event)
+def update_popularity_on_event_delete(sender, instance, **kwargs):
+    popularity.participants_removed(
+        Event.participants.through.objects.filter(event_id=instance.pk))
+
+
+@receiver(pre_delete, sender=User)
+def update_counts_on_user_delete(sender, instance, **kwargs):
+    # Events owned by the user are deleted with it and handled above
+    participants = Event.participants.through.objects.filter(
+        user_id=instance.pk).exclude(event__owner_id=instance.pk)
+    popularity.participants_removed(participants)
+    registration.participants_removed(participants)
+
+
+# Keep the SQLite full-text search tables in step with skills and events
+
+
+@receiver(post_save, sender=Skill)
+def index_skill(sender, instance, using, **kwargs):
+    search.index_object(search.SKILL_INDEX, instance, using=using)
+
+
+@receiver(post_delete, sender=Skill)
+def unindex_skill(sender, instance, using, **kwargs):
+    search.unindex_object(search.SKILL_INDEX, instance.pk, using=using)
+
+
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, using, **kwargs):
+    search.index_object(search.EVENT_INDEX, instance, using=using)
+
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, using, **kwargs):
+    search.unindex_object(search.EVENT_INDEX, instance.pk, using=using)
+
+
+# Render the cached fragments of changed skills and events again
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def invalidate_skill_fragments(sender, instance, **kwargs):
+    invalidate_fragments('skill', instance.pk)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_fragments(sender, instance, **kwargs):
+    invalidate_fragments('event', instance.pk)
+    # The skill detail page lists the events of the skill
+    invalidate_fragments('skill', instance.skill_id)
+
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def invalidate_event_fragments_on_participants_change(
+        sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        event_ids = [instance.pk]
+    elif pk_set is not None:
+        event_ids = pk_set
+    else:
+        event_ids = sender.objects.filter(
+            user_id=instance.pk).values_list('event_id', flat=True)
+    for event_id in event_ids:
+        invalidate_fragments('event', event_id)
+
+
+# Render the participant lists of a user's events again when they are
+# renamed. The loaded username is remembered without a query; it is missing
+# when the field was deferred.
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._loaded_username = instance.__dict__.get('username')
 
 
 @receiver(post_save, sender=User)
-def save_profile(sender, instance, **kwargs):
-    instance.profile.save()
+def invalidate_event_fragments_on_rename(
+        sender, instance, created, update_fields, **kwargs):
+    loaded = instance._loaded_username
+    instance._loaded_username = instance.__dict__.get('username')
+    if created or loaded is None or loaded == instance.username:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    events = Event.objects.filter(participants=instance)
+    event_ids = list(events.values_list('id', flat=True))
+    # Also changes the ETags of the event pages (see conditional.py)
+    Event.objects.filter(id__in=event_ids).update(updated_at=Now())
+    for event_id in event_ids:
+        invalidate_fragments('event', event_id)
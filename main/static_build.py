@@ -0,0 +1,129 @@
+import io
+import posixpath
+
+import rcssmin
+import rjsmin
+from django.core.files.base import ContentFile
+from PIL import Image
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+# Static asset build.
+# collectstatic runs the build in production: the site's scripts and styles
+# are minified and concatenated into one bundle each, the large images get
+# narrower copies for srcset, and then every file is content-hashed and
+# precompressed (Brotli and gzip) by WhiteNoise. Hashed names never change
+# content, so WhiteNoise serves them with far-future immutable caching
+# headers and repeat page loads download no static bytes. Templates load
+# the bundles and srcsets with the static_assets tags. Settings only select
+# this storage once collectstatic has written the manifest (STATIC_BUILD);
+# otherwise the plain storage serves the source files, and the tags fall
+# back to them.
+
+# Bundle name: source files, in load order
+STATIC_BUNDLES = {
+    'css/site.css': ['css/styles.css'],
+    'js/site.js': [
+        'js/scripts.js',
+        'js/profile.js',
+        'js/events.js',
+        'js/event_detail.js',
+    ],
+}
+
+# Directories whose images get narrower copies, and their widths
+RESPONSIVE_IMAGE_DIRS = ('images/skills/', 'images/about/')
+RESPONSIVE_IMAGE_WIDTHS = (400, 800)
+RESPONSIVE_IMAGE_QUALITY = 80
+
+MINIFIERS = {
+    '.css': rcssmin.cssmin,
+    '.js': rjsmin.jsmin,
+}
+
+
+def image_variant_name(name, width):
+    """
+    Returns the name of the copy of a static image at the given width.
+    """
+    root, ext = posixpath.splitext(name)
+    return f'{root}-{width}w{ext}'
+
+
+def is_responsive_image(name):
+    return (
+        name.startswith(RESPONSIVE_IMAGE_DIRS)
+        and name.endswith('.webp')
+        and not name.endswith(tuple(
+            f'-{width}w.webp' for width in RESPONSIVE_IMAGE_WIDTHS))
+    )
+
+
+def build_bundle(sources):
+    """
+    Returns the minified concatenation of sources, a list of texts of the
+    same type given by extension, e.g. [('.js', text), ...].
+    """
+    # The newline keeps a source without a trailing semicolon or newline
+    # from running into the next one
+    return '\n'.join(MINIFIERS[ext](text) for ext, text in sources)
+
+
+def resize_image(data, width):
+    """
+    Returns the image data scaled down to width, or None if the image is
+    not wider than that.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        if image.width <= width:
+            return None
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    resized.save(output, 'WEBP', quality=RESPONSIVE_IMAGE_QUALITY, method=6)
+    return output.getvalue()
+
+
+class BuildStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise's hashed, precompressed storage, which also writes the
+    bundles and image copies when collectstatic post-processes the files.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for name in self.build(paths):
+                paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run, **options)
+
+    def build(self, paths):
+        """
+        Writes the bundles and image copies of the collected files, and
+        returns their names.
+        """
+        built = []
+        for name, sources in STATIC_BUNDLES.items():
+            texts = []
+            for source in sources:
+                with self.open(source) as file:
+                    texts.append(
+                        (posixpath.splitext(source)[1], file.read().decode()))
+            self.write(name, build_bundle(texts).encode())
+            built.append(name)
+
+        for name in sorted(paths):
+            if not is_responsive_image(name):
+                continue
+            with self.open(name) as file:
+                data = file.read()
+            for width in RESPONSIVE_IMAGE_WIDTHS:
+                resized = resize_image(data, width)
+                if resized is not None:
+                    variant = image_variant_name(name, width)
+                    self.write(variant, resized)
+                    built.append(variant)
+        return built
+
+    def write(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(content))
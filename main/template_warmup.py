@@ -0,0 +1,45 @@
+import logging
+import time
+from pathlib import Path
+
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+# Template warm-up.
+# The templates are loaded through the cached loader (see TEMPLATES in
+# settings.py), so each is read and compiled once per process and then
+# rendered from memory. warm_templates() compiles the site's templates when
+# a server process starts (see skillified/wsgi.py and asgi.py), so that the
+# first requests of a new worker do not pay for reading and parsing them,
+# and a broken template fails the deploy rather than a request.
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / 'templates'
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+def template_names(directory=TEMPLATES_DIR):
+    """
+    Returns the names of the templates under directory, as passed to
+    get_template().
+    """
+    return sorted(
+        path.relative_to(directory).as_posix()
+        for path in directory.rglob('*')
+        if path.suffix in TEMPLATE_SUFFIXES
+    )
+
+
+def warm_templates():
+    """
+    Compiles the site's templates into the cached loader. Returns the number
+    of templates compiled.
+    """
+    start = time.perf_counter()
+    names = template_names()
+    for name in names:
+        get_template(name)
+    logger.info(
+        'Compiled %d templates in %.0f ms',
+        len(names), (time.perf_counter() - start) * 1000)
+    return len(names)
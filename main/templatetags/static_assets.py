@@ -0,0 +1,63 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from PIL import Image
+
+from ..static_build import (
+    RESPONSIVE_IMAGE_WIDTHS,
+    STATIC_BUNDLES,
+    image_variant_name,
+)
+
+register = template.Library()
+
+BUNDLE_TAGS = {
+    '.css': '<link rel="stylesheet" href="{}">',
+    '.js': '<script src="{}"></script>',
+}
+
+
+def _is_built(name):
+    # Only the manifest of collectstatic lists the built files
+    return name in getattr(staticfiles_storage, 'hashed_files', ())
+
+
+@lru_cache
+def _image_width(name):
+    with staticfiles_storage.open(name) as file, Image.open(file) as image:
+        return image.width
+
+
+@register.simple_tag
+def static_bundle(name):
+    """
+    Renders the tag loading a bundle of STATIC_BUNDLES, or the tags loading
+    its source files where collectstatic has not built it.
+    """
+    names = [name] if _is_built(name) else STATIC_BUNDLES[name]
+    tag = BUNDLE_TAGS[name[name.rindex('.'):]]
+    return format_html_join('\n', tag, ((static(n),) for n in names))
+
+
+@register.simple_tag
+def static_srcset(name, sizes='100vw'):
+    """
+    Renders the srcset and sizes attributes of a static image with the
+    narrower copies made by collectstatic, or nothing where there are none.
+    """
+    candidates = [
+        (image_variant_name(name, width), width)
+        for width in RESPONSIVE_IMAGE_WIDTHS
+        if _is_built(image_variant_name(name, width))
+    ]
+    if not candidates:
+        return ''
+    candidates.append((name, _image_width(name)))
+    return format_html(
+        ' srcset="{}" sizes="{}"',
+        ', '.join(f'{static(n)} {width}w' for n, width in candidates),
+        sizes,
+    )
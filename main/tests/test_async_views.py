@@ -0,0 +1,83 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from main import views
+from main.models import Event, Profile, Skill
+
+
+@override_settings(QUERY_STATS_HEADERS=True)
+class AsyncViewTests(TestCase):
+    """
+    Unit tests for the async views served in ASGI mode.
+
+    This test case includes the following tests:
+    - Test that the read-heavy views are async.
+    - Test that no middleware makes Django adapt the async stack.
+    - Test that the async views render under ASGI.
+    - Test that queries are counted against the budget under ASGI.
+    - Test that a missing skill is a 404 under ASGI.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='testuser', password='TestPassword1')
+        cls.skill = Skill.objects.create(
+            name='Python', description='Learn Python')
+        cls.user.profile.skills.add(cls.skill)
+        Profile.objects.filter(user=cls.user).update(is_mentor=True)
+        cls.event = Event.objects.create(
+            title='Python Workshop',
+            overview='Workshop overview',
+            date_time=timezone.now() + timezone.timedelta(days=1),
+            skill=cls.skill,
+            owner=cls.user,
+        )
+        cls.event.participants.add(cls.user)
+
+    def setUp(self):
+        self.async_client.force_login(self.user)
+
+    # Test that the read-heavy views are async
+    def test_views_are_async(self):
+        for view in (views.home, views.dashboard, views.mentor_skills,
+                     views.skill_detail, views.events):
+            with self.subTest(view=view.__name__):
+                self.assertTrue(iscoroutinefunction(view))
+
+    # Test that no middleware makes Django adapt the async stack
+    def test_middleware_async_capable(self):
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+
+    # Test that the async views render under ASGI
+    async def test_async_views_render(self):
+        pages = [
+            (reverse('home'), 'Skillified'),
+            (reverse('dashboard'), 'Python Workshop'),
+            (reverse('mentor_skills') + '?q=python', 'Learn Python'),
+            (reverse('skill_detail', args=[self.skill.id]), 'Learn Python'),
+            (reverse('events') + '?q=workshop', '<mark>'),
+        ]
+        for url, text in pages:
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertContains(response, text)
+
+    # Test that queries are counted against the budget under ASGI
+    async def test_query_budget_under_asgi(self):
+        url = reverse('skill_detail', args=[self.skill.id])
+        await self.async_client.get(url)
+        response = await self.async_client.get(url)
+        count = int(response['X-Query-Count'])
+        self.assertGreater(count, 0)
+        self.assertLessEqual(count, int(response['X-Query-Budget']))
+
+    # Test that a missing skill is a 404 under ASGI
+    async def test_missing_skill(self):
+        response = await self.async_client.get(
+            reverse('skill_detail', args=[self.skill.id + 1]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,251 @@
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+import cloudinary
+from django.contrib.auth.models import User
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from main import avatars
+from main.models import AvatarUpload, Profile
+from main.profile_summary import get_profile_summary
+from PIL import Image
+
+
+def image_bytes(size=(800, 600), format='JPEG', color='red'):
+    output = io.BytesIO()
+    Image.new('RGB', size, color).save(output, format)
+    return output.getvalue()
+
+
+class AvatarTests(TestCase):
+    """
+    Unit tests for the profile picture upload pipeline.
+
+    This test case includes the following tests:
+    - Test that an uploaded picture is queued rather than processed.
+    - Test that files that are not images are rejected.
+    - Test that the worker stores square WebP variants.
+    - Test that the pages use the variants.
+    - Test that the URLs of a picture are built once.
+    - Test that older Cloudinary pictures get resized, format-negotiated URLs.
+    - Test that a retried upload skips the variants already stored.
+    - Test that a crashed worker's uploads are taken over.
+    - Test that an older upload does not replace a newer picture.
+    - Test that failed uploads are given up after the maximum attempts.
+    - Test that deleting the picture removes its variants.
+    - Test the process_avatar_uploads command.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='testuser', password='TestPassword1')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        storage = override_settings(STORAGES={
+            'default': {
+                'BACKEND': 'django.core.files.storage.FileSystemStorage',
+            },
+            'staticfiles': {
+                'BACKEND':
+                    'django.contrib.staticfiles.storage.StaticFilesStorage',
+            },
+            'avatars': {
+                'BACKEND': 'django.core.files.storage.FileSystemStorage',
+                'OPTIONS': {'location': media_root},
+            },
+        })
+        storage.enable()
+        self.addCleanup(storage.disable)
+        self.storage = storages['avatars']
+        self.client.login(username='testuser', password='TestPassword1')
+
+    def upload(self, content=None, name='picture.jpg'):
+        return self.client.post(reverse('profile'), {
+            'profile_picture': SimpleUploadedFile(
+                name, content or image_bytes(), content_type='image/jpeg'),
+        }, follow=True)
+
+    def profile(self):
+        return Profile.objects.get(user=self.user)
+
+    # Test that an uploaded picture is queued rather than processed
+    def test_upload_is_queued(self):
+        response = self.upload()
+        self.assertContains(response, 'being processed')
+        upload = AvatarUpload.objects.get()
+        self.assertEqual(upload.status, AvatarUpload.PENDING)
+        self.assertEqual(bytes(upload.original), image_bytes())
+        self.assertEqual(self.profile().avatar_variants, {})
+
+    # Test that files that are not images are rejected
+    def test_invalid_upload(self):
+        cases = [
+            (b'not an image', 'fake.jpg', 'not a valid image'),
+            (image_bytes(format='BMP'), 'picture.bmp', 'must be a JPEG'),
+        ]
+        for content, name, error in cases:
+            with self.subTest(name=name):
+                response = self.upload(content, name)
+                self.assertContains(response, error)
+                self.assertFalse(AvatarUpload.objects.exists())
+
+    # Test that the worker stores square WebP variants
+    def test_process_pending(self):
+        self.upload()
+        self.assertEqual(avatars.process_pending(), (1, 0))
+
+        upload = AvatarUpload.objects.get()
+        self.assertEqual(upload.status, AvatarUpload.DONE)
+        self.assertEqual(bytes(upload.original), b'')
+        profile = self.profile()
+        self.assertEqual(profile.avatar_version, upload.pk)
+        self.assertEqual(
+            sorted(profile.avatar_variants, key=int),
+            [str(size) for size in avatars.AVATAR_SIZES])
+        for size, name in profile.avatar_variants.items():
+            with self.storage.open(name) as file, Image.open(file) as image:
+                self.assertEqual(image.format, 'WEBP')
+                self.assertEqual(image.size, (int(size), int(size)))
+
+    # Test that the pages use the variants
+    def test_pages_use_variants(self):
+        self.upload()
+        avatars.process_pending()
+        variants = self.profile().avatar_variants
+        src = self.storage.url(variants['150'])
+        srcset = ', '.join(
+            f'{self.storage.url(variants[str(size)])} {size}w'
+            for size in avatars.AVATAR_SIZES)
+        response = self.client.get(reverse('profile'))
+        self.assertContains(response, f'src="{src}"', count=3)
+        self.assertContains(response, f'srcset="{srcset}"', count=3)
+        for size in ('30px', '100px', '150px'):
+            self.assertContains(response, f'sizes="{size}"')
+        self.assertEqual(
+            get_profile_summary(response.wsgi_request).avatar,
+            avatars.AvatarImage(src, srcset))
+
+    # Test that the URLs of a picture are built once
+    def test_urls_memoized(self):
+        self.upload()
+        avatars.process_pending()
+        profile = self.profile()
+        with mock.patch.object(
+                self.storage, 'url', wraps=self.storage.url) as url:
+            first = profile.avatar
+            self.assertEqual(self.profile().avatar, first)
+        self.assertEqual(url.call_count, len(avatars.AVATAR_SIZES))
+
+    # Test that older Cloudinary pictures get resized, format-negotiated URLs
+    def test_cloudinary_picture_urls(self):
+        Profile.objects.filter(user=self.user).update(
+            profile_picture='image/upload/v7/pictures/nobody.jpg')
+        with mock.patch.object(cloudinary.config(), 'cloud_name', 'demo'):
+            avatar = self.profile().avatar
+        self.assertEqual(
+            avatar.src,
+            'https://res.cloudinary.com/demo/image/upload/'
+            'c_fill,f_auto,h_150,q_auto,w_150/v7/pictures/nobody')
+        self.assertEqual(
+            avatar.srcset.count('f_auto'), len(avatars.AVATAR_SIZES))
+        self.assertIn('w_300/v7/pictures/nobody 300w', avatar.srcset)
+
+    # Test that a retried upload skips the variants already stored
+    def test_retry_resumes(self):
+        self.upload()
+        upload = AvatarUpload.objects.get()
+        stored = avatars.variant_name(upload, avatars.AVATAR_SIZES[0])
+        save = self.storage.save
+
+        def fail_after_first(name, content, **kwargs):
+            if name != stored:
+                raise OSError('Storage unavailable')
+            return save(name, content, **kwargs)
+
+        with mock.patch.object(self.storage, 'save', fail_after_first):
+            self.assertEqual(avatars.process_pending(), (0, 1))
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, AvatarUpload.PENDING)
+        self.assertIn('Storage unavailable', upload.last_error)
+        self.assertTrue(self.storage.exists(stored))
+
+        with mock.patch.object(
+                self.storage, 'save', wraps=self.storage.save) as retry:
+            self.assertEqual(avatars.process_pending(
+                now=upload.next_attempt_at), (1, 0))
+        self.assertEqual(retry.call_count, len(avatars.AVATAR_SIZES) - 1)
+
+    # Test that a crashed worker's uploads are taken over
+    def test_lease_expires(self):
+        self.upload()
+        now = timezone.now()
+        avatars._claim(now, avatars.BATCH_SIZE)
+        self.assertEqual(avatars.process_pending(now=now), (0, 0))
+        self.assertEqual(avatars.process_pending(
+            now=now + avatars.LEASE_TIMEOUT), (1, 0))
+
+    # Test that an older upload does not replace a newer picture
+    def test_older_upload_does_not_win(self):
+        self.upload(image_bytes(color='red'))
+        self.upload(image_bytes(color='blue'))
+        older, newer = AvatarUpload.objects.order_by('id')
+        # The newer upload is processed first
+        AvatarUpload.objects.filter(pk=older.pk).update(
+            next_attempt_at=timezone.now() + timedelta(minutes=1))
+        avatars.process_pending()
+        avatars.process_pending(now=timezone.now() + timedelta(minutes=1))
+
+        profile = self.profile()
+        self.assertEqual(profile.avatar_version, newer.pk)
+        for size in avatars.AVATAR_SIZES:
+            self.assertFalse(
+                self.storage.exists(avatars.variant_name(older, size)))
+            self.assertTrue(
+                self.storage.exists(avatars.variant_name(newer, size)))
+
+    # Test that failed uploads are given up after the maximum attempts
+    def test_gives_up(self):
+        self.upload()
+        upload = AvatarUpload.objects.get()
+        now = timezone.now()
+        with mock.patch.object(
+                avatars, 'render_variants', side_effect=OSError('broken')):
+            for _ in range(avatars.MAX_ATTEMPTS):
+                avatars.process_pending(now=now)
+                now += timedelta(days=1)
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, AvatarUpload.FAILED)
+        self.assertEqual(upload.attempts, avatars.MAX_ATTEMPTS)
+        self.assertEqual(avatars.process_pending(now=now), (0, 0))
+
+    # Test that deleting the picture removes its variants
+    def test_delete_picture(self):
+        self.upload()
+        avatars.process_pending()
+        names = self.profile().avatar_variants.values()
+        self.client.post(
+            reverse('delete_profile_picture'),
+            {'delete_profile_picture': 'true'})
+        self.assertEqual(self.profile().avatar_variants, {})
+        for name in names:
+            self.assertFalse(self.storage.exists(name))
+        response = self.client.get(reverse('profile'))
+        self.assertContains(response, 'Upload Picture')
+
+    # Test the process_avatar_uploads command
+    def test_command(self):
+        self.upload()
+        self.upload()
+        out = io.StringIO()
+        call_command('process_avatar_uploads', '--workers', '2', stdout=out)
+        self.assertIn('Processed 2 upload(s), 0 failed.', out.getvalue())
@@ -0,0 +1,90 @@
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from main import caching
+
+
+class CachingTests(TestCase):
+    """
+    Unit tests for the shared cache configuration and cache namespaces.
+
+    This test case includes the following tests:
+    - Test that tests run against the file-based stand-in cache.
+    - Test that namespaces keep their keys apart.
+    - Test that bumping a namespace version ignores older entries.
+    - Test that get_or_set keeps the value cached first.
+    - Test that hits and misses are added to the shared counters.
+    - Test the cache_stats command.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.first = caching.CacheNamespace('test_first')
+        self.second = caching.CacheNamespace('test_second')
+
+    # Test that tests run against the file-based stand-in cache
+    def test_stand_in_cache(self):
+        self.assertEqual(
+            settings.CACHES['default']['BACKEND'],
+            'django.core.cache.backends.filebased.FileBasedCache')
+        self.assertEqual(settings.CACHES['default']['KEY_PREFIX'], 'skillified')
+
+    # Test that namespaces keep their keys apart
+    def test_namespaces(self):
+        self.first.set('key', 'first', None)
+        self.second.set('key', 'second', None)
+        self.assertEqual(self.first.get('key'), 'first')
+        self.assertEqual(self.second.get('key'), 'second')
+        self.first.delete('key')
+        self.assertIsNone(self.first.get('key'))
+        self.assertEqual(self.second.get('key'), 'second')
+
+    # Test that bumping a namespace version ignores older entries
+    def test_versions(self):
+        self.first.set('key', 'old shape', None)
+        bumped = caching.CacheNamespace('test_first', version=2)
+        self.assertIsNone(bumped.get('key'))
+        bumped.set('key', 'new shape', None)
+        self.assertEqual(self.first.get('key'), 'old shape')
+        self.assertEqual(bumped.get('key'), 'new shape')
+
+    # Test that get_or_set keeps the value cached first
+    def test_get_or_set(self):
+        self.assertEqual(self.first.get_or_set('key', lambda: 1, None), 1)
+        self.assertEqual(self.first.get_or_set('key', lambda: 2, None), 1)
+
+    # Test that hits and misses are added to the shared counters
+    def test_metrics(self):
+        caching.reset_metrics()
+        with mock.patch('main.caching.METRICS_FLUSH_INTERVAL', 3):
+            self.first.set('key', 'value', None)
+            self.first.get('key')
+            self.first.get('missing')
+            # Not flushed yet
+            self.assertEqual(
+                caching.metrics()['test_first'], {'hits': 0, 'misses': 0})
+            self.first.get('key')
+            self.assertEqual(
+                caching.metrics()['test_first'], {'hits': 2, 'misses': 1})
+            self.first.get('key')
+            caching.flush_metrics()
+            self.assertEqual(
+                caching.metrics()['test_first'], {'hits': 3, 'misses': 1})
+
+    # Test the cache_stats command
+    def test_cache_stats_command(self):
+        caching.reset_metrics()
+        self.first.get('missing')
+        self.first.set('key', 'value', None)
+        self.first.get('key')
+        out = StringIO()
+        call_command('cache_stats', '--reset', stdout=out)
+        self.assertIn(
+            'test_first: 1 hit(s), 1 miss(es), 50% hit ratio', out.getvalue())
+        self.assertIn('profile_summary:', out.getvalue())
+        self.assertEqual(
+            caching.metrics()['test_first'], {'hits': 0, 'misses': 0})
@@ -0,0 +1,209 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from main import registration
+from main.models import Event, Profile, Skill
+
+
+@override_settings(QUERY_STATS_HEADERS=True)
+class ConditionalGetTests(TestCase):
+    """
+    Unit tests for the conditional GET support of the skill and event pages.
+
+    This test case includes the following tests:
+    - Test that the pages send validators and must be revalidated.
+    - Test that a revalidation is answered with a 304 before rendering.
+    - Test that If-Modified-Since alone is honoured.
+    - Test that editing a skill changes its page.
+    - Test that adding or editing an event changes the pages listing it.
+    - Test that registrations change the event page.
+    - Test that participants changed directly change the event page.
+    - Test that the ETag depends on the viewer.
+    - Test that mentors joining change the mentor skills page.
+    - Test that pages with pending messages are rendered.
+    - Test that a missing skill is still a 404.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='testuser', password='TestPassword1')
+        cls.other = User.objects.create_user(
+            username='otheruser', password='TestPassword1')
+        cls.skill = Skill.objects.create(
+            name='Python', description='Learn Python')
+        cls.user.profile.skills.add(cls.skill)
+        Profile.objects.filter(user=cls.user).update(is_mentor=True)
+        cls.event = Event.objects.create(
+            title='Python Workshop',
+            overview='Workshop overview',
+            date_time=timezone.now() + timedelta(days=1),
+            skill=cls.skill,
+            owner=cls.user,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.urls = {
+            'skill_detail': reverse('skill_detail', args=[self.skill.id]),
+            'event_detail': reverse('event_detail', args=[self.event.id]),
+            'events': reverse('events'),
+            'mentor_skills': reverse('mentor_skills'),
+        }
+
+    def revalidate(self, url, response, **headers):
+        return self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'], **headers)
+
+    def assertChanged(self, url, response):
+        revalidated = self.revalidate(url, response)
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertNotEqual(revalidated['ETag'], response['ETag'])
+        return revalidated
+
+    def assertNotModified(self, url, response):
+        revalidated = self.revalidate(url, response)
+        self.assertEqual(revalidated.status_code, 304)
+        return revalidated
+
+    # Test that the pages send validators and must be revalidated
+    def test_validators(self):
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['ETag'].startswith('W/"'))
+                self.assertIn('Last-Modified', response)
+                self.assertEqual(
+                    response['Cache-Control'], 'private, no-cache')
+
+    # Test that a revalidation is answered with a 304 before rendering
+    def test_not_modified(self):
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                response = self.client.get(url)
+                revalidated = self.assertNotModified(url, response)
+                self.assertEqual(revalidated.content, b'')
+                self.assertEqual(revalidated.templates, [])
+                self.assertEqual(revalidated['ETag'], response['ETag'])
+                # Session, user and the change markers
+                self.assertEqual(int(revalidated['X-Query-Count']), 3)
+
+    # Test that If-Modified-Since alone is honoured
+    def test_if_modified_since(self):
+        url = self.urls['skill_detail']
+        response = self.client.get(url)
+        revalidated = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    # Test that editing a skill changes its page
+    def test_skill_edited(self):
+        url = self.urls['skill_detail']
+        response = self.client.get(url)
+        self.skill.description = 'Learn Python quickly'
+        self.skill.save()
+        revalidated = self.assertChanged(url, response)
+        self.assertContains(revalidated, 'Learn Python quickly')
+
+    # Test that adding or editing an event changes the pages listing it
+    def test_event_added_or_edited(self):
+        for name in ('skill_detail', 'events'):
+            with self.subTest(page=name):
+                url = self.urls[name]
+                response = self.client.get(url)
+                event = Event.objects.create(
+                    title=f'Advanced {name}',
+                    overview='Overview',
+                    date_time=timezone.now() + timedelta(days=2),
+                    skill=self.skill,
+                    owner=self.user,
+                )
+                response = self.assertChanged(url, response)
+                self.assertContains(response, f'Advanced {name}')
+
+                event.title = f'Expert {name}'
+                event.save()
+                response = self.assertChanged(url, response)
+                self.assertContains(response, f'Expert {name}')
+
+                event.delete()
+                response = self.assertChanged(url, response)
+                self.assertNotContains(response, f'Expert {name}')
+
+    # Test that registrations change the event page
+    def test_registration(self):
+        url = self.urls['event_detail']
+        response = self.client.get(url)
+        registration.register(self.event, self.other)
+        response = self.assertChanged(url, response)
+        self.assertContains(response, 'otheruser')
+        self.assertNotModified(url, response)
+
+        registration.unregister(self.event, self.other)
+        response = self.assertChanged(url, response)
+        self.assertNotContains(response, 'otheruser')
+
+        # The viewer's own registration, through the page's form
+        self.client.post(url, {'action': 'register'})
+        response = self.assertChanged(url, response)
+        self.assertContains(response, 'Unregister')
+
+    # Test that participants changed directly change the event page
+    def test_participants_changed(self):
+        url = self.urls['event_detail']
+        response = self.client.get(url)
+        self.event.participants.add(self.other)
+        response = self.assertChanged(url, response)
+        self.assertContains(response, 'otheruser')
+
+        self.other.events.clear()
+        response = self.assertChanged(url, response)
+        self.assertNotContains(response, 'otheruser')
+
+    # Test that the ETag depends on the viewer
+    def test_viewer(self):
+        url = self.urls['skill_detail']
+        response = self.client.get(url)
+        self.client.force_login(self.other)
+        revalidated = self.assertChanged(url, response)
+        self.assertNotContains(revalidated, 'Edit Skill')
+
+        # The viewer's mentor flag is shown on the page too
+        profile = self.other.profile
+        profile.is_mentor = True
+        profile.save()
+        revalidated = self.assertChanged(url, revalidated)
+        self.assertContains(revalidated, 'Add Event')
+
+    # Test that mentors joining change the mentor skills page
+    def test_mentor_skills(self):
+        url = self.urls['mentor_skills']
+        response = self.client.get(url)
+        skill = Skill.objects.create(name='Guitar', description='Play')
+        # Not listed until a mentor has the skill
+        self.assertNotModified(url, response)
+        self.user.profile.skills.add(skill)
+        response = self.assertChanged(url, response)
+        self.assertContains(response, 'Guitar')
+
+    # Test that pages with pending messages are rendered
+    def test_pending_messages(self):
+        Event.objects.filter(pk=self.event.pk).update(capacity=1)
+        registration.register(self.event, self.other)
+        url = self.urls['event_detail']
+        response = self.client.get(url)
+        # Fails without changing the event, and leaves a message
+        self.client.post(url, {'action': 'register'})
+        revalidated = self.revalidate(url, response)
+        self.assertContains(revalidated, 'Sorry, this event is full.')
+        self.assertNotModified(url, response)
+
+    # Test that a missing skill is still a 404
+    def test_missing_skill(self):
+        response = self.client.get(
+            reverse('skill_detail', args=[self.skill.id + 1]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,158 @@
+from io import StringIO
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from main.models import Event, Skill
+from main import popularity
+
+
+class DashboardTests(TestCase):
+    """
+    Test suite for the Dashboard popular skills panel.
+    This test suite includes the following tests:
+    - `test_popular_skills_ordered_by_participants`: Ensures that popular
+      skills are ranked by participants of their upcoming events.
+
+    - `test_popularity_follows_registrations`: Ensures that registering and
+      unregistering participants adjusts the skill popularity.
+
+    - `test_past_events_expire_from_popularity`: Ensures that events that
+      have passed no longer count towards popularity.
+
+    - `test_deleting_event_removes_popularity`: Ensures that deleting an
+      event removes its participants from popularity.
+
+    - `test_expiry_between_load_and_save`: Ensures that saving an event
+      loaded before it expired does not subtract its participants twice.
+
+    - `test_popularity_never_negative`: Ensures that drift cannot push a
+      popularity score below zero.
+
+    - `test_popular_skills_served_from_cache`: Ensures that the ranking is
+      cached and costs no queries on a warm cache.
+
+    - `test_rebuild_matches_incremental_scores`: Ensures that the rebuild
+      command produces the same scores as the incremental updates.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='TestPassword1word1')
+        self.client.login(username='testuser', password='TestPassword1word1')
+        self.others = [
+            User.objects.create_user(
+                username=f'user{i}', password='TestPassword1word1')
+            for i in range(3)
+        ]
+
+        self.skill_a = Skill.objects.create(
+            name='Skill A', description='Skill A Description')
+        self.skill_b = Skill.objects.create(
+            name='Skill B', description='Skill B Description')
+        future = timezone.now() + timezone.timedelta(days=7)
+        self.event_a = Event.objects.create(
+            title='Event A', overview='Overview A', date_time=future,
+            skill=self.skill_a, owner=self.user)
+        self.event_b = Event.objects.create(
+            title='Event B', overview='Overview B', date_time=future,
+            skill=self.skill_b, owner=self.user)
+
+    def test_popular_skills_ordered_by_participants(self):
+        self.event_a.participants.add(self.others[0])
+        self.event_b.participants.add(*self.others)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context['popular_skills'],
+            [self.skill_b, self.skill_a])
+
+    def test_popularity_follows_registrations(self):
+        self.event_a.participants.add(*self.others)
+        self.others[0].events.add(self.event_b)
+        self.skill_a.refresh_from_db()
+        self.skill_b.refresh_from_db()
+        self.assertEqual(self.skill_a.popularity, 3)
+        self.assertEqual(self.skill_b.popularity, 1)
+
+        # Removing a user who is not a participant changes nothing
+        self.event_b.participants.remove(self.others[1])
+        self.event_a.participants.remove(self.others[0])
+        self.others[0].events.clear()
+        self.skill_a.refresh_from_db()
+        self.skill_b.refresh_from_db()
+        self.assertEqual(self.skill_a.popularity, 2)
+        self.assertEqual(self.skill_b.popularity, 0)
+
+    def test_past_events_expire_from_popularity(self):
+        self.event_a.participants.add(*self.others)
+        Event.objects.filter(id=self.event_a.id).update(
+            date_time=timezone.now() - timezone.timedelta(hours=1))
+        call_command('refresh_popularity', stdout=StringIO())
+        self.skill_a.refresh_from_db()
+        self.assertEqual(self.skill_a.popularity, 0)
+
+        # Moving the event back into the future counts it again
+        self.event_a.refresh_from_db()
+        self.event_a.date_time = timezone.now() + timezone.timedelta(days=1)
+        self.event_a.save()
+        self.skill_a.refresh_from_db()
+        self.assertEqual(self.skill_a.popularity, 3)
+
+    def test_deleting_event_removes_popularity(self):
+        self.event_a.participants.add(*self.others)
+        self.event_a.delete()
+        self.skill_a.refresh_from_db()
+        self.assertEqual(self.skill_a.popularity, 0)
+
+    def test_expiry_between_load_and_save(self):
+        self.event_a.participants.add(*self.others)
+        Event.objects.filter(id=self.event_a.id).update(
+            date_time=timezone.now() - timezone.timedelta(hours=1))
+        stale = Event.objects.get(id=self.event_a.id)
+        call_command('refresh_popularity', stdout=StringIO())
+        stale.title = 'Edited Event A'
+        stale.save()
+        self.skill_a.refresh_from_db()
+        self.assertEqual(self.skill_a.popularity, 0)
+        self.assertFalse(
+            Event.objects.get(id=self.event_a.id).popularity_counted)
+
+        # The unaffected skill keeps its score when events are edited
+        self.event_b.participants.add(self.others[0])
+        self.event_b.refresh_from_db()
+        self.event_b.save()
+        self.skill_b.refresh_from_db()
+        self.assertEqual(self.skill_b.popularity, 1)
+
+    def test_popularity_never_negative(self):
+        self.event_a.participants.add(*self.others)
+        Skill.objects.filter(id=self.skill_a.id).update(popularity=1)
+        self.event_a.participants.remove(*self.others)
+        self.skill_a.refresh_from_db()
+        self.assertEqual(self.skill_a.popularity, 0)
+
+    def test_popular_skills_served_from_cache(self):
+        self.event_a.participants.add(self.others[0])
+        self.assertEqual(popularity.popular_skills(), [self.skill_a])
+        with self.assertNumQueries(0):
+            self.assertEqual(popularity.popular_skills(), [self.skill_a])
+        # A registration invalidates the cached ranking
+        self.event_b.participants.add(*self.others)
+        self.assertEqual(
+            popularity.popular_skills(), [self.skill_b, self.skill_a])
+
+    def test_rebuild_matches_incremental_scores(self):
+        self.event_a.participants.add(*self.others[:2])
+        self.event_b.participants.add(self.others[2])
+        Skill.objects.update(popularity=0)
+        call_command(
+            'refresh_popularity', '--rebuild', stdout=StringIO())
+        self.skill_a.refresh_from_db()
+        self.skill_b.refresh_from_db()
+        self.assertEqual(self.skill_a.popularity, 2)
+        self.assertEqual(self.skill_b.popularity, 1)
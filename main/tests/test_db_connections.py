@@ -0,0 +1,57 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import TransactionTestCase
+from main.tests.utils import FileDatabaseMixin
+
+
+class DatabaseConnectionBenchmarkTests(
+        FileDatabaseMixin, TransactionTestCase):
+    """
+    Tests for the bench_db_connections command.
+
+    This test case includes the following tests:
+    - Test that persistent connections are reused across requests.
+    - Test that the connection settings are restored afterwards.
+    """
+
+    def setUp(self):
+        User.objects.create_user(username='testuser')
+
+    def bench(self, mode):
+        connections_opened = []
+
+        def opened(sender, connection, **kwargs):
+            connections_opened.append(connection)
+
+        connection_created.connect(opened)
+        out = StringIO()
+        try:
+            call_command(
+                'bench_db_connections', '--requests', '5', '--mode', mode,
+                stdout=out)
+        finally:
+            connection_created.disconnect(opened)
+        self.assertIn(f'{mode}: p50 ', out.getvalue())
+        return len(connections_opened)
+
+    # Test that persistent connections are reused across requests
+    def test_persistent_connections_reused(self):
+        # One for the login, then one per warm-up and measured request
+        self.assertEqual(self.bench('fresh'), 11)
+        # One for the login, then one shared by every request
+        self.assertEqual(self.bench('persistent'), 2)
+
+    # Test that the connection settings are restored afterwards
+    def test_settings_restored(self):
+        settings_dict = dict(connection.settings_dict)
+        self.bench('persistent')
+        self.assertEqual(
+            connection.settings_dict['CONN_MAX_AGE'],
+            settings_dict['CONN_MAX_AGE'])
+        self.assertEqual(
+            connection.settings_dict['CONN_HEALTH_CHECKS'],
+            settings_dict['CONN_HEALTH_CHECKS'])
@@ -0,0 +1,147 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from main import notifications
+from main.models import (
+    DigestEntry, Event, Notification, NotificationSetting, OutboundEmail,
+    Skill)
+
+
+class DigestTests(TestCase):
+    """
+    Unit tests for the notification digests.
+
+    This test case includes the following tests:
+    - Test that digest users get entries for events of their skills only.
+    - Test that digest users get entries for new skills.
+    - Test that send_digests queues one email per user and clears entries.
+    - Test that send_digests only sends digests of the given frequency.
+    - Test that the digest query count depends on chunks, not users.
+    - Test the send_digests command.
+    - Test saving the digest frequency in the settings.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentor = User.objects.create_user(
+            username='mentor', email='mentor@example.com')
+        cls.python = Skill.objects.create(name='Python', description='')
+        cls.django = Skill.objects.create(name='Django', description='')
+        cls.daily = cls.digest_user('daily_user', 'daily', cls.python)
+        cls.hourly = cls.digest_user('hourly_user', 'hourly', cls.python)
+        cls.other = cls.digest_user('other_user', 'daily', cls.django)
+        cls.immediate = User.objects.create_user(
+            username='immediate', email='immediate@example.com')
+
+    @classmethod
+    def digest_user(cls, username, frequency, skill):
+        user = User.objects.create_user(
+            username=username, email=f'{username}@example.com',
+            password='TestPassword1')
+        user.profile.skills.add(skill)
+        NotificationSetting.objects.create(user=user, digest=frequency)
+        return user
+
+    def create_event(self, skill, title='Workshop'):
+        event = Event.objects.create(
+            title=title,
+            overview='',
+            date_time=timezone.now() + timedelta(days=1),
+            skill=skill,
+            owner=self.mentor,
+        )
+        notifications.notify_new_event(event)
+        return event
+
+    def digest_users(self):
+        return set(DigestEntry.objects.values_list(
+            'user__username', flat=True))
+
+    # Test that digest users get entries for events of their skills only
+    def test_event_entries_match_profile_skills(self):
+        event = self.create_event(self.python)
+        self.assertEqual(self.digest_users(), {'daily_user', 'hourly_user'})
+        self.assertEqual(
+            set(Notification.objects.values_list(
+                'user__username', flat=True)),
+            {'immediate'},
+        )
+        self.assertEqual(DigestEntry.objects.first().event, event)
+
+    # Test that digest users get entries for new skills
+    def test_skill_entries(self):
+        skill = Skill.objects.create(name='Rust', description='')
+        notifications.notify_new_skill(skill, actor_id=self.mentor.id)
+        self.assertEqual(
+            self.digest_users(), {'daily_user', 'hourly_user', 'other_user'})
+
+    # Test that send_digests queues one email per user and clears entries
+    def test_send_digests(self):
+        first = self.create_event(self.python, 'First workshop')
+        self.create_event(self.python, 'Second workshop')
+        self.create_event(self.django, 'Django workshop')
+        self.assertEqual(notifications.send_digests('daily'), 2)
+
+        emails = {email.to[0]: email for email in OutboundEmail.objects.all()}
+        self.assertEqual(
+            set(emails),
+            {'daily_user@example.com', 'other_user@example.com'},
+        )
+        body = emails['daily_user@example.com'].body
+        self.assertIn('First workshop', body)
+        self.assertIn('Second workshop', body)
+        self.assertNotIn('Django workshop', body)
+        self.assertIn(reverse('event_detail', args=[first.id]), body)
+        self.assertIn(
+            '2 update(s)', emails['daily_user@example.com'].subject)
+        self.assertFalse(DigestEntry.objects.filter(
+            user__in=[self.daily, self.other]).exists())
+        self.assertEqual(notifications.send_digests('daily'), 0)
+
+    # Test that send_digests only sends digests of the given frequency
+    def test_send_digests_by_frequency(self):
+        self.create_event(self.python)
+        self.assertEqual(notifications.send_digests('hourly'), 1)
+        self.assertEqual(
+            OutboundEmail.objects.get().to, ['hourly_user@example.com'])
+        self.assertEqual(self.digest_users(), {'daily_user'})
+
+    # Test that the digest query count depends on chunks, not users
+    def test_send_digests_query_count(self):
+        for i in range(6):
+            self.digest_user(f'user{i}', 'daily', self.python)
+        self.create_event(self.python)
+        Site.objects.get_current()
+        # 7 users in chunks of 4: the user query, then per chunk a
+        # savepoint, the entries, the emails, the delete and a release
+        with self.assertNumQueries(11):
+            self.assertEqual(
+                notifications.send_digests('daily', chunk_size=4), 7)
+
+    # Test the send_digests command
+    def test_send_digests_command(self):
+        self.create_event(self.python)
+        out = StringIO()
+        call_command('send_digests', '--frequency', 'hourly', stdout=out)
+        self.assertIn('Queued 1 hourly digest(s).', out.getvalue())
+
+    # Test saving the digest frequency in the settings
+    def test_settings_digest(self):
+        self.client.login(username='other_user', password='TestPassword1')
+        response = self.client.get(reverse('settings'))
+        self.assertContains(
+            response, '<option value="daily" selected>Daily</option>',
+            html=True)
+        self.client.post(reverse('settings'), {
+            'notify_events': 'on',
+            'notify_skills': 'on',
+            'digest': 'hourly',
+        })
+        self.assertEqual(
+            NotificationSetting.objects.get(user=self.other).digest, 'hourly')
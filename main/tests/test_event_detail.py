@@ -4,6 +4,7 @@ from django.contrib.auth.models import User
 from main.models import Event, Skill
 from django.utils import timezone
 from datetime import datetime
+from unittest import mock
 
 
 class EventDetailTests(TestCase):
@@ -27,6 +28,12 @@ class EventDetailTests(TestCase):
     - `test_edit_event`: Ensures that the event owner can edit the event.
 
     - `test_delete_event`: Ensures that the event owner can delete the event.
+
+    - `test_event_detail_query_count`: Ensures that the page runs a fixed
+      number of queries however many participants the event has.
+
+    - `test_participant_list_is_capped`: Ensures that only the first
+      participants are listed for popular events.
     """
 
     def setUp(self):
@@ -117,3 +124,35 @@ class EventDetailTests(TestCase):
         self.assertEqual(response.status_code, 200)
         event_exists = Event.objects.filter(id=self.event.id).exists()
         self.assertFalse(event_exists)
+
+    def test_event_detail_query_count(self):
+        url = reverse('event_detail', args=[self.event.id])
+        self.event.participants.add(self.other_user)
+        # Warm the cached profile summary used by the navbar and the
+        # cached fragments
+        self.client.get(url)
+        # Session, user, event with registration
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertContains(response, 'otheruser')
+
+        # The participants are fetched again once they change
+        self.event.participants.add(*[
+            User.objects.create_user(username=f'participant{i}')
+            for i in range(20)
+        ])
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+    def test_participant_list_is_capped(self):
+        self.event.participants.add(*[
+            User.objects.create_user(username=f'participant{i:02}')
+            for i in range(4)
+        ])
+        with mock.patch('main.views.EVENT_PARTICIPANTS_LIMIT', 3):
+            response = self.client.get(
+                reverse('event_detail', args=[self.event.id]))
+        self.assertEqual(
+            response.context['participants']['names'],
+            ['participant00', 'participant01', 'participant02'])
+        self.assertContains(response, 'And more...')
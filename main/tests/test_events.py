@@ -1,8 +1,10 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
+from main import search
 from main.models import Event, Skill
 from django.utils import timezone
+from unittest import mock
 
 
 class EventsTests(TestCase):
@@ -75,3 +77,212 @@ class EventsTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertNotContains(response, 'Test Event 1')
         self.assertNotContains(response, 'Test Event 2')
+
+
+class EventsPaginationTests(TestCase):
+    """
+    Test suite for the keyset pagination of the Events page.
+    This test suite includes the following tests:
+    - `test_first_page_is_limited`: Ensures that only one page of events
+      is rendered along with a link to the next page.
+
+    - `test_cursor_walks_all_events_once`: Ensures that following the
+      cursors visits every event exactly once, including events that
+      share the same date and time.
+
+    - `test_cursor_keeps_search_filters`: Ensures that the next page link
+      keeps the keyword search.
+
+    - `test_invalid_cursor`: Ensures that a malformed cursor restarts the
+      page and is rejected by the API.
+
+    - `test_events_api`: Ensures that the JSON API returns the same pages.
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='TestPassword1word1')
+        self.client.login(username='testuser', password='TestPassword1word1')
+
+        self.skill = Skill.objects.create(
+            name='Test Skill', description='Test Skill Description')
+        start = timezone.now() + timezone.timedelta(days=1)
+        # Pairs of events share a date_time so that the id breaks ties
+        self.events = [
+            Event.objects.create(
+                title=f'Paged Event {i}',
+                overview=f'Overview {i}',
+                date_time=start + timezone.timedelta(hours=i // 2),
+                skill=self.skill,
+                owner=self.user
+            )
+            for i in range(5)
+        ]
+        patcher = mock.patch('main.views.EVENTS_PAGE_SIZE', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_first_page_is_limited(self):
+        response = self.client.get(reverse('events'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['events'], self.events[:2])
+        self.assertContains(response, 'More Events')
+
+    def test_cursor_walks_all_events_once(self):
+        seen = []
+        url = reverse('events')
+        while url:
+            response = self.client.get(url)
+            seen.extend(response.context['events'])
+            next_query = response.context['next_page_query']
+            url = reverse('events') + '?' + next_query if next_query else None
+        self.assertEqual(seen, self.events)
+
+    def test_cursor_keeps_search_filters(self):
+        response = self.client.get(reverse('events') + '?q=Paged')
+        self.assertIn('q=Paged', response.context['next_page_query'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('events') + '?cursor=not-valid')
+        self.assertRedirects(response, reverse('events'))
+        response = self.client.get(
+            reverse('events') + '?q=Paged&cursor=not-valid')
+        self.assertRedirects(response, reverse('events') + '?q=Paged')
+        response = self.client.get(reverse('events_api') + '?cursor=bad')
+        self.assertEqual(response.status_code, 400)
+
+    def test_events_api(self):
+        ids = []
+        url = reverse('events_api')
+        while url:
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data['events']), 2)
+            ids.extend(event['id'] for event in data['events'])
+            url = data['next']
+        self.assertEqual(ids, [event.id for event in self.events])
+
+
+class EventsSearchTests(TestCase):
+    """
+    Test suite for the full-text search of the Events page.
+    This test suite includes the following tests:
+    - `test_search_ranks_title_matches_first`: Ensures that events matching
+      in the title rank above events matching only in the overview, and
+      that equally relevant events are ordered by date.
+
+    - `test_search_highlights_matches`: Ensures that results carry an
+      escaped snippet with the matched terms highlighted.
+
+    - `test_search_combined_with_date`: Ensures that keyword search and
+      the date filter can be combined.
+
+    - `test_past_events_excluded`: Ensures that events before today are
+      not returned by the search.
+
+    - `test_invalid_date_is_ignored`: Ensures that a malformed date filter
+      does not cause an error.
+
+    - `test_search_pages_keep_relevance_order`: Ensures that cursors walk
+      the search results in relevance order.
+
+    - `test_search_unaffected_by_many_past_matches`: Ensures that upcoming
+      events are found however many better matching past events there
+      are.
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser', password='TestPassword1word1')
+        self.client.login(username='testuser', password='TestPassword1word1')
+
+        self.skill = Skill.objects.create(
+            name='Test Skill', description='Test Skill Description')
+        self.day = timezone.now() + timezone.timedelta(days=10)
+        self.overview_match = Event.objects.create(
+            title='Sunday Meetup',
+            overview='An afternoon of <b>guitar</b> practice',
+            date_time=self.day,
+            skill=self.skill,
+            owner=self.user
+        )
+        self.later_title_match = Event.objects.create(
+            title='Guitar Basics',
+            overview='Learn your first chords',
+            date_time=self.day + timezone.timedelta(days=2),
+            skill=self.skill,
+            owner=self.user
+        )
+        self.title_match = Event.objects.create(
+            title='Guitar Jam',
+            overview='Bring your instrument',
+            date_time=self.day + timezone.timedelta(days=1),
+            skill=self.skill,
+            owner=self.user
+        )
+        self.past = Event.objects.create(
+            title='Guitar History',
+            overview='Already happened',
+            date_time=timezone.now() - timezone.timedelta(days=2),
+            skill=self.skill,
+            owner=self.user
+        )
+
+    def search(self, **params):
+        response = self.client.get(reverse('events'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_search_ranks_title_matches_first(self):
+        response = self.search(q='guit')
+        self.assertEqual(response.context['events'], [
+            self.title_match, self.later_title_match, self.overview_match])
+
+    def test_search_highlights_matches(self):
+        response = self.search(q='guitar')
+        self.assertContains(
+            response, 'An afternoon of &lt;b&gt;<mark>guitar</mark>&lt;/b&gt;')
+        data = self.client.get(reverse('events_api'), {'q': 'guitar'}).json()
+        self.assertIn('<mark>guitar</mark>', data['events'][-1]['snippet'])
+
+    def test_search_combined_with_date(self):
+        response = self.search(
+            q='guitar', event_date=self.day.strftime('%Y-%m-%d'))
+        self.assertEqual(response.context['events'], [self.overview_match])
+
+    def test_past_events_excluded(self):
+        self.assertNotIn(self.past, self.search(q='history').context['events'])
+
+    def test_invalid_date_is_ignored(self):
+        response = self.search(event_date='2025-13-45')
+        self.assertEqual(len(response.context['events']), 3)
+
+    def test_search_pages_keep_relevance_order(self):
+        ids = []
+        url = reverse('events_api') + '?q=guitar'
+        with mock.patch('main.views.EVENTS_PAGE_SIZE', 1):
+            while url:
+                data = self.client.get(url).json()
+                ids.extend(event['id'] for event in data['events'])
+                url = data['next']
+        self.assertEqual(ids, [
+            self.title_match.id, self.later_title_match.id,
+            self.overview_match.id])
+
+    def test_search_unaffected_by_many_past_matches(self):
+        past = Event.objects.bulk_create([
+            Event(
+                title=f'Guitar {i}',
+                overview='Guitar guitar',
+                date_time=timezone.now() - timezone.timedelta(days=3),
+                skill=self.skill,
+                owner=self.user,
+            )
+            for i in range(600)
+        ])
+        for event in past:
+            search.index_object(search.EVENT_INDEX, event)
+        response = self.search(q='guitar')
+        self.assertEqual(response.context['events'], [
+            self.title_match, self.later_title_match, self.overview_match])
@@ -0,0 +1,89 @@
+import csv
+import io
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from main import exports
+from main.models import Event, Skill
+
+
+class ExportTests(TestCase):
+    """
+    Unit tests for the streamed CSV exports.
+
+    This test case includes the following tests:
+    - Test that an export runs one query however many rows it has.
+    - Test the admin export action for events.
+    - Test the admin export action for skills.
+    - Test the export_csv command.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', password='TestPassword1')
+        cls.skill = Skill.objects.create(
+            name='Python', description='Programming, with "quotes"')
+        for i in range(5):
+            Event.objects.create(
+                title=f'Workshop {i}',
+                overview='',
+                date_time=timezone.now() + timedelta(days=i + 1),
+                skill=cls.skill,
+                owner=cls.admin,
+                capacity=10,
+            )
+
+    def parse(self, lines):
+        return list(csv.reader(io.StringIO(''.join(lines))))
+
+    # Test that an export runs one query however many rows it has
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            rows = self.parse(exports.csv_lines(
+                Event.objects.order_by('id'), exports.EVENT_EXPORT_FIELDS,
+                chunk_size=2))
+        self.assertEqual(rows[0][:4], ['ID', 'Title', 'Skill', 'Owner'])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][1:4], ['Workshop 0', 'Python', 'admin'])
+
+    def export_action(self, model, action):
+        self.client.login(username='admin', password='TestPassword1')
+        response = self.client.post(
+            reverse(f'admin:main_{model._meta.model_name}_changelist'),
+            {
+                'action': action,
+                '_selected_action': list(
+                    model.objects.values_list('pk', flat=True)),
+            },
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        return self.parse(
+            chunk.decode() for chunk in response.streaming_content)
+
+    # Test the admin export action for events
+    def test_admin_export_events(self):
+        rows = self.export_action(Event, 'export_events_csv')
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(
+            [row[1] for row in rows[1:]],
+            [f'Workshop {i}' for i in range(5)])
+
+    # Test the admin export action for skills
+    def test_admin_export_skills(self):
+        rows = self.export_action(Skill, 'export_skills_csv')
+        self.assertEqual(
+            rows[1][1:4], ['Python', 'Programming, with "quotes"', '0'])
+
+    # Test the export_csv command
+    def test_export_csv_command(self):
+        out = io.StringIO()
+        call_command('export_csv', 'events', '--chunk-size', '2', stdout=out)
+        rows = self.parse([out.getvalue()])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[5][1], 'Workshop 4')
@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from main import registration
+from main.models import Event, Skill
+
+
+class FragmentCacheTests(TestCase):
+    """
+    Unit tests for the cached fragments of the skill and event detail pages.
+
+    This test case includes the following tests:
+    - Test that a cached event fragment skips the participants query.
+    - Test that editing an event renders its fragments again.
+    - Test that registering renders the participant list again.
+    - Test that other changes to participants render the list again.
+    - Test that renaming a participant renders the list again.
+    - Test that per-viewer parts are not shared through the cache.
+    - Test that editing a skill renders its fragments again.
+    - Test that event changes render the skill's upcoming events again.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username='owner', password='TestPassword1')
+        cls.user = User.objects.create_user(
+            username='testuser', password='TestPassword1')
+        cls.skill = Skill.objects.create(
+            name='Python', description='Learn Python')
+        cls.owner.profile.skills.add(cls.skill)
+
+    def setUp(self):
+        self.event = Event.objects.create(
+            title='Python Workshop',
+            overview='Workshop overview',
+            date_time=timezone.now() + timedelta(days=1),
+            skill=self.skill,
+            owner=self.owner,
+        )
+        self.event_url = reverse('event_detail', args=[self.event.id])
+        self.skill_url = reverse('skill_detail', args=[self.skill.id])
+        self.client.login(username='testuser', password='TestPassword1')
+
+    # Test that a cached event fragment skips the participants query
+    def test_event_fragment_cached(self):
+        self.client.get(self.event_url)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.event_url)
+        self.assertContains(response, 'Workshop overview')
+
+    # Test that editing an event renders its fragments again
+    def test_event_edit_invalidates(self):
+        self.client.get(self.event_url)
+        self.event.overview = 'New overview'
+        self.event.save()
+        response = self.client.get(self.event_url)
+        self.assertContains(response, 'New overview')
+        self.assertNotContains(response, 'Workshop overview')
+
+    # Test that registering renders the participant list again
+    def test_registration_invalidates(self):
+        self.client.get(self.event_url)
+        registration.register(self.event, self.user)
+        response = self.client.get(self.event_url)
+        self.assertContains(response, '<li>testuser</li>', html=True)
+        registration.unregister(self.event, self.user)
+        response = self.client.get(self.event_url)
+        self.assertNotContains(response, '<li>testuser</li>', html=True)
+
+    # Test that other changes to participants render the list again
+    def test_participants_change_invalidates(self):
+        self.client.get(self.event_url)
+        self.user.events.add(self.event)
+        response = self.client.get(self.event_url)
+        self.assertContains(response, '<li>testuser</li>', html=True)
+        self.user.events.clear()
+        response = self.client.get(self.event_url)
+        self.assertNotContains(response, '<li>testuser</li>', html=True)
+
+    # Test that renaming a participant renders the list again
+    def test_participant_rename_invalidates(self):
+        registration.register(self.event, self.user)
+        response = self.client.get(self.event_url)
+        self.assertContains(response, '<li>testuser</li>', html=True)
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'renamed'
+        user.save()
+        response = self.client.get(
+            self.event_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertContains(response, '<li>renamed</li>', html=True)
+        self.assertNotContains(response, '<li>testuser</li>', html=True)
+
+    # Test that per-viewer parts are not shared through the cache
+    def test_per_viewer_parts_not_cached(self):
+        self.client.get(self.event_url)
+        self.client.get(self.skill_url)
+        self.client.login(username='owner', password='TestPassword1')
+        response = self.client.get(self.event_url)
+        self.assertContains(response, 'Edit Event')
+        response = self.client.get(self.skill_url)
+        self.assertContains(response, 'Delete Skill')
+
+    # Test that editing a skill renders its fragments again
+    def test_skill_edit_invalidates(self):
+        self.client.get(self.skill_url)
+        self.skill.description = 'Learn more Python'
+        self.skill.save()
+        response = self.client.get(self.skill_url)
+        self.assertContains(response, 'Learn more Python')
+
+    # Test that event changes render the skill's upcoming events again
+    def test_event_changes_invalidate_skill(self):
+        self.client.get(self.skill_url)
+        self.event.title = 'Advanced Workshop'
+        self.event.save()
+        response = self.client.get(self.skill_url)
+        self.assertContains(response, 'Advanced Workshop')
+        self.event.delete()
+        response = self.client.get(self.skill_url)
+        self.assertNotContains(response, 'Advanced Workshop')
+        self.assertContains(response, 'There are no upcoming events.')
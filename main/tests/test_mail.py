@@ -0,0 +1,214 @@
+import os
+from email.mime.text import MIMEText
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMessage, EmailMultiAlternatives, send_mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from main import mail as mail_queue
+from main.models import OutboundEmail
+
+
+class CountingBackend(EmailBackend):
+    """
+    In-memory backend counting the connections opened by the worker.
+    """
+    opened = 0
+
+    def open(self):
+        if not getattr(self, 'is_open', False):
+            self.is_open = True
+            CountingBackend.opened += 1
+        return True
+
+    def close(self):
+        self.is_open = False
+
+
+class FailingBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise SMTPException('Server unavailable')
+
+
+@override_settings(
+    EMAIL_BACKEND='main.mail.QueuedEmailBackend',
+    MAIL_QUEUE_BACKEND='main.tests.test_mail.CountingBackend',
+)
+class MailQueueTests(TestCase):
+    """
+    Unit tests for the outbound email queue.
+
+    This test case includes the following tests:
+    - Test that the contact form queues the email instead of sending it.
+    - Test that the signup verification email is queued.
+    - Test that the worker sends a batch over one connection.
+    - Test that HTML alternatives survive the queue.
+    - Test that HTML-only messages and attachments survive the queue.
+    - Test that MIME attachments are refused.
+    - Test that emails are leased rather than locked while sending.
+    - Test that failed emails are retried with an increasing delay.
+    - Test that emails are given up after the maximum number of attempts.
+    - Test the send_queued_mail command.
+    """
+
+    def setUp(self):
+        CountingBackend.opened = 0
+
+    # Test that the contact form queues the email instead of sending it
+    @mock.patch.dict(os.environ, {'EMAIL_HOST_USER': 'admin@example.com'})
+    def test_contact_form_queues_email(self):
+        response = self.client.post(reverse('contact'), {
+            'name': 'Test User',
+            'email': 'testuser@example.com',
+            'message': 'This is a test message.',
+            'reason': 'general',
+        })
+        self.assertRedirects(response, reverse('contact'))
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.subject, 'Contact Form Submission')
+        self.assertIn('This is a test message.', email.body)
+        self.assertEqual(email.to, ['admin@example.com'])
+        self.assertEqual(email.status, OutboundEmail.PENDING)
+
+        self.assertEqual(mail_queue.send_queued(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Contact Form Submission')
+
+    # Test that the signup verification email is queued
+    def test_signup_email_queued(self):
+        self.client.post(reverse('account_signup'), {
+            'username': 'newuser',
+            'email': 'newuser@example.com',
+            'password1': 'TestPassword1',
+            'password2': 'TestPassword1',
+            'first_name': 'New',
+            'last_name': 'User',
+            'mentor': 'no',
+        })
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.to, ['newuser@example.com'])
+
+    # Test that the worker sends a batch over one connection
+    def test_batch_uses_one_connection(self):
+        for i in range(5):
+            send_mail(f'Subject {i}', 'Body', 'from@example.com',
+                      [f'to{i}@example.com'])
+        self.assertEqual(mail_queue.send_queued(), (5, 0))
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(OutboundEmail.objects.exclude(
+            status=OutboundEmail.SENT).exists())
+        # Nothing left to send
+        self.assertEqual(mail_queue.send_queued(), (0, 0))
+
+    # Test that HTML alternatives survive the queue
+    def test_alternatives_preserved(self):
+        message = EmailMultiAlternatives(
+            'Subject', 'Text', 'from@example.com', ['to@example.com'],
+            reply_to=['reply@example.com'])
+        message.attach_alternative('<p>HTML</p>', 'text/html')
+        message.send()
+        mail_queue.send_queued()
+        sent = mail.outbox[0]
+        self.assertEqual(sent.alternatives[0][0], '<p>HTML</p>')
+        self.assertEqual(sent.reply_to, ['reply@example.com'])
+
+    # Test that HTML-only messages and attachments survive the queue
+    def test_html_and_attachments_preserved(self):
+        message = EmailMessage(
+            'Subject', '<p>HTML</p>', 'from@example.com', ['to@example.com'])
+        message.content_subtype = 'html'
+        message.attach('notes.txt', 'Some notes', 'text/plain')
+        message.attach('data.bin', b'\x00\xff', 'application/octet-stream')
+        message.send()
+        mail_queue.send_queued()
+        sent = mail.outbox[0]
+        self.assertEqual(sent.content_subtype, 'html')
+        self.assertEqual(sent.attachments, [
+            ('notes.txt', 'Some notes', 'text/plain'),
+            ('data.bin', b'\x00\xff', 'application/octet-stream'),
+        ])
+        self.assertIn('text/html', sent.message().as_string())
+
+    # Test that MIME attachments are refused
+    def test_mime_attachment_refused(self):
+        message = EmailMessage(
+            'Subject', 'Body', 'from@example.com', ['to@example.com'])
+        message.attach(MIMEText('Inline'))
+        with self.assertRaises(ValueError):
+            message.send()
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    # Test that emails are leased rather than locked while sending
+    def test_emails_leased_while_sending(self):
+        send_mail('Subject', 'Body', 'from@example.com', ['to@example.com'])
+        now = timezone.now()
+        claimed = []
+
+        def send_messages(backend, messages):
+            # Another worker finds nothing due
+            claimed.extend(mail_queue._claim(now, mail_queue.BATCH_SIZE))
+            return len(messages)
+
+        with mock.patch.object(CountingBackend, 'send_messages',
+                               send_messages):
+            self.assertEqual(mail_queue.send_queued(now=now), (1, 0))
+        self.assertEqual(claimed, [])
+        # A crashed worker's emails are due again once the lease expires
+        email = OutboundEmail.objects.get()
+        email.status = OutboundEmail.PENDING
+        email.save()
+        self.assertEqual(
+            mail_queue._claim(now + mail_queue.LEASE_TIMEOUT, 10), [email])
+
+    # Test that failed emails are retried with an increasing delay
+    @override_settings(MAIL_QUEUE_BACKEND='main.tests.test_mail.FailingBackend')
+    def test_failed_email_retried_with_backoff(self):
+        send_mail('Subject', 'Body', 'from@example.com', ['to@example.com'])
+        now = timezone.now()
+        self.assertEqual(mail_queue.send_queued(now=now), (0, 1))
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, OutboundEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.next_attempt_at, now + timedelta(minutes=1))
+        self.assertIn('Server unavailable', email.last_error)
+
+        # Not due yet
+        self.assertEqual(mail_queue.send_queued(now=now), (0, 0))
+        later = email.next_attempt_at
+        self.assertEqual(mail_queue.send_queued(now=later), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.next_attempt_at, later + timedelta(minutes=2))
+
+    # Test that emails are given up after the maximum number of attempts
+    @override_settings(MAIL_QUEUE_BACKEND='main.tests.test_mail.FailingBackend')
+    def test_failed_email_given_up(self):
+        send_mail('Subject', 'Body', 'from@example.com', ['to@example.com'])
+        now = timezone.now()
+        for _ in range(mail_queue.MAX_ATTEMPTS):
+            mail_queue.send_queued(now=now)
+            now = OutboundEmail.objects.get().next_attempt_at
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, OutboundEmail.FAILED)
+        self.assertEqual(email.attempts, mail_queue.MAX_ATTEMPTS)
+        self.assertEqual(mail_queue.send_queued(now=now), (0, 0))
+
+    # Test the send_queued_mail command
+    def test_send_queued_mail_command(self):
+        for i in range(3):
+            send_mail(f'Subject {i}', 'Body', 'from@example.com',
+                      ['to@example.com'])
+        out = StringIO()
+        call_command('send_queued_mail', '--batch-size', '2', stdout=out)
+        self.assertIn('Sent 3 email(s), 0 failed.', out.getvalue())
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingBackend.opened, 2)
@@ -1,7 +1,8 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
-from main.models import Profile
+from main import search
+from main.models import Profile, Skill
 import os
 
 os.environ['DJANGO_SETTINGS_MODULE'] = 'skillified.settings'
@@ -89,3 +90,94 @@ class MentorSkillsTests(TestCase):
             username='mentoruser', password='TestPassword1word1')
         response = self.client.get(reverse('mentor_skills') + '?q=nonexistent')
         self.assertEqual(response.status_code, 200)
+
+
+class MentorSkillsSearchTests(TestCase):
+    """
+    Test suite for the full-text search of Mentor Skills.
+    This test suite includes the following tests:
+    - `test_search_matches_word_prefixes`: Ensures that search terms match
+      the start of words in the name and description.
+
+    - `test_search_ranks_name_matches_first`: Ensures that skills matching
+      in the name rank above skills matching only in the description.
+
+    - `test_search_requires_every_term`: Ensures that every search term
+      has to match.
+
+    - `test_search_only_returns_mentor_skills`: Ensures that skills of
+      non-mentors are not returned.
+
+    - `test_search_index_follows_edits_and_deletes`: Ensures that edited
+      and deleted skills are reflected in the search results.
+
+    - `test_search_unaffected_by_many_other_matches`: Ensures that mentor
+      skills are found however many better matching non-mentor skills
+      there are.
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.mentor_user = User.objects.create_user(
+            username='mentoruser', password='TestPassword1word1')
+        self.mentor_user.profile.is_mentor = True
+        self.mentor_user.profile.save()
+        self.non_mentor_user = User.objects.create_user(
+            username='nonmentoruser', password='TestPassword1word1')
+        self.client.login(
+            username='mentoruser', password='TestPassword1word1')
+
+        self.photography = Skill.objects.create(
+            name='Photography', description='Taking great pictures outdoors')
+        self.editing = Skill.objects.create(
+            name='Photo Editing', description='Retouching pictures')
+        self.cooking = Skill.objects.create(
+            name='Cooking', description='Food photography and plating')
+        self.hidden = Skill.objects.create(
+            name='Photo Walks', description='Hidden from search')
+        self.mentor_user.profile.skills.add(
+            self.photography, self.editing, self.cooking)
+        self.non_mentor_user.profile.skills.add(self.hidden)
+
+    def search(self, query):
+        response = self.client.get(reverse('mentor_skills'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return list(response.context['skills'])
+
+    def test_search_matches_word_prefixes(self):
+        self.assertCountEqual(
+            self.search('pict'), [self.photography, self.editing])
+
+    def test_search_ranks_name_matches_first(self):
+        results = self.search('photo')
+        self.assertCountEqual(
+            results, [self.photography, self.editing, self.cooking])
+        self.assertEqual(results[-1], self.cooking)
+
+    def test_search_requires_every_term(self):
+        self.assertEqual(self.search('photo retouch'), [self.editing])
+        self.assertEqual(self.search('photo nonexistent'), [])
+
+    def test_search_only_returns_mentor_skills(self):
+        self.assertNotIn(self.hidden, self.search('walks'))
+        self.assertNotIn(self.hidden, self.search(''))
+
+    def test_search_index_follows_edits_and_deletes(self):
+        self.cooking.name = 'Baking'
+        self.cooking.description = 'Bread and pastry'
+        self.cooking.save()
+        self.assertEqual(self.search('pastry'), [self.cooking])
+        self.assertNotIn(self.cooking, self.search('photo'))
+        self.editing.delete()
+        self.assertEqual(self.search('retouch'), [])
+
+    def test_search_unaffected_by_many_other_matches(self):
+        others = Skill.objects.bulk_create([
+            Skill(name=f'Photo {i}', description='Photo photo')
+            for i in range(600)
+        ])
+        for skill in others:
+            search.index_object(search.SKILL_INDEX, skill)
+        self.assertCountEqual(
+            self.search('photo'),
+            [self.photography, self.editing, self.cooking])
@@ -0,0 +1,175 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from main import notifications
+from main.models import (
+    Event, Notification, NotificationSetting, OutboundEmail, Profile, Skill)
+
+
+class NotificationTests(TestCase):
+    """
+    Unit tests for the notification fan-out and delivery.
+
+    This test case includes the following tests:
+    - Test that adding an event notifies the subscribed users only.
+    - Test that adding a skill notifies the subscribed users only.
+    - Test that the fan-out query count does not depend on the subscribers.
+    - Test that adding an event or a skill stays within the view's budget.
+    - Test that pending notifications are queued as emails.
+    - Test the send_notifications command.
+    - Test that the benchmark command rolls everything back.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mentor = User.objects.create_user(
+            username='mentor', password='TestPassword1',
+            email='mentor@example.com')
+        Profile.objects.filter(user=cls.mentor).update(is_mentor=True)
+        cls.subscriber = User.objects.create_user(
+            username='subscriber', email='subscriber@example.com')
+        cls.opted_out = User.objects.create_user(
+            username='opted_out', email='opted_out@example.com')
+        NotificationSetting.objects.create(
+            user=cls.opted_out, new_event=False, new_skill=False)
+        cls.skill = Skill.objects.create(
+            name='Python', description='Programming language')
+
+    def setUp(self):
+        self.client.login(username='mentor', password='TestPassword1')
+
+    def notified_users(self, kind):
+        return set(Notification.objects.filter(kind=kind).values_list(
+            'user__username', flat=True))
+
+    # Test that adding an event notifies the subscribed users only
+    def test_add_event_notifies_subscribers(self):
+        self.client.post(reverse('add_event', args=[self.skill.id]), {
+            'title': 'Python Workshop',
+            'overview': 'Learn Python',
+            'date_time': timezone.now() + timedelta(days=1),
+        })
+        event = Event.objects.get(title='Python Workshop')
+        self.assertEqual(
+            self.notified_users(Notification.NEW_EVENT), {'subscriber'})
+        notification = Notification.objects.get()
+        self.assertEqual(notification.event, event)
+        self.assertEqual(notification.skill, self.skill)
+        self.assertIsNone(notification.sent_at)
+
+    # Test that adding a skill notifies the subscribed users only
+    def test_add_skill_notifies_subscribers(self):
+        self.client.post(reverse('mentor_add_skill'), {
+            'name': 'Django',
+            'description': 'Web framework',
+        })
+        self.assertEqual(
+            self.notified_users(Notification.NEW_SKILL), {'subscriber'})
+        self.assertEqual(Notification.objects.get().skill.name, 'Django')
+
+    # Test that the fan-out query count does not depend on the subscribers
+    def test_fan_out_query_count(self):
+        User.objects.bulk_create([
+            User(username=f'user{i}', email=f'user{i}@example.com')
+            for i in range(48)
+        ])
+        with CaptureQueriesContext(connection) as ctx:
+            created = notifications.notify_new_skill(
+                self.skill, actor_id=self.mentor.id)
+        # 49 subscribers: one INSERT ... SELECT each for the notifications
+        # and the digest entries, within a savepoint
+        self.assertEqual(created, 49)
+        self.assertEqual(Notification.objects.count(), 49)
+        queries = [
+            q['sql'] for q in ctx.captured_queries
+            if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(len(queries), 2)
+        for sql in queries:
+            self.assertRegex(sql, r'^INSERT INTO .* SELECT ')
+
+    # Test that adding an event or a skill stays within the view's budget
+    @override_settings(QUERY_STATS_HEADERS=True)
+    def test_post_query_budget(self):
+        User.objects.bulk_create([
+            User(username=f'user{i}', email=f'user{i}@example.com')
+            for i in range(2000)
+        ])
+        # Budgets apply to a warm cache, e.g. the cached profile summary
+        self.client.get(reverse('home'))
+        posts = [
+            (reverse('add_event', args=[self.skill.id]), {
+                'title': 'Python Workshop',
+                'overview': 'Learn Python',
+                'date_time': timezone.now() + timedelta(days=1),
+            }),
+            (reverse('mentor_add_skill'), {
+                'name': 'Django',
+                'description': 'Web framework',
+            }),
+        ]
+        for url, data in posts:
+            with self.subTest(url=url):
+                response = self.client.post(url, data)
+                self.assertEqual(response.status_code, 302)
+                self.assertLessEqual(
+                    int(response['X-Query-Count']),
+                    int(response['X-Query-Budget']))
+        self.assertEqual(Notification.objects.count(), 2 * 2001)
+
+    # Test that pending notifications are queued as emails
+    def test_send_pending_queues_emails(self):
+        nobody = User.objects.create_user(username='nobody')
+        event = Event.objects.create(
+            title='Python Workshop',
+            overview='Learn Python',
+            date_time=timezone.now() + timedelta(days=1),
+            skill=self.skill,
+            owner=self.mentor,
+        )
+        notifications.notify_new_event(event)
+        self.assertEqual(Notification.objects.count(), 2)
+
+        Site.objects.get_current()
+        with self.assertNumQueries(5):
+            # SELECT, INSERT of the emails and UPDATE within a savepoint
+            self.assertEqual(notifications.send_pending(), 2)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.to, ['subscriber@example.com'])
+        self.assertEqual(email.subject, 'New event: Python Workshop')
+        self.assertIn(
+            reverse('event_detail', args=[event.id]), email.body)
+        self.assertFalse(Notification.objects.filter(
+            sent_at__isnull=True).exists())
+        self.assertTrue(Notification.objects.filter(user=nobody).exists())
+        self.assertEqual(notifications.send_pending(), 0)
+
+    # Test the send_notifications command
+    def test_send_notifications_command(self):
+        notifications.notify_new_skill(self.skill, actor_id=self.mentor.id)
+        out = StringIO()
+        call_command('send_notifications', stdout=out)
+        self.assertIn('Processed 1 notification(s).', out.getvalue())
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    # Test that the benchmark command rolls everything back
+    def test_bench_notifications_command(self):
+        users = User.objects.count()
+        # The existing subscribers are notified too
+        expected = 20 + len(notifications.recipients(Notification.NEW_EVENT))
+        out = StringIO()
+        call_command(
+            'bench_notifications', '--subscribers', '20', '--opted-out', '5',
+            stdout=out)
+        self.assertIn(f'Created {expected} notification(s)', out.getvalue())
+        self.assertIn(f'Queued {expected} email(s)', out.getvalue())
+        self.assertEqual(User.objects.count(), users)
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(OutboundEmail.objects.exists())
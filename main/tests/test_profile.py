@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
 from main.models import Profile, Skill
@@ -30,6 +32,9 @@ class ProfilePageTests(TestCase):
     - Adding a new skill.
     - Editing an existing skill.
     - Deleting an existing skill.
+    - Updating every field in a bounded number of queries.
+    - Replacing and adding skills with one diffed update.
+    - Writing nothing when the posted fields are unchanged.
     Each test method ensures that the corresponding functionality
     works as expected by checking the response status codes,
     updating the database, and verifying the changes.
@@ -231,3 +236,73 @@ class ProfilePageTests(TestCase):
         skill_exists = Skill.objects.filter(id=skill.id).exists()
         self.assertFalse(skill_exists)
         self.assertNotIn(skill, self.profile.skills.all())
+
+    def post_profile(self, skills, **data):
+        data.setdefault('skills', [skill.id for skill in skills])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('profile'), data)
+        self.assertEqual(response.status_code, 302)
+        return [q['sql'] for q in ctx.captured_queries]
+
+    def test_update_all_fields_query_count(self):
+        # The number of statements does not depend on the number of fields
+        # or skills posted
+        counts = []
+        for n in (1, 10):
+            self.profile.skills.clear()
+            skills = [
+                Skill.objects.create(name=f'Skill {n} {i}') for i in range(n)
+            ]
+            queries = self.post_profile(
+                skills,
+                facebook_link=f'https://facebook.com/{n}',
+                linkedin_link=f'https://linkedin.com/in/{n}',
+                email=f'user{n}@example.com',
+                about_me=f'About {n}',
+                new_skill=f'New skill {n}',
+            )
+            counts.append(len(queries))
+            profile_updates = [
+                sql for sql in queries
+                if sql.startswith('UPDATE "main_profile"')
+            ]
+            self.assertEqual(len(profile_updates), 1)
+        self.assertEqual(counts[0], counts[1])
+        self.profile.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(self.profile.about_me, 'About 10')
+        self.assertEqual(self.user.email, 'user10@example.com')
+        self.assertEqual(self.profile.skills.count(), 11)
+
+    def test_update_skills_diffed(self):
+        kept = Skill.objects.create(name='Kept')
+        removed = Skill.objects.create(name='Removed')
+        added = Skill.objects.create(name='Added')
+        self.profile.skills.add(kept, removed)
+        queries = self.post_profile([kept, added], new_skill='Brand New')
+        self.assertEqual(
+            set(self.profile.skills.values_list('name', flat=True)),
+            {'Kept', 'Added', 'Brand New'},
+        )
+        through = 'main_profile_skills'
+        self.assertEqual(len([
+            sql for sql in queries
+            if sql.startswith('DELETE') and through in sql
+        ]), 1)
+        self.assertEqual(len([
+            sql for sql in queries
+            if sql.startswith('INSERT') and through in sql
+        ]), 1)
+
+    def test_unchanged_fields_not_written(self):
+        self.profile.about_me = 'Same'
+        self.profile.save()
+        skill = Skill.objects.create(name='Python')
+        self.profile.skills.add(skill)
+        queries = self.post_profile(
+            [skill], about_me='Same', email=self.user.email)
+        self.assertFalse([
+            sql for sql in queries
+            if sql.startswith(('UPDATE', 'INSERT', 'DELETE'))
+            and ('main_profile' in sql or 'auth_user' in sql)
+        ])
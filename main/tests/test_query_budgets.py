@@ -0,0 +1,138 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from main.models import Event, NotificationSetting, Skill
+from main.urls import urlpatterns
+
+
+@override_settings(QUERY_STATS_HEADERS=True)
+class QueryBudgetTests(TestCase):
+    """
+    Test suite enforcing the query budgets declared on the views.
+    Every request is made against realistic data (mentor skills, events
+    with participants) and the query count reported by the
+    QueryBudgetMiddleware must stay within the view's budget.
+    This test suite includes the following tests:
+    - `test_every_view_declares_a_budget`: Ensures that no view in
+      main/urls.py is missing a query budget.
+
+    - `test_views_stay_within_budget`: Ensures that each view runs no more
+      queries than its budget.
+
+    - `test_budget_independent_of_data_size`: Ensures that the listing
+      pages do not run more queries as the data grows.
+
+    - `test_stats_headers`: Ensures that the query statistics are exposed
+      in the response headers.
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='mentoruser', password='TestPassword1word1')
+        self.user.profile.is_mentor = True
+        self.user.profile.save()
+        NotificationSetting.objects.create(user=self.user)
+        self.client.login(username='mentoruser', password='TestPassword1word1')
+        self.add_data(3)
+
+    def add_data(self, count):
+        start = timezone.now() + timezone.timedelta(days=1)
+        for i in range(count):
+            skill = Skill.objects.create(
+                name=f'Skill {Skill.objects.count()}',
+                description='Skill Description')
+            self.user.profile.skills.add(skill)
+            participants = [
+                User.objects.create_user(
+                    username=f'user{User.objects.count()}')
+                for _ in range(3)
+            ]
+            for j in range(2):
+                event = Event.objects.create(
+                    title=f'Event {i}-{j}',
+                    overview='Event Overview',
+                    date_time=start + timezone.timedelta(hours=i * 2 + j),
+                    skill=skill,
+                    owner=self.user
+                )
+                event.participants.add(self.user, *participants)
+        self.skill = Skill.objects.first()
+        self.event = Event.objects.first()
+
+    def requests(self):
+        skill_id = self.skill.id
+        event_id = self.event.id
+        return [
+            ('get', 'home', []),
+            ('get', 'about', []),
+            ('get', 'contact', []),
+            ('get', 'terms_privacy', []),
+            ('get', 'dashboard', []),
+            ('get', 'logout', []),
+            ('get', 'settings', []),
+            ('get', 'profile', []),
+            ('get', 'mentor_skills', []),
+            ('get', 'mentor_add_skill', []),
+            ('get', 'skill_detail', [skill_id]),
+            ('get', 'events', []),
+            ('get', 'events_api', []),
+            ('get', 'add_event', [skill_id]),
+            ('get', 'event_detail', [event_id]),
+            ('get', 'edit_event', [event_id]),
+            ('get', 'add_skill', []),
+            ('get', 'delete_skill_api', []),
+            ('get', 'delete_skill', [skill_id]),
+            ('get', 'edit_skill', []),
+            ('get', 'edit_skill_detail', []),
+            ('get', 'delete_profile_picture', []),
+            ('post', 'event_registration', [event_id],
+             {'action': 'unregister'}),
+            ('post', 'event_registration', [event_id],
+             {'action': 'register'}),
+            ('post', 'delete_event', [event_id]),
+        ]
+
+    def query_counts(self):
+        # Budgets apply to a warm cache, e.g. the cached profile summary
+        self.client.get(reverse('home'))
+        counts = {}
+        for method, name, args, *data in self.requests():
+            kwargs = {}
+            if data:
+                kwargs = {'data': data[0], 'content_type': 'application/json'}
+            response = getattr(self.client, method)(
+                reverse(name, args=args), **kwargs)
+            if data:
+                name = f'{name} {data[0]}'
+            counts[name] = (
+                int(response['X-Query-Count']),
+                int(response['X-Query-Budget']),
+            )
+        return counts
+
+    def test_every_view_declares_a_budget(self):
+        for pattern in urlpatterns:
+            self.assertTrue(
+                hasattr(pattern.callback, 'query_budget'),
+                f'{pattern.name} has no query budget')
+
+    def test_views_stay_within_budget(self):
+        for name, (count, budget) in self.query_counts().items():
+            with self.subTest(view=name):
+                self.assertLessEqual(count, budget)
+
+    def test_budget_independent_of_data_size(self):
+        small = self.query_counts()
+        self.add_data(10)
+        large = self.query_counts()
+        for name in ('dashboard', 'mentor_skills', 'events', 'profile',
+                     'skill_detail', 'event_detail'):
+            with self.subTest(view=name):
+                self.assertEqual(small[name][0], large[name][0])
+
+    def test_stats_headers(self):
+        response = self.client.get(reverse('events'))
+        self.assertIn('X-Query-Time-Ms', response)
+        self.assertEqual(response['X-Query-Duplicates'], '0')
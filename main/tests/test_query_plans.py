@@ -0,0 +1,112 @@
+from django.test import TestCase
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.contrib.auth.models import User
+from django.utils import timezone
+from main.models import Event, Profile, Skill
+from main.pagination import keyset_queryset, paginate_keyset
+
+
+class QueryPlanTests(TestCase):
+    """
+    Test suite asserting that the hot queries are served by indexes.
+    Each test runs EXPLAIN on the query shape used by a view and checks
+    that the plan uses the expected index, so a regression to a full
+    table scan fails here instead of in production.
+    This test suite includes the following tests:
+    - `test_events_listing_uses_date_time_index`: The events page range
+      and keyset ordering on date_time.
+
+    - `test_events_next_page_uses_date_time_index`: A deep events page
+      continuing from a cursor.
+
+    - `test_skill_events_use_skill_date_time_index`: The skill detail
+      events ordered by date.
+
+    - `test_dashboard_events_use_participant_index`: The dashboard events
+      of a participant.
+
+    - `test_popularity_expiry_uses_partial_index`: The expiry of counted
+      events that have passed.
+
+    - `test_popular_skills_use_popularity_index`: The popular skills
+      ranking.
+
+    - `test_mentor_skills_use_skill_index`: The mentor check of the
+      mentor skills listing.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='testuser', password='TestPassword1word1')
+        cls.skill = Skill.objects.create(
+            name='Test Skill', description='Test Skill Description')
+        now = timezone.now()
+        for i in range(10):
+            Event.objects.create(
+                title=f'Event {i}',
+                overview=f'Overview {i}',
+                date_time=now + timezone.timedelta(days=i - 5),
+                skill=cls.skill,
+                owner=cls.user
+            )
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables are cheaper to scan; make the planner show
+            # whether an index is usable at all
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, msg=f'Query plan:\n{plan}')
+
+    def test_events_listing_uses_date_time_index(self):
+        self.assertUsesIndex(
+            Event.objects.filter(date_time__gte=timezone.now())
+            .order_by('date_time', 'id')[:21],
+            'event_date_time_idx')
+
+    def test_events_next_page_uses_date_time_index(self):
+        ordering = ('date_time', 'id')
+        page = paginate_keyset(Event.objects.all(), ordering, page_size=2)
+        self.assertUsesIndex(
+            keyset_queryset(
+                Event.objects.filter(date_time__gte=timezone.now()),
+                ordering,
+                page.next_cursor,
+            )[:21],
+            'event_date_time_idx')
+
+    def test_skill_events_use_skill_date_time_index(self):
+        self.assertUsesIndex(
+            Event.objects.filter(skill=self.skill).order_by('date_time'),
+            'event_skill_date_time_idx')
+
+    def test_dashboard_events_use_participant_index(self):
+        self.assertUsesIndex(
+            Event.objects.filter(
+                participants=self.user, date_time__gte=timezone.now()
+            ).order_by('date_time'),
+            'main_event_participants_user_id')
+
+    def test_popularity_expiry_uses_partial_index(self):
+        self.assertUsesIndex(
+            Event.objects.filter(
+                popularity_counted=True, date_time__lt=timezone.now()),
+            'event_counted_date_time_idx')
+
+    def test_popular_skills_use_popularity_index(self):
+        self.assertUsesIndex(
+            Skill.objects.filter(popularity__gt=0)
+            .order_by('-popularity', 'name')[:6],
+            'main_skill_popularity')
+
+    def test_mentor_skills_use_skill_index(self):
+        self.assertUsesIndex(
+            Skill.objects.filter(Exists(
+                Profile.skills.through.objects.filter(
+                    skill_id=OuterRef('pk'), profile__is_mentor=True))),
+            'main_profile_skills_skill_id')
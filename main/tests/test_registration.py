@@ -0,0 +1,255 @@
+import threading
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from main import registration
+from main.models import Event, Skill
+from main.tests.utils import FileDatabaseMixin
+
+
+def create_event(owner, capacity=None):
+    skill = Skill.objects.create(name='Python', description='')
+    return Event.objects.create(
+        title='Python Workshop',
+        overview='Learn Python',
+        date_time=timezone.now() + timedelta(days=1),
+        skill=skill,
+        owner=owner,
+        capacity=capacity,
+    )
+
+
+class RegistrationTests(TestCase):
+    """
+    Unit tests for event registration and participant counts.
+
+    This test case includes the following tests:
+    - Test that registering and unregistering update the count.
+    - Test that registering twice does not count twice.
+    - Test that registration is refused when the event is full.
+    - Test that the event detail page enforces the capacity.
+    - Test that other changes to participants keep the count right.
+    - Test that saving a stale event does not overwrite the count.
+    - Test registering and unregistering through the API.
+    - Test that repeated API requests write nothing.
+    - Test that the API refuses registrations to a full event.
+    - Test that the API rejects invalid requests.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username='owner', password='TestPassword1')
+        cls.user = User.objects.create_user(
+            username='testuser', password='TestPassword1')
+
+    def count(self, event):
+        event.refresh_from_db()
+        return event.participant_count
+
+    # Test that registering and unregistering update the count
+    def test_register_and_unregister(self):
+        event = create_event(self.owner)
+        self.assertTrue(registration.register(event, self.user))
+        self.assertEqual(self.count(event), 1)
+        self.assertIn(self.user, event.participants.all())
+        self.assertTrue(registration.unregister(event, self.user))
+        self.assertEqual(self.count(event), 0)
+        self.assertFalse(registration.unregister(event, self.user))
+        self.assertEqual(self.count(event), 0)
+
+    # Test that registering twice does not count twice
+    def test_register_twice(self):
+        event = create_event(self.owner)
+        registration.register(event, self.user)
+        self.assertFalse(registration.register(event, self.user))
+        self.assertEqual(self.count(event), 1)
+
+    # Test that registration is refused when the event is full
+    def test_register_full_event(self):
+        event = create_event(self.owner, capacity=1)
+        registration.register(event, self.owner)
+        with self.assertRaises(registration.EventFull):
+            registration.register(event, self.user)
+        self.assertEqual(self.count(event), 1)
+        # Already registered users are not refused
+        self.assertFalse(registration.register(event, self.owner))
+
+    # Test that the event detail page enforces the capacity
+    def test_event_detail_full_event(self):
+        event = create_event(self.owner, capacity=1)
+        registration.register(event, self.owner)
+        self.client.login(username='testuser', password='TestPassword1')
+        url = reverse('event_detail', args=[event.id])
+        response = self.client.get(url)
+        self.assertContains(response, 'Event Full')
+        self.assertContains(response, '1 / 1')
+        response = self.client.post(url, {'action': 'register'}, follow=True)
+        self.assertContains(response, 'Sorry, this event is full.')
+        self.assertNotIn(self.user, event.participants.all())
+
+    # Test that other changes to participants keep the count right
+    def test_count_follows_other_changes(self):
+        event = create_event(self.owner)
+        others = [
+            User.objects.create_user(username=f'user{i}') for i in range(3)
+        ]
+        event.participants.add(*others)
+        self.assertEqual(self.count(event), 3)
+        self.user.events.add(event)
+        self.assertEqual(self.count(event), 4)
+        others[0].delete()
+        self.assertEqual(self.count(event), 3)
+        event.participants.clear()
+        self.assertEqual(self.count(event), 0)
+
+    # Test that saving a stale event does not overwrite the count
+    def test_stale_save_keeps_count(self):
+        event = create_event(self.owner)
+        stale = Event.objects.get(pk=event.pk)
+        registration.register(event, self.user)
+        stale.title = 'Renamed'
+        stale.save()
+        event.refresh_from_db()
+        self.assertEqual(event.title, 'Renamed')
+        self.assertEqual(event.participant_count, 1)
+
+
+    def post_api(self, event, action):
+        return self.client.post(
+            reverse('event_registration', args=[event.id]),
+            {'action': action},
+            content_type='application/json',
+        )
+
+    # Test registering and unregistering through the API
+    def test_api_register_and_unregister(self):
+        event = create_event(self.owner, capacity=10)
+        self.client.login(username='testuser', password='TestPassword1')
+        response = self.post_api(event, 'register')
+        self.assertEqual(response.json(), {
+            'success': True,
+            'registered': True,
+            'participant_count': 1,
+            'capacity': 10,
+        })
+        self.assertIn(self.user, event.participants.all())
+        event.skill.refresh_from_db()
+        self.assertEqual(event.skill.popularity, 1)
+
+        response = self.post_api(event, 'unregister')
+        self.assertEqual(response.json()['registered'], False)
+        self.assertEqual(response.json()['participant_count'], 0)
+        self.assertNotIn(self.user, event.participants.all())
+        event.skill.refresh_from_db()
+        self.assertEqual(event.skill.popularity, 0)
+
+    # Test that repeated API requests write nothing
+    def test_api_idempotent(self):
+        event = create_event(self.owner)
+        self.client.login(username='testuser', password='TestPassword1')
+        for action in ('register', 'unregister'):
+            self.post_api(event, action)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.post_api(event, action)
+            self.assertEqual(
+                response.json()['registered'], action == 'register')
+            self.assertEqual(
+                response.json()['participant_count'],
+                1 if action == 'register' else 0)
+            # Only the conditional UPDATE, which matches no row
+            writes = [
+                q['sql'] for q in ctx.captured_queries
+                if q['sql'].startswith(('INSERT', 'DELETE'))
+                or q['sql'].startswith('UPDATE "main_skill"')
+            ]
+            self.assertEqual(writes, [])
+
+    # Test that the API refuses registrations to a full event
+    def test_api_full_event(self):
+        event = create_event(self.owner, capacity=1)
+        registration.register(event, self.owner)
+        self.client.login(username='testuser', password='TestPassword1')
+        response = self.post_api(event, 'register')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['error'], 'Sorry, this event is full.')
+        self.assertEqual(response.json()['participant_count'], 1)
+        self.assertFalse(response.json()['registered'])
+
+    # Test that the API rejects invalid requests
+    def test_api_invalid_requests(self):
+        event = create_event(self.owner)
+        self.client.login(username='testuser', password='TestPassword1')
+        url = reverse('event_registration', args=[event.id])
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertEqual(self.post_api(event, 'delete').status_code, 400)
+        response = self.client.post(
+            url, 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            reverse('event_registration', args=[event.id + 1]),
+            {'action': 'register'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class ConcurrentRegistrationTests(FileDatabaseMixin, TransactionTestCase):
+    """
+    Concurrency test for event registration.
+
+    This test case includes the following tests:
+    - Test that simultaneous registrations never exceed the capacity.
+    """
+    REGISTRATIONS = 200
+    CAPACITY = 50
+
+    def register(self, event, user, results, barrier):
+        try:
+            barrier.wait()
+            while True:
+                try:
+                    results.append(registration.register(event, user))
+                    return
+                except registration.EventFull:
+                    results.append(None)
+                    return
+                except OperationalError:
+                    # SQLite reports lock contention instead of waiting
+                    continue
+        finally:
+            connection.close()
+
+    # Test that simultaneous registrations never exceed the capacity
+    def test_concurrent_registrations(self):
+        owner = User.objects.create_user(username='owner')
+        event = create_event(owner, capacity=self.CAPACITY)
+        User.objects.bulk_create([
+            User(username=f'user{i}') for i in range(self.REGISTRATIONS)
+        ])
+        users = list(User.objects.filter(username__startswith='user'))
+
+        results = []
+        barrier = threading.Barrier(len(users))
+        threads = [
+            threading.Thread(
+                target=self.register, args=(event, user, results, barrier))
+            for user in users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        event.refresh_from_db()
+        self.assertEqual(len(results), self.REGISTRATIONS)
+        self.assertEqual(results.count(True), self.CAPACITY)
+        self.assertEqual(event.participant_count, self.CAPACITY)
+        self.assertEqual(event.participants.count(), self.CAPACITY)
+        event.skill.refresh_from_db()
+        self.assertEqual(event.skill.popularity, self.CAPACITY)
@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from main.models import Profile
+
+
+class SignupTests(TestCase):
+    """
+    Unit tests for signup and the profile writes around user saves.
+
+    This test case includes the following tests:
+    - Test that signing up as a mentor writes a mentor profile only once.
+    - Test that signing up as a non-mentor writes the profile only once.
+    - Test that saving a user does not write its profile.
+    - Test that logging in does not write the profile.
+    """
+
+    def signup(self, mentor):
+        return self.client.post(reverse('account_signup'), {
+            'username': 'newuser',
+            'email': 'newuser@example.com',
+            'password1': 'TestPassword1',
+            'password2': 'TestPassword1',
+            'first_name': 'New',
+            'last_name': 'User',
+            'mentor': mentor,
+        })
+
+    def profile_writes(self, queries):
+        return [
+            q['sql'] for q in queries
+            if 'main_profile' in q['sql']
+            and q['sql'].startswith(('INSERT', 'UPDATE'))
+        ]
+
+    # Test that signing up as a mentor writes a mentor profile only once
+    def test_signup_as_mentor(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.signup('yes')
+        user = User.objects.get(username='newuser')
+        self.assertEqual(user.first_name, 'New')
+        self.assertEqual(user.last_name, 'User')
+        self.assertTrue(user.profile.is_mentor)
+        # The INSERT from the signal sets the mentor flag
+        self.assertEqual(len(self.profile_writes(ctx.captured_queries)), 1)
+
+    # Test that signing up as a non-mentor writes the profile only once
+    def test_signup_as_non_mentor(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.signup('no')
+        user = User.objects.get(username='newuser')
+        self.assertFalse(user.profile.is_mentor)
+        self.assertEqual(len(self.profile_writes(ctx.captured_queries)), 1)
+
+    # Test that saving a user does not write its profile
+    def test_user_save_does_not_write_profile(self):
+        user = User.objects.create_user(
+            username='testuser', password='TestPassword1')
+        user.first_name = 'Changed'
+        with CaptureQueriesContext(connection) as ctx:
+            user.save()
+        self.assertEqual(self.profile_writes(ctx.captured_queries), [])
+        self.assertTrue(Profile.objects.filter(user=user).exists())
+
+    # Test that logging in does not write the profile
+    def test_login_does_not_write_profile(self):
+        User.objects.create_user(
+            username='testuser', password='TestPassword1')
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(self.client.login(
+                username='testuser', password='TestPassword1'))
+        self.assertEqual(self.profile_writes(ctx.captured_queries), [])
@@ -0,0 +1,156 @@
+import gzip
+import shutil
+import tempfile
+
+import brotli
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from main import static_build
+from PIL import Image
+
+IMMUTABLE = 'max-age=315360000, public, immutable'
+
+
+class StaticBuildTests(TestCase):
+    """
+    Unit tests for the static asset build of collectstatic.
+
+    This test case includes the following tests:
+    - Test that the scripts and styles are minified into bundles.
+    - Test that the bundles are precompressed with Brotli and gzip.
+    - Test that the skill and about images get narrower copies.
+    - Test that pages load the bundles and image srcsets.
+    - Test that hashed files are served with immutable caching headers.
+    - Test that Brotli and gzip are negotiated.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, static_root)
+        settings = override_settings(
+            STATIC_ROOT=static_root,
+            STORAGES={
+                'default': {
+                    'BACKEND': 'django.core.files.storage.FileSystemStorage',
+                },
+                'staticfiles': {
+                    'BACKEND': 'main.static_build.BuildStaticFilesStorage',
+                },
+                'avatars': {
+                    'BACKEND': 'django.core.files.storage.FileSystemStorage',
+                },
+            },
+            # Only the site's own files, which is all the build touches
+            STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder',
+            ],
+        )
+        settings.enable()
+        cls.addClassCleanup(settings.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def read(self, name):
+        with staticfiles_storage.open(name) as file:
+            return file.read()
+
+    def hashed(self, name):
+        return staticfiles_storage.hashed_files[name]
+
+    # Test that the scripts and styles are minified into bundles
+    def test_bundles(self):
+        for bundle, sources in static_build.STATIC_BUNDLES.items():
+            with self.subTest(bundle=bundle):
+                content = self.read(self.hashed(bundle)).decode()
+                self.assertLess(
+                    len(content),
+                    sum(len(self.read(source)) for source in sources))
+                self.assertNotIn('\n\n', content)
+        scripts = self.read(self.hashed('js/site.js')).decode()
+        for function in ('initializeDatePicker', 'toggleEdit',
+                         'loadMoreEvents', 'submitRegistration'):
+            self.assertIn(f'function {function}(', scripts)
+        self.assertNotIn('/**', scripts)
+
+    # Test that the bundles are precompressed with Brotli and gzip
+    def test_precompressed(self):
+        name = self.hashed('js/site.js')
+        content = self.read(name)
+        self.assertEqual(brotli.decompress(self.read(name + '.br')), content)
+        self.assertEqual(gzip.decompress(self.read(name + '.gz')), content)
+
+    # Test that the skill and about images get narrower copies
+    def test_image_copies(self):
+        for name in ('images/skills/cooking.webp', 'images/about/join.webp'):
+            for width in static_build.RESPONSIVE_IMAGE_WIDTHS:
+                variant = static_build.image_variant_name(name, width)
+                with self.subTest(variant=variant), \
+                        staticfiles_storage.open(self.hashed(variant)) as file:
+                    self.assertEqual(Image.open(file).width, width)
+
+    # Test that pages load the bundles and image srcsets
+    def test_pages_use_build(self):
+        response = self.client.get(reverse('home'))
+        self.assertContains(
+            response, f'src="/static/{self.hashed("js/site.js")}"')
+        self.assertContains(
+            response, f'href="/static/{self.hashed("css/site.css")}"')
+        self.assertNotContains(response, 'scripts.js')
+        self.assertContains(
+            response,
+            f'/static/{self.hashed("images/skills/cooking-400w.webp")} 400w, '
+            f'/static/{self.hashed("images/skills/cooking-800w.webp")} 800w, '
+            f'/static/{self.hashed("images/skills/cooking.webp")} 1200w"')
+
+    # Test that hashed files are served with immutable caching headers
+    def test_immutable_headers(self):
+        for name in ('js/site.js', 'css/site.css',
+                     'images/skills/cooking-400w.webp'):
+            with self.subTest(name=name):
+                response = self.client.get(f'/static/{self.hashed(name)}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Cache-Control'], IMMUTABLE)
+        # Unhashed names can change content, so they are not immutable
+        response = self.client.get('/static/js/site.js')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    # Test that Brotli and gzip are negotiated
+    def test_compression_negotiated(self):
+        url = f'/static/{self.hashed("js/site.js")}'
+        for accept, encoding in [('gzip, deflate, br', 'br'),
+                                 ('gzip', 'gzip')]:
+            with self.subTest(accept=accept):
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING=accept)
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertEqual(response['Cache-Control'], IMMUTABLE)
+
+
+class StaticAssetTagTests(SimpleTestCase):
+    """
+    Unit tests for the static_assets template tags without a build.
+
+    This test case includes the following tests:
+    - Test that a bundle falls back to its source files.
+    - Test that images without copies get no srcset.
+    """
+
+    def render(self, source):
+        return Template('{% load static_assets %}' + source).render(Context())
+
+    # Test that a bundle falls back to its source files
+    def test_bundle_fallback(self):
+        html = self.render("{% static_bundle 'js/site.js' %}")
+        self.assertEqual(
+            html.splitlines(),
+            [f'<script src="/static/{source}"></script>'
+             for source in static_build.STATIC_BUNDLES['js/site.js']])
+
+    # Test that images without copies get no srcset
+    def test_srcset_fallback(self):
+        self.assertEqual(
+            self.render("{% static_srcset 'images/skills/cooking.webp' %}"),
+            '')
@@ -0,0 +1,66 @@
+import io
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.template import engines
+from django.test import TestCase
+from main.management.commands.bench_templates import page_templates
+from main.template_warmup import template_names, warm_templates
+
+
+class TemplateLoadingTests(TestCase):
+    """
+    Unit tests for the template loading configuration, warm-up and
+    benchmark.
+
+    This test case includes the following tests:
+    - Test that templates are compiled once and cached.
+    - Test that the warm-up compiles every template.
+    - Test that the benchmark renders every page template.
+    - Test that the benchmark fails on slow templates.
+    """
+
+    def loader(self):
+        return engines['django'].engine.template_loaders[0]
+
+    # Test that templates are compiled once and cached
+    def test_cached_loader(self):
+        self.assertEqual(
+            settings.TEMPLATES[0]['OPTIONS']['loaders'][0][0],
+            'django.template.loaders.cached.Loader')
+        loader = self.loader()
+        loader.reset()
+        first = loader.get_template('main/about.html')
+        self.assertIs(loader.get_template('main/about.html'), first)
+
+    # Test that the warm-up compiles every template
+    def test_warm_templates(self):
+        loader = self.loader()
+        loader.reset()
+        names = template_names()
+        self.assertIn('main/base.html', names)
+        self.assertIn('account/login.html', names)
+        self.assertEqual(warm_templates(), len(names))
+        self.assertLessEqual(set(names), set(loader.get_template_cache))
+
+    # Test that the benchmark renders every page template
+    def test_bench_templates(self):
+        out = io.StringIO()
+        call_command(
+            'bench_templates', '--iterations', '2', '--items', '3',
+            stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(page_templates()), 15)
+        self.assertEqual(
+            [line.split(':')[0] for line in lines], page_templates())
+        for line in lines:
+            self.assertRegex(line, r'first [\d.]+ ms, p50 [\d.]+ ms, p99')
+
+    # Test that the benchmark fails on slow templates
+    def test_bench_templates_max_ms(self):
+        with self.assertRaisesMessage(CommandError, 'main/events.html'):
+            call_command(
+                'bench_templates', '--iterations', '1', '--items', '3',
+                '--template', 'main/events.html', '--max-ms', '0',
+                stdout=io.StringIO())
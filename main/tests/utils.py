@@ -0,0 +1,44 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+
+from django.db import connection, connections
+
+
+@contextmanager
+def sqlite_file_database():
+    """
+    Moves the in-memory SQLite test database to a temporary file for the
+    duration, so that connections can be opened and closed, and several
+    threads can wait for each other's locks.
+    """
+    memory = connections['default']
+    settings = connections.settings['default']
+    with tempfile.TemporaryDirectory() as directory:
+        name = os.path.join(directory, 'test.sqlite3')
+        memory.ensure_connection()
+        target = sqlite3.connect(name)
+        memory.connection.backup(target)
+        target.close()
+        connections.settings['default'] = {**settings, 'NAME': name}
+        connections['default'] = connections.create_connection('default')
+        try:
+            yield
+        finally:
+            connections['default'].close()
+            connections['default'] = memory
+            connections.settings['default'] = settings
+
+
+class FileDatabaseMixin:
+    """
+    Runs a test case against a file copy of the SQLite test database, while
+    the rest of the suite keeps the faster in-memory database.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            cls.enterClassContext(sqlite_file_database())
+        super().setUpClass()
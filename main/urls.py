@@ -11,8 +11,11 @@ urlpatterns = [
     path('mentor_add_skill/', views.mentor_add_skill, name='mentor_add_skill'),
     path('skill/<int:skill_id>/', views.skill_detail, name='skill_detail'),
     path('events/', views.events, name='events'),
+    path('events/api/', views.events_api, name='events_api'),
     path('add_event/<int:skill_id>/', views.add_event, name='add_event'),
     path('event/<int:event_id>/', views.event_detail, name='event_detail'),
+    path('event/<int:event_id>/registration/',
+         views.event_registration_api, name='event_registration'),
     path('event/<int:event_id>/edit/', views.edit_event, name='edit_event'),
     path('event/<int:event_id>/delete/',
          views.delete_event, name='delete_event'),
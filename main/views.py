@@ -1,32 +1,63 @@
 import json
 import os
+from datetime import datetime, time, timedelta
 
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import update_session_auth_hash
 from django.core.mail import send_mail
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.shortcuts import redirect, render, get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.functional import SimpleLazyObject
 from django.views.decorators.csrf import csrf_protect
-from django.db.models import Q, Count
+from django.db import transaction
+from django.db.models import Count, Exists, Max, OuterRef, Sum
 
+from . import avatars, notifications, popularity, registration
+from .conditional import conditional_page
 from .forms import ContactForm, SkillForm, EventForm, EditEventForm
-from .models import Skill, Event, NotificationSetting
+from .fragments import (
+    FRAGMENT_CACHE_TIMEOUT,
+    afragment_version,
+    fragment_version,
+)
+from .models import Skill, Event, NotificationSetting, Profile
+from .profile_summary import aget_profile_summary, get_profile_summary
+from .query_budget import query_budget
+from .pagination import InvalidCursor, apaginate_keyset, paginate_keyset
+from .search import EVENT_INDEX, highlight, search_events, search_skills
+
+
+async def _arender(request, template_name, context=None):
+    """
+    Renders a template from an async view. The viewer and their profile
+    summary are loaded with the async ORM first. Rendering runs in a thread,
+    where the context processors and the lazy parts of the templates, such as
+    cached fragments that have to be rendered again, may use the database.
+    """
+    await aget_profile_summary(request)
+    return await sync_to_async(render)(request, template_name, context)
+
 
 # Home page view
 
 
-def home(request):
+@query_budget(2)
+async def home(request):
     """
     Renders the home page.
     """
-    return render(request, "main/home.html")
+    return await _arender(request, "main/home.html")
 
 
 # About page view
 
 
+@query_budget(2)
 def about(request):
     """
     Renders the about page.
@@ -37,6 +68,7 @@ def about(request):
 # Contact page view with form handling
 
 
+@query_budget(2)
 def contact(request):
     """
     Handles the contact form submission. If the form is valid, sends an email
@@ -45,8 +77,8 @@ def contact(request):
     if request.method == "POST":
         form = ContactForm(request.POST)
         if form.is_valid():
-            # Process the form data and send an email to the
-            # email host listed in the .env file
+            # Queue an email to the email host listed in the .env file,
+            # delivered by the send_queued_mail worker
             EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 
             # email content
@@ -69,6 +101,7 @@ def contact(request):
 # Terms and privacy page view
 
 
+@query_budget(2)
 def terms_privacy(request):
     """
     Renders the terms and privacy page.
@@ -80,40 +113,46 @@ def terms_privacy(request):
 
 
 @login_required
-def dashboard(request):
+@query_budget(5)
+async def dashboard(request):
     """
     Renders the user dashboard, displaying upcoming events,
     recent skills, and popular skills.
     """
-    user = request.user
+    user = await request.auser()
     today = timezone.now()
 
     # Fetch upcoming events where the user is a participant
-    upcoming_events = Event.objects.filter(
-        participants=user, date_time__gte=today
-    ).order_by("date_time")
+    upcoming_events = [
+        event
+        async for event in Event.objects.filter(
+            participants=user, date_time__gte=today
+        ).order_by("date_time")
+    ]
 
     # Fetch recent skills where the user has signed up as an event participant
-    recent_skills = Skill.objects.filter(events__participants=user).distinct()
+    recent_skills = [
+        skill
+        async for skill in Skill.objects.filter(
+            events__participants=user
+        ).distinct()
+    ]
 
-    # Fetch popular skills to explore
-    popular_skills = (
-        Skill.objects.filter(events__date_time__gte=today)
-        .annotate(total_participants=Count("events__participants"))
-        .order_by("-total_participants")
-    )
+    # Fetch popular skills to explore from the maintained popularity ranking
+    popular_skills = await popularity.apopular_skills()
 
     context = {
         "upcoming_events": upcoming_events,
         "recent_skills": recent_skills,
         "popular_skills": popular_skills,
     }
-    return render(request, "main/dashboard.html", context)
+    return await _arender(request, "main/dashboard.html", context)
 
 
 # Logout page view
 
 
+@query_budget(2)
 def logout(request):
     """
     Renders the logout confirmation page.
@@ -125,6 +164,7 @@ def logout(request):
 
 
 @login_required
+@query_budget(3)
 def settings(request):
     """
     Handles the settings form submission. Allows the user to update their
@@ -193,8 +233,9 @@ def settings(request):
                 messages.error(request, "Current password is incorrect.")
                 return redirect("settings")
 
-        profile.is_mentor = is_mentor
-        profile.save()
+        if profile.is_mentor != is_mentor:
+            profile.is_mentor = is_mentor
+            profile.save(update_fields=["is_mentor"])
 
         # Update notification settings
         notification_settings, created = (
@@ -203,19 +244,29 @@ def settings(request):
         notification_settings.new_message = notify_messages
         notification_settings.new_event = notify_events
         notification_settings.new_skill = notify_skills
+        digest = request.POST.get("digest", NotificationSetting.DIGEST_OFF)
+        if digest in dict(NotificationSetting.DIGEST_CHOICES):
+            notification_settings.digest = digest
         notification_settings.save()
 
         user.save()
         messages.success(request, "Settings updated successfully.")
         return redirect("settings")
 
-    return render(request, "main/settings.html")
+    return render(
+        request,
+        "main/settings.html",
+        {"digest_choices": NotificationSetting.DIGEST_CHOICES},
+    )
 
 
 # Profile page view with profile update handling
 
+PROFILE_TEXT_FIELDS = ("facebook_link", "linkedin_link", "about_me")
+
 
 @login_required
+@query_budget(4)
 def profile(request):
     """
     Handles the profile update form submission. Allows the user to update their
@@ -226,41 +277,65 @@ def profile(request):
     all_skills = Skill.objects.all()
 
     if request.method == "POST":
-        # Update profile picture if provided
+        # Collect the changed fields first, then write them in one transaction
+        # with one UPDATE per model and one diffed skills update
+        profile_fields = []
+        # Queue the profile picture if provided, the avatar worker resizes it
+        picture = None
         if "profile_picture" in request.FILES:
-            profile.profile_picture = request.FILES["profile_picture"]
-            profile.save()
-        # Update Facebook link if provided
-        if "facebook_link" in request.POST:
-            profile.facebook_link = request.POST["facebook_link"]
-            profile.save()
-        # Update LinkedIn link if provided
-        if "linkedin_link" in request.POST:
-            profile.linkedin_link = request.POST["linkedin_link"]
-            profile.save()
+            try:
+                picture = avatars.validate(request.FILES["profile_picture"])
+            except avatars.InvalidImage as e:
+                messages.error(request, str(e))
+        # Update social links and about me section if provided
+        for field in PROFILE_TEXT_FIELDS:
+            if field in request.POST:
+                value = request.POST[field]
+                if getattr(profile, field) != value:
+                    setattr(profile, field, value)
+                    profile_fields.append(field)
         # Update email if provided
-        if "email" in request.POST:
+        email_changed = (
+            "email" in request.POST and user.email != request.POST["email"]
+        )
+        if email_changed:
             user.email = request.POST["email"]
-            user.save()
-        # Update about me section if provided
-        if "about_me" in request.POST:
-            profile.about_me = request.POST["about_me"]
-            profile.save()
-        # Update skills if provided
-        if "skills" in request.POST:
-            skill_ids = request.POST.getlist("skills")
-            skills = Skill.objects.filter(id__in=skill_ids)
-            profile.skills.set(skills)
-            profile.save()
-        # Add new skill if provided
-        if "new_skill" in request.POST:
-            new_skill_name = request.POST["new_skill"].strip()
+
+        with transaction.atomic():
+            if picture is not None:
+                avatars.enqueue(profile, picture)
+            if profile_fields:
+                profile.save(update_fields=profile_fields)
+            if email_changed:
+                user.save(update_fields=["email"])
+
+            # Update skills if provided
+            skill_ids = None
+            if "skills" in request.POST:
+                skill_ids = set(
+                    Skill.objects.filter(
+                        id__in=request.POST.getlist("skills")
+                    ).values_list("id", flat=True)
+                )
+            # Add new skill if provided
+            new_skill_name = request.POST.get("new_skill", "").strip()
             if new_skill_name:
                 new_skill, created = Skill.objects.get_or_create(
                     name=new_skill_name
                 )
-                profile.skills.add(new_skill)
-                profile.save()
+                if skill_ids is None:
+                    profile.skills.add(new_skill)
+                else:
+                    skill_ids.add(new_skill.id)
+            # set() only deletes and inserts the rows that differ
+            if skill_ids is not None:
+                profile.skills.set(skill_ids)
+        if picture is not None:
+            messages.info(
+                request,
+                "Your new profile picture is being processed and will "
+                "appear shortly.",
+            )
         # Redirect to the profile page after saving changes
         return redirect("profile")
 
@@ -268,6 +343,8 @@ def profile(request):
         "user": user,
         "profile": profile,
         "all_skills": all_skills,
+        # Evaluated once here, the template lists the skills twice
+        "skills": list(profile.skills.all()),
     }
     return render(request, "main/profile.html", context)
 
@@ -277,6 +354,7 @@ def profile(request):
 
 @login_required
 @csrf_protect
+@query_budget(2)
 def add_skill(request):
     """
     Adds a new skill to the user's profile if the request method is POST and
@@ -299,6 +377,7 @@ def add_skill(request):
 
 @login_required
 @csrf_protect
+@query_budget(2)
 def delete_skill_api(request):
     """
     Deletes an existing skill from the user's profile if the request method is
@@ -329,6 +408,7 @@ def delete_skill_api(request):
 
 @login_required
 @csrf_protect
+@query_budget(3)
 def delete_skill(request, skill_id):
     """
     Deletes an existing skill if the request method is POST and the skill ID is provided.
@@ -354,6 +434,7 @@ def delete_skill(request, skill_id):
 
 @login_required
 @csrf_protect
+@query_budget(2)
 def edit_skill(request):
     """
     Edits an existing skill in the user's profile if the request method is POST
@@ -385,6 +466,7 @@ def edit_skill(request):
 
 @login_required
 @csrf_protect
+@query_budget(2)
 def edit_skill_detail(request):
     """
     Edits an existing skill if the request method is POST and the required data is provided.
@@ -419,6 +501,7 @@ def edit_skill_detail(request):
 
 @login_required
 @csrf_protect
+@query_budget(2)
 def delete_profile_picture(request):
     """
     Deletes the user's profile picture if the request method is POST and the
@@ -426,8 +509,10 @@ def delete_profile_picture(request):
     """
     if request.method == "POST" and "delete_profile_picture" in request.POST:
         profile = request.user.profile
-        profile.profile_picture = ""
-        profile.save()
+        with transaction.atomic():
+            avatars.clear(profile)
+            profile.profile_picture = ""
+            profile.save()
         # Redirect to the profile page after deletion
         return redirect("profile")
     return JsonResponse({"success": False, "error": "Invalid request method"})
@@ -436,25 +521,49 @@ def delete_profile_picture(request):
 # Mentor Skills page view
 
 
+def _mentor_skills():
+    """
+    Returns the skills belonging to at least one mentor, without a join and
+    distinct.
+    """
+    return Skill.objects.filter(
+        Exists(
+            Profile.skills.through.objects.filter(
+                skill_id=OuterRef("pk"), profile__is_mentor=True
+            )
+        )
+    )
+
+
+async def _mentor_skills_state(request):
+    """
+    Returns the change markers of the mentor skills page. The count and the
+    sum of the ids change when skills join or leave the list.
+    """
+    marker = await _mentor_skills().aaggregate(
+        updated_at=Max("updated_at"), count=Count("id"), ids=Sum("id")
+    )
+    key = (marker["updated_at"], marker["count"], marker["ids"])
+    return key, marker["updated_at"]
+
+
 @login_required
-def mentor_skills(request):
+@query_budget(4)
+@conditional_page(_mentor_skills_state)
+async def mentor_skills(request):
     """
     Renders the mentor skills page, displaying all skills added by any mentor.
-    If the user is a mentor, they can add new skills. Supports keyword search.
+    If the user is a mentor, they can add new skills. Supports ranked keyword
+    search with prefix matching.
     """
     query = request.GET.get("q")
+    skills = _mentor_skills()
     if query:
-        skills = Skill.objects.filter(
-            Q(name__icontains=query) | Q(description__icontains=query),
-            profiles__user__profile__is_mentor=True,
-        ).distinct()
-    else:
-        skills = Skill.objects.filter(
-            profiles__user__profile__is_mentor=True
-        ).distinct()
+        skills = search_skills(skills, query)
+    skills = [skill async for skill in skills]
 
-    is_mentor = request.user.profile.is_mentor
-    return render(
+    is_mentor = (await aget_profile_summary(request)).is_mentor
+    return await _arender(
         request,
         "main/mentor_skills.html",
         {"skills": skills, "is_mentor": is_mentor, "query": query},
@@ -465,19 +574,22 @@ def mentor_skills(request):
 
 
 @login_required
+@query_budget(2, post=10)
 def mentor_add_skill(request):
     """
     Allows mentors to add new skills. If the user is not a mentor, they are
     redirected to the mentor skills page. Handles both GET and POST requests.
     """
-    if not request.user.profile.is_mentor:
+    summary = get_profile_summary(request)
+    if not summary.is_mentor:
         return redirect("mentor_skills")
 
     if request.method == "POST":
         form = SkillForm(request.POST)
         if form.is_valid():
             skill = form.save()
-            request.user.profile.skills.add(skill)
+            skill.profiles.add(summary.profile_id)
+            notifications.notify_new_skill(skill, actor_id=request.user.id)
             return redirect("mentor_skills")
     else:
         form = SkillForm()
@@ -488,61 +600,236 @@ def mentor_add_skill(request):
 # Skill detail page view
 
 
+async def _skill_state(request, skill_id):
+    """
+    Fetches the skill, with the viewer's ownership and the change markers
+    of its events, in one query. Returns the change markers of the skill
+    detail page, and keeps the skill for the view.
+    """
+    summary = await aget_profile_summary(request)
+    request._skill = skill = (
+        await Skill.objects.annotate(
+            events_updated_at=Max("events__updated_at"),
+            event_count=Count("events"),
+            is_owner=Exists(
+                Profile.skills.through.objects.filter(
+                    skill_id=OuterRef("pk"),
+                    profile_id=summary.profile_id if summary else None,
+                )
+            ),
+        )
+        .filter(id=skill_id)
+        .afirst()
+    )
+    if skill is None:
+        return None
+    return (
+        (skill.updated_at, skill.events_updated_at, skill.event_count,
+         skill.is_owner),
+        max(filter(None, (skill.updated_at, skill.events_updated_at))),
+    )
+
+
 @login_required
-def skill_detail(request, skill_id):
+@query_budget(4)
+@conditional_page(_skill_state)
+async def skill_detail(request, skill_id):
     """
     Renders the skill detail page, displaying the details of a specific skill
     identified by the skill_id parameter.
     """
-    skill = get_object_or_404(Skill, id=skill_id)
+    # Fetched by _skill_state() along with the page's change markers
+    skill = request._skill
+    if skill is None:
+        raise Http404("No Skill matches the given query.")
+    # Only evaluated when the cached fragment has to be rendered again
     upcoming_events = Event.objects.filter(skill=skill).order_by("date_time")
-    is_mentor = (
-        request.user.profile.is_mentor
-        if request.user.is_authenticated
-        else False
-    )
-    is_owner = (
-        skill.profiles.filter(user=request.user).exists()
-        if request.user.is_authenticated
-        else False
-    )
+    summary = await aget_profile_summary(request)
+    is_mentor = summary.is_mentor if summary else False
     context = {
         "skill": skill,
         "upcoming_events": upcoming_events,
         "is_mentor": is_mentor,
-        "is_owner": is_owner,
+        "is_owner": skill.is_owner,
+        "fragment_version": await afragment_version("skill", skill.id),
+        "fragment_timeout": FRAGMENT_CACHE_TIMEOUT,
     }
-    return render(request, "main/skill_detail.html", context)
+    return await _arender(request, "main/skill_detail.html", context)
 
 
 # Events page view
 
+EVENTS_PAGE_SIZE = 20
+EVENTS_ORDERING = ("date_time", "id")
+EVENTS_SEARCH_ORDERING = ("-relevance", "date_time", "id")
 
-@login_required
-def events(request):
+
+def _start_of_day(day):
+    """
+    Returns the first instant of day in the current time zone.
+    """
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _upcoming_events(request):
     """
-    Renders the events page, displaying all events. Supports keyword search and date filtering.
+    Returns the upcoming events matching the keyword search and date filter
+    in the request's query string, along with their ordering. Dates are
+    filtered with plain ranges on date_time so that its index can be used.
     """
     query = request.GET.get("q")
     event_date = request.GET.get("event_date")
-    today = timezone.now().date()
+    today = timezone.localdate()
+
+    events = Event.objects.filter(date_time__gte=_start_of_day(today))
+
+    if event_date:
+        try:
+            day = parse_date(event_date)
+        except ValueError:
+            day = None
+        if day:
+            events = events.filter(
+                date_time__gte=_start_of_day(day),
+                date_time__lt=_start_of_day(day + timedelta(days=1)),
+            )
+
+    if query:
+        return search_events(events, query), EVENTS_SEARCH_ORDERING
 
-    events = Event.objects.filter(date_time__date__gte=today).order_by(
-        "date_time"
+    return events, EVENTS_ORDERING
+
+
+def _events_page(request):
+    """
+    Returns the page of upcoming events following the request's cursor,
+    with highlighted snippets when searching. An invalid cursor raises
+    InvalidCursor.
+    """
+    events, ordering = _upcoming_events(request)
+    page = paginate_keyset(
+        events,
+        ordering,
+        cursor=request.GET.get("cursor"),
+        page_size=EVENTS_PAGE_SIZE,
     )
+    query = request.GET.get("q")
+    if query:
+        highlight(page.items, EVENT_INDEX, query, "overview")
+    return page
+
 
+async def _aevents_page(request):
+    """
+    Async version of _events_page() for the events page.
+    """
+    events, ordering = _upcoming_events(request)
+    page = await apaginate_keyset(
+        events,
+        ordering,
+        cursor=request.GET.get("cursor"),
+        page_size=EVENTS_PAGE_SIZE,
+    )
+    query = request.GET.get("q")
     if query:
-        events = events.filter(
-            Q(title__icontains=query) | Q(overview__icontains=query)
-        ).distinct()
+        await sync_to_async(highlight)(
+            page.items, EVENT_INDEX, query, "overview"
+        )
+    return page
 
-    if event_date:
-        events = events.filter(date_time__date=event_date)
 
-    return render(
+def _next_page_query(request, page):
+    """
+    Returns the query string for the page after page, keeping the filters.
+    """
+    params = request.GET.copy()
+    params["cursor"] = page.next_cursor
+    return params.urlencode()
+
+
+async def _events_state(request):
+    """
+    Returns the change markers of the events page. The day is part of them,
+    as the page lists the events from the start of the day.
+    """
+    today = timezone.localdate()
+    marker = await Event.objects.filter(
+        date_time__gte=_start_of_day(today)
+    ).aaggregate(
+        updated_at=Max("updated_at"), count=Count("id"), ids=Sum("id")
+    )
+    key = (today, marker["updated_at"], marker["count"], marker["ids"])
+    return key, marker["updated_at"]
+
+
+@login_required
+@query_budget(4)
+@conditional_page(_events_state)
+async def events(request):
+    """
+    Renders the events page, displaying upcoming events one page at a time.
+    Supports keyword search and date filtering.
+    """
+    try:
+        page = await _aevents_page(request)
+    except InvalidCursor:
+        # Restart from the first page, keeping the search filters
+        params = request.GET.copy()
+        params.pop("cursor")
+        query_string = params.urlencode()
+        return redirect(
+            reverse("events") + ("?" + query_string if query_string else "")
+        )
+
+    return await _arender(
         request,
         "main/events.html",
-        {"events": events, "query": query, "event_date": event_date},
+        {
+            "events": page.items,
+            "query": request.GET.get("q"),
+            "event_date": request.GET.get("event_date"),
+            "next_page_query": (
+                _next_page_query(request, page) if page.has_next else None
+            ),
+        },
+    )
+
+
+# API endpoint listing upcoming events for infinite scroll
+
+
+@login_required
+@query_budget(3)
+def events_api(request):
+    """
+    Returns a page of upcoming events as JSON, using the same filters and
+    cursors as the events page.
+    """
+    try:
+        page = _events_page(request)
+    except InvalidCursor:
+        return JsonResponse({"error": "Invalid cursor"}, status=400)
+
+    return JsonResponse(
+        {
+            "events": [
+                {
+                    "id": event.id,
+                    "title": event.title,
+                    "overview": event.overview,
+                    "date_time": event.date_time.isoformat(),
+                    "snippet": getattr(event, "snippet", None),
+                    "url": reverse("event_detail", args=[event.id]),
+                }
+                for event in page.items
+            ],
+            "next_cursor": page.next_cursor,
+            "next": (
+                reverse("events_api") + "?" + _next_page_query(request, page)
+                if page.has_next
+                else None
+            ),
+        }
     )
 
 
@@ -550,13 +837,14 @@ def events(request):
 
 
 @login_required
+@query_budget(3, post=14)
 def add_event(request, skill_id):
     """
     Allows mentors to create a new event for a specific skill.
     """
     skill = get_object_or_404(Skill, id=skill_id)
 
-    if not request.user.profile.is_mentor:
+    if not get_profile_summary(request).is_mentor:
         return redirect("skill_detail", skill_id=skill_id)
 
     if request.method == "POST":
@@ -566,6 +854,7 @@ def add_event(request, skill_id):
             event.skill = skill
             event.owner = request.user
             event.save()
+            notifications.notify_new_event(event)
             return redirect("skill_detail", skill_id=skill_id)
     else:
         form = EventForm()
@@ -577,33 +866,149 @@ def add_event(request, skill_id):
 
 # Event detail page view
 
+EVENT_PARTICIPANTS_LIMIT = 50
+
+
+def _event_state(request, event_id):
+    """
+    Fetches the event with the viewer's registration in one query. Returns
+    the change markers of the event detail page, and keeps the event for
+    the view.
+    """
+    request._event = event = (
+        Event.objects.annotate(
+            is_participant=Exists(
+                Event.participants.through.objects.filter(
+                    event_id=OuterRef("pk"), user_id=request.user.id
+                )
+            )
+        )
+        .filter(id=event_id)
+        .first()
+    )
+    if event is None:
+        return None
+    return (
+        (event.updated_at, event.participant_count, event.is_participant),
+        event.updated_at,
+    )
+
 
 @login_required
+@query_budget(4)
+@conditional_page(_event_state)
 def event_detail(request, event_id):
     """
     Displays the details of a specific event and allows users to register or unregister as participants.
+    The event and the viewer's registration are fetched in one query. The
+    participant usernames are only fetched, in one more query, when the
+    cached fragment that lists them has to be rendered again.
     """
-    event = get_object_or_404(Event, id=event_id)
-    is_participant = event.participants.filter(id=request.user.id).exists()
+    # Fetched by _event_state() along with the page's change markers
+    event = request._event
+    if event is None:
+        raise Http404("No Event matches the given query.")
+    is_participant = event.is_participant
 
     if request.method == "POST":
         if request.POST.get("action") == "register" and not is_participant:
-            event.participants.add(request.user)
+            try:
+                registration.register(event, request.user)
+            except registration.EventFull:
+                messages.error(request, "Sorry, this event is full.")
         elif request.POST.get("action") == "unregister" and is_participant:
-            event.participants.remove(request.user)
+            registration.unregister(event, request.user)
         return redirect("event_detail", event_id=event_id)
 
     return render(
         request,
         "main/event_detail.html",
-        {"event": event, "is_participant": is_participant},
+        {
+            "event": event,
+            "is_participant": is_participant,
+            "is_owner": event.owner_id == request.user.id,
+            "participants": SimpleLazyObject(
+                lambda: _participant_usernames(event)
+            ),
+            "fragment_version": fragment_version("event", event.id),
+            "fragment_timeout": FRAGMENT_CACHE_TIMEOUT,
+        },
     )
 
 
+def _participant_usernames(event):
+    """
+    Returns the usernames of the event's participants, capped for popular
+    events, and whether there are more.
+    """
+    usernames = list(
+        event.participants.order_by("username").values_list(
+            "username", flat=True
+        )[: EVENT_PARTICIPANTS_LIMIT + 1]
+    )
+    return {
+        "names": usernames[:EVENT_PARTICIPANTS_LIMIT],
+        "more": len(usernames) > EVENT_PARTICIPANTS_LIMIT,
+    }
+
+
+# API endpoint to register for or unregister from an event
+
+
+@login_required
+@csrf_protect
+@query_budget(10)
+def event_registration_api(request, event_id):
+    """
+    Registers the user for an event or unregisters them, depending on the
+    "action" of the JSON request body, and returns the new registration
+    state and participant count. Repeating a request has no further effect.
+    """
+    if request.method != "POST":
+        return JsonResponse(
+            {"success": False, "error": "Invalid request method"}, status=405
+        )
+    try:
+        action = json.loads(request.body).get("action")
+    except (ValueError, AttributeError):
+        action = None
+    if action not in ("register", "unregister"):
+        return JsonResponse(
+            {"success": False, "error": "Invalid action"}, status=400
+        )
+
+    event = get_object_or_404(Event.objects.only("id"), id=event_id)
+    status = 200
+    error = None
+    if action == "register":
+        try:
+            registration.register(event, request.user)
+            registered = True
+        except registration.EventFull:
+            registered = False
+            status = 409
+            error = "Sorry, this event is full."
+    else:
+        registration.unregister(event, request.user)
+        registered = False
+
+    state = registration.participant_state(event_id)
+    data = {
+        "success": error is None,
+        "registered": registered,
+        "participant_count": state["participant_count"],
+        "capacity": state["capacity"],
+    }
+    if error:
+        data["error"] = error
+    return JsonResponse(data, status=status)
+
+
 # Edit Event page view
 
 
 @login_required
+@query_budget(4)
 def edit_event(request, event_id):
     event = get_object_or_404(Event, id=event_id)
 
@@ -627,6 +1032,7 @@ def edit_event(request, event_id):
 
 
 @login_required
+@query_budget(11)
 def delete_event(request, event_id):
     event = get_object_or_404(Event, id=event_id)
 
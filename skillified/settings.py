@@ -51,7 +51,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'main.static_middleware.AsyncWhiteNoiseMiddleware',
+    'main.query_budget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -61,24 +62,41 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
 ]
 
+# Expose per-request query statistics in X-Query-* response headers
+QUERY_STATS_HEADERS = os.getenv('QUERY_STATS_HEADERS', 'False') == 'True'
+
 ROOT_URLCONF = 'skillified.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'main', 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'main.context_processors.profile_summary',
+            ],
+            # Templates are compiled once per process and rendered from
+            # memory; APP_DIRS has to be spelled out as the app_directories
+            # loader to wrap it. Server processes compile them all at
+            # startup when TEMPLATE_WARMUP is on (see
+            # main/template_warmup.py).
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
             ],
         },
     },
 ]
 
+TEMPLATE_WARMUP = os.getenv('TEMPLATE_WARMUP', str(not DEBUG)) == 'True'
+
+ACCOUNT_ADAPTER = 'main.adapters.AccountAdapter'
 ACCOUNT_FORMS = {
     'signup': 'main.forms.CustomSignupForm',
 }
@@ -148,6 +166,16 @@ SOCIALACCOUNT_PROVIDERS = {
     },
 }
 
+# Serving mode: "wsgi" (gunicorn sync workers) or "asgi" (uvicorn workers
+# under gunicorn, which run the async views natively), see gunicorn.conf.py
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+# Identifies the deployed release, so that a deploy changes the ETags of
+# pages (see main/conditional.py). Heroku sets HEROKU_RELEASE_VERSION when
+# the runtime-dyno-metadata feature is enabled.
+RELEASE_VERSION = os.getenv(
+    'RELEASE_VERSION', os.getenv('HEROKU_RELEASE_VERSION', ''))
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
@@ -159,10 +187,88 @@ if 'test' in sys.argv:
         }
     }
 else:
+    # Connections are kept open for DATABASE_CONN_MAX_AGE seconds and
+    # checked before reuse, so requests do not pay a new TCP, TLS and
+    # authentication handshake each. Alternatively, DATABASE_POOL=True uses
+    # Django's psycopg 3 connection pool, which replaces persistent
+    # connections; the pool size is per process, so keep
+    # WEB_CONCURRENCY * DATABASE_POOL_MAX_SIZE within the plan's limit.
+    # Compare the modes with the bench_db_connections command.
+    # Large exports read through server-side cursors (see main/exports.py);
+    # set DATABASE_DISABLE_SERVER_SIDE_CURSORS=True behind a transaction
+    # pooler such as PgBouncer, which cannot keep them open.
+    # Persistent connections belong to a thread, and async requests run
+    # their queries in short-lived threads, so ASGI mode pools by default.
+    DATABASE_POOL = os.getenv(
+        'DATABASE_POOL', str(SERVER_MODE == 'asgi')) == 'True'
     DATABASES = {
-        'default': dj_database_url.config(default=os.getenv('DATABASE_URL'))
+        'default': dj_database_url.config(
+            default=os.getenv('DATABASE_URL'),
+            conn_max_age=(
+                0 if DATABASE_POOL
+                else int(os.getenv('DATABASE_CONN_MAX_AGE', '600'))
+            ),
+            conn_health_checks=True,
+            disable_server_side_cursors=(
+                os.getenv('DATABASE_DISABLE_SERVER_SIDE_CURSORS', 'False')
+                == 'True'
+            ),
+            ssl_require=os.getenv('DATABASE_SSL_REQUIRE', 'True') == 'True',
+        )
+    }
+    if DATABASE_POOL:
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '4')),
+            'timeout': int(os.getenv('DATABASE_POOL_TIMEOUT', '10')),
+        }
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# A cache shared by every dyno is selected with CACHE_URL, or the REDIS_URL
+# set by the Heroku Redis add-on: redis://, rediss:// or memcached://.
+# Without one, and always in tests, a file-based cache in .cache/ stands in.
+# Bump CACHE_VERSION to ignore every entry written by older code; the
+# subsystems also version their own keys (see main/caching.py).
+
+CACHE_URL = None if 'test' in sys.argv else (
+    os.getenv('CACHE_URL') or os.getenv('REDIS_URL')
+)
+
+if CACHE_URL and CACHE_URL.startswith(('redis://', 'rediss://')):
+    DEFAULT_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+    }
+    if CACHE_URL.startswith('rediss://'):
+        # Heroku Redis uses self-signed certificates
+        DEFAULT_CACHE['OPTIONS'] = {'ssl_cert_reqs': None}
+elif CACHE_URL and CACHE_URL.startswith('memcached://'):
+    DEFAULT_CACHE = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': CACHE_URL.removeprefix('memcached://'),
+    }
+else:
+    DEFAULT_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / (
+            'test' if 'test' in sys.argv else 'default'
+        ),
+        # Culling scans the whole directory, so it should be rare
+        'OPTIONS': {'MAX_ENTRIES': 100000},
     }
 
+CACHES = {
+    'default': {
+        **DEFAULT_CACHE,
+        'KEY_PREFIX': 'skillified',
+        'VERSION': int(os.getenv('CACHE_VERSION', '1')),
+    }
+}
+
+# Clears the file-based test cache before each test
+TEST_RUNNER = 'skillified.test_runner.TestRunner'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -212,21 +318,59 @@ CLOUDINARY_STORAGE = {
     'API_SECRET': os.getenv('CLOUDINARY_API_SECRET'),
 }
 
-DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+# File storages. The resized profile pictures (see main/avatars.py) are
+# stored in Cloudinary when it is configured, and under MEDIA_ROOT otherwise,
+# e.g. locally and in tests.
+if CLOUDINARY_STORAGE['API_KEY']:
+    AVATAR_STORAGE = {
+        'BACKEND': 'cloudinary_storage.storage.MediaCloudinaryStorage',
+    }
+else:
+    AVATAR_STORAGE = {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    }
 
-# Whitenoise configuration
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# The built, hashed static files are served once collectstatic has
+# written their manifest. Until then (development, tests, local runs) the
+# pages load the source files.
+STATIC_BUILD = not DEBUG and 'test' not in sys.argv and (
+    'collectstatic' in sys.argv
+    or os.path.exists(os.path.join(STATIC_ROOT, 'staticfiles.json'))
+)
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'main.static_build.BuildStaticFilesStorage'
+            if STATIC_BUILD
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+    'avatars': AVATAR_STORAGE,
+}
 
 # Configure Django App for Heroku.
+# DATABASES, TEST_RUNNER and the static files middleware and storage are
+# configured above and must not be replaced.
 import django_heroku
-django_heroku.settings(locals())
+django_heroku.settings(
+    locals(), databases=False, test_runner=False, staticfiles=False)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Email configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Emails are queued in the database by the request and delivered by the
+# send_queued_mail worker through MAIL_QUEUE_BACKEND (see main/mail.py).
+# Set MAIL_QUEUE_BACKEND to the console or file backend for local runs.
+EMAIL_BACKEND = 'main.mail.QueuedEmailBackend'
+MAIL_QUEUE_BACKEND = os.getenv(
+    'MAIL_QUEUE_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
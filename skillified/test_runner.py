@@ -0,0 +1,36 @@
+from unittest import TextTestResult
+
+from django.core.cache import caches
+from django.test.runner import DiscoverRunner
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+class CacheClearingResultMixin:
+    """
+    Test result clearing the caches before each test. Cache keys hold
+    object ids, which every test case rolls back and the next one reuses,
+    so an entry left by one test would otherwise be served to another.
+    """
+
+    def startTest(self, test):
+        clear_caches()
+        super().startTest(test)
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runs every test against empty caches, including the file-based test
+    cache, which outlives the test process.
+    """
+
+    def get_resultclass(self):
+        resultclass = super().get_resultclass() or TextTestResult
+        return type(
+            f'CacheClearing{resultclass.__name__}',
+            (CacheClearingResultMixin, resultclass),
+            {},
+        )
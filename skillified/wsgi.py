@@ -1,6 +1,12 @@
 import os
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillified.settings')
 
-application = get_wsgi_application()
\ No newline at end of file
+application = get_wsgi_application()
+
+# Compile the templates before the first request
+if settings.TEMPLATE_WARMUP:
+    from main.template_warmup import warm_templates
+    warm_templates()
@@ -0,0 +1,89 @@
+/**
+ * Updates the registration button, participant count and participant list
+ * after a registration request.
+ * @param {HTMLFormElement} form - The registration form.
+ * @param {Object} data - The response of the registration API.
+ */
+function updateRegistration(form, data) {
+    var button = form.querySelector('button');
+    var full = data.capacity !== null && data.participant_count >= data.capacity;
+    if (data.registered) {
+        button.type = 'submit';
+        button.value = 'unregister';
+        button.textContent = 'Unregister';
+        button.className = 'btn btn-secondary';
+        button.disabled = false;
+    } else if (full) {
+        button.type = 'button';
+        button.textContent = 'Event Full';
+        button.className = 'btn btn-primary';
+        button.disabled = true;
+    } else {
+        button.type = 'submit';
+        button.value = 'register';
+        button.textContent = 'Register for Event';
+        button.className = 'btn btn-primary';
+        button.disabled = false;
+    }
+
+    var count = document.getElementById('participant-count');
+    count.textContent = data.participant_count + (data.capacity !== null ? ' / ' + data.capacity : '');
+
+    var list = document.getElementById('participants-list');
+    var username = form.dataset.username;
+    var item = Array.from(list.children).find(li => li.textContent === username);
+    if (data.registered && !item) {
+        item = document.createElement('li');
+        item.textContent = username;
+        list.appendChild(item);
+    } else if (!data.registered && item) {
+        item.remove();
+    }
+
+    document.getElementById('registration-error').textContent = data.error || '';
+}
+
+/**
+ * Registers or unregisters the user through the registration API instead of
+ * submitting the form and reloading the page.
+ * @param {HTMLFormElement} form - The registration form.
+ * @param {string} action - "register" or "unregister".
+ */
+function submitRegistration(form, action) {
+    var button = form.querySelector('button');
+    button.disabled = true;
+    fetch(form.dataset.apiUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'X-CSRFToken': form.querySelector('[name=csrfmiddlewaretoken]').value,
+        },
+        body: JSON.stringify({ action: action }),
+    })
+        .then(response => response.json())
+        .then(data => updateRegistration(form, data))
+        .catch(() => {
+            // Fall back to a regular form submission
+            var input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = 'action';
+            input.value = action;
+            form.appendChild(input);
+            form.submit();
+        });
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    var form = document.getElementById('registration-form');
+    if (!form || !window.fetch) {
+        return;
+    }
+    form.addEventListener('submit', function (e) {
+        e.preventDefault();
+        var button = form.querySelector('button');
+        if (!button.disabled) {
+            submitRegistration(form, button.value);
+        }
+    });
+});
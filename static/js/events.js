@@ -0,0 +1,68 @@
+/**
+ * Builds an event card matching the cards rendered by events.html.
+ * @param {Object} event - An event returned by the events API.
+ * @returns {HTMLElement} The card's column element.
+ */
+function buildEventCard(event) {
+    var column = document.createElement('div');
+    column.className = 'mb-4';
+    column.innerHTML = '<div class="card h-100"><div class="card-body d-flex flex-column">' +
+        '<h5 class="card-title"></h5><p class="event-date"></p><p class="card-text flex-grow-1"></p>' +
+        '<a class="btn btn-primary mt-auto">View Event</a></div></div>';
+    column.querySelector('.card-title').textContent = event.title;
+    column.querySelector('.event-date').textContent = new Date(event.date_time).toLocaleString();
+    if (event.snippet) {
+        // Snippets are escaped by the server, with matches wrapped in <mark>
+        column.querySelector('.card-text').innerHTML = event.snippet;
+    } else {
+        column.querySelector('.card-text').textContent = event.overview;
+    }
+    column.querySelector('a').href = event.url;
+    return column;
+}
+
+/**
+ * Loads the next page of events from the events API and appends it to the list.
+ * @param {HTMLElement} link - The "More Events" link holding the next page URL.
+ */
+function loadMoreEvents(link) {
+    if (link.dataset.loading) {
+        return;
+    }
+    link.dataset.loading = 'true';
+    fetch(link.dataset.apiUrl, { headers: { 'Accept': 'application/json' } })
+        .then(response => response.json())
+        .then(data => {
+            var eventsList = document.getElementById('events-list');
+            data.events.forEach(event => eventsList.appendChild(buildEventCard(event)));
+            if (data.next) {
+                link.dataset.apiUrl = data.next;
+                link.href = '?' + data.next.split('?')[1];
+                delete link.dataset.loading;
+            } else {
+                link.parentElement.remove();
+            }
+        })
+        .catch(() => {
+            delete link.dataset.loading;
+        });
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+    var link = document.getElementById('load-more-events');
+    if (!link) {
+        return;
+    }
+    link.addEventListener('click', function (e) {
+        e.preventDefault();
+        loadMoreEvents(link);
+    });
+    // Load the next page automatically when the link scrolls into view
+    if ('IntersectionObserver' in window) {
+        new IntersectionObserver(function (entries) {
+            if (entries.some(entry => entry.isIntersecting) && document.body.contains(link)) {
+                loadMoreEvents(link);
+            }
+        }).observe(link);
+    }
+});